@@ -0,0 +1,50 @@
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from benchmarks.support import synthetic_rows
+from central_balancos_py.src.constants import INDEX_COLUMNS
+from central_balancos_py.src.extract import to_df
+
+
+def legacy_to_df(rows):
+    rows = [row.to_dict() for row in rows]
+    transposed = {k: [] for k in rows[0].keys()}
+    for row in rows:
+        for k, v in row.items():
+            transposed[k].append(v)
+    return (pd.DataFrame(data=transposed)
+            .astype({'cnpj': 'str'})
+            .set_index(INDEX_COLUMNS)
+            .sort_values(by=INDEX_COLUMNS))
+
+
+def measure(build, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = build(synthetic_rows(rows))
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare peak memory of row-dict and columnar DataFrame building')
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    legacy_df, legacy_time, legacy_peak = measure(legacy_to_df, args.rows)
+    columnar_df, columnar_time, columnar_peak = measure(to_df, args.rows)
+    assert legacy_df.equals(columnar_df)
+
+    print(f'rows: {args.rows}')
+    print(f'legacy   peak {legacy_peak / 2 ** 20:8.1f} MiB  {legacy_time:6.2f}s')
+    print(f'columnar peak {columnar_peak / 2 ** 20:8.1f} MiB  {columnar_time:6.2f}s')
+    print(f'saving        {100 * (1 - columnar_peak / legacy_peak):8.1f} %')
+
+
+if __name__ == '__main__':
+    main()
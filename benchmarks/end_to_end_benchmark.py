@@ -0,0 +1,78 @@
+import argparse
+import json
+import logging
+import os
+import resource
+import tempfile
+import time
+
+from benchmarks.mock_api import MockApi, redirect
+from central_balancos_py.src.client.http import DEFAULT_POOL_SIZE
+from central_balancos_py.src.concurrency import DEFAULT_MAX_WORKERS
+from central_balancos_py.src.constants import STATEMENTS_FILE_NAME
+from central_balancos_py.src.extract import build_http_client, extract_company_info
+from central_balancos_py.src.pdfs import download_pdfs
+
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_phase(name, func, http_client):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    snapshot = http_client.metrics.snapshot()
+    return {'phase': name,
+            'wall_seconds': round(elapsed, 3),
+            'requests': snapshot['requests'],
+            'requests_per_second': round(snapshot['requests'] / elapsed, 1) if elapsed else 0.0,
+            'retries': snapshot['retries'],
+            'megabytes': round(snapshot['bytes'] / 2 ** 20, 2),
+            'peak_rss_mib': round(peak_rss_mib(), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run extraction and PDF downloads against a local mock API')
+    parser.add_argument('--companies', type=int, default=200)
+    parser.add_argument('--statements-per-company', type=int, default=5)
+    parser.add_argument('--pdf-size', type=int, default=64 * 1024, help='bytes per PDF')
+    parser.add_argument('--latency', type=float, default=0.01, help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of responses answered with 503')
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS)
+    parser.add_argument('--requests-per-second', type=float, default=0, help='0 disables rate limiting')
+    parser.add_argument('--skip-download', action='store_true')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help='keep the application logs')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    pool_size = max(args.workers, DEFAULT_POOL_SIZE)
+    with MockApi(args.companies, args.statements_per_company, args.pdf_size, args.latency, args.error_rate) as api, \
+            tempfile.TemporaryDirectory() as folder, \
+            build_http_client(args.requests_per_second or None, pool_size=pool_size) as http_client:
+        redirect(http_client, api.base_url, pool_size)
+        worksheet_path = os.path.join(folder, STATEMENTS_FILE_NAME)
+        phases = [run_phase('extract', lambda: extract_company_info(worksheet_path, 'demonstracoes',
+                                                                    max_workers=args.workers,
+                                                                    http_client=http_client),
+                            http_client)]
+        if not args.skip_download:
+            phases.append(run_phase('download', lambda: download_pdfs(os.path.join(folder, 'pdfs'), worksheet_path,
+                                                                      'demonstracoes', max_workers=args.workers,
+                                                                      http_client=http_client),
+                                    http_client))
+
+    if args.json:
+        print(json.dumps(phases, indent=2))
+        return
+    print(f'companies: {args.companies}, statements: {args.companies * args.statements_per_company}, '
+          f'latency: {args.latency}s, error rate: {args.error_rate}, workers: {args.workers}')
+    for phase in phases:
+        print(f"{phase['phase']:<9} {phase['wall_seconds']:8.2f}s  {phase['requests']:6d} requests  "
+              f"{phase['requests_per_second']:8.1f} req/s  {phase['retries']:4d} retries  "
+              f"{phase['megabytes']:8.2f} MiB  peak RSS {phase['peak_rss_mib']:8.1f} MiB")
+
+
+if __name__ == '__main__':
+    main()
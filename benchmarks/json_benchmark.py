@@ -0,0 +1,81 @@
+import argparse
+import json
+import random
+import time
+
+from requests.models import Response
+
+from benchmarks.support import synthetic_company, synthetic_statement
+from central_balancos_py.src.client import decoding
+from central_balancos_py.src.extract import extract_row
+
+STATEMENT_FIELDS = {'id', 'cnpj', 'nomeParticipante', 'tipoDemonstracao', 'status', 'dataFim', 'dataPublicacao',
+                    'dataModificacao'}
+
+
+def companies_page(count):
+    return {'items': [synthetic_company(company_id) for company_id in range(1, count + 1)], 'totalCount': count}
+
+
+def statements_page(count, seed=0):
+    rng = random.Random(seed)
+    company = synthetic_company(1)
+    return {'items': [synthetic_statement(statement_id, company, rng) for statement_id in range(count)],
+            'totalCount': count}
+
+
+def response(content):
+    result = Response()
+    result.status_code = 200
+    result.headers['Content-Type'] = 'application/json; charset=utf-8'
+    result.encoding = 'utf-8'
+    result._content = content
+    return result
+
+
+def project(statement):
+    return {field: statement[field] for field in STATEMENT_FIELDS if field in statement} \
+        if 'tipoDemonstracao' in statement else statement
+
+
+def decoders():
+    yield 'requests .json()', lambda content: response(content).json()
+    yield 'stdlib loads', lambda content: json.loads(content)
+    yield 'stdlib projected', lambda content: json.loads(content, object_hook=project)
+    if decoding.orjson is not None:
+        yield 'orjson loads', decoding.orjson.loads
+
+
+def measure(decode, content, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = decode(content)
+        [extract_row(item, '0') for item in body['items'] if 'tipoDemonstracao' in item]
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare JSON decoders on API-sized payloads')
+    parser.add_argument('--companies', type=int, default=10_000)
+    parser.add_argument('--statements', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    payloads = [(f'Participante x{args.companies}', companies_page(args.companies)),
+                *[(f'Demonstracao x{count}', statements_page(count)) for count in args.statements]]
+    print(f'decoder in use: {decoding.DECODER}')
+    for name, body in payloads:
+        content = json.dumps(body, ensure_ascii=False).encode()
+        print(f'{name} ({len(content) / 2 ** 10:,.0f} KiB)')
+        baseline = None
+        for decoder, decode in decoders():
+            elapsed = measure(decode, content, args.repeat)
+            baseline = baseline or elapsed
+            print(f'  {decoder:18} {elapsed * 1000:8.2f} ms  {len(content) / elapsed / 2 ** 20:7.1f} MiB/s  '
+                  f'{baseline / elapsed:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import json
+import multiprocessing
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from requests.adapters import HTTPAdapter
+
+from benchmarks.support import synthetic_company, synthetic_statement
+
+API_HOST = 'https://centraldebalancos.estaleiro.serpro.gov.br'
+API_PATH = '/centralbalancos/servicesapi/api/'
+STATEMENT_ID_STRIDE = 1000
+
+
+class Catalogue:
+
+    def __init__(self, companies=100, statements_per_company=5, pdf_size=64 * 1024, seed=0):
+        self.companies = [synthetic_company(company_id) for company_id in range(1, companies + 1)]
+        self.by_cnpj = {int(company['cnpj']): company for company in self.companies}
+        self.statements_per_company = statements_per_company
+        self.seed = seed
+        self.pdf = b'%PDF-1.4\n' + b'0' * max(pdf_size - 9, 0)
+
+    def company_page(self, page, page_size):
+        start = (page - 1) * page_size
+        return {'items': self.companies[start:start + page_size], 'totalCount': len(self.companies)}
+
+    def company(self, cnpj):
+        company = self.by_cnpj.get(cnpj)
+        return {'items': [] if company is None else [company], 'totalCount': 0 if company is None else 1}
+
+    def statement_page(self, company_id, page, page_size):
+        if not 1 <= company_id <= len(self.companies):
+            return None
+        company = self.companies[company_id - 1]
+        first = (page - 1) * page_size
+        last = min(first + page_size, self.statements_per_company)
+        items = [synthetic_statement(company_id * STATEMENT_ID_STRIDE + index, company,
+                                     random.Random(self.seed * 1_000_003 + company_id * STATEMENT_ID_STRIDE + index))
+                 for index in range(first, last)]
+        return {'items': items, 'totalCount': self.statements_per_company}
+
+
+def build_handler(catalogue, latency, error_rate, seed):
+    rng = random.Random(seed)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *_args):
+            pass
+
+        def send_body(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_json(self, body):
+            if body is None:
+                self.send_body(404, b'{}', 'application/json')
+            else:
+                self.send_body(200, json.dumps(body).encode(), 'application/json')
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            if error_rate and rng.random() < error_rate:
+                self.send_body(503, b'{}', 'application/json')
+                return
+            url = urlparse(self.path)
+            query = {key: int(values[0]) for key, values in parse_qs(url.query).items() if values[0].isdigit()}
+            page, page_size = query.get('page', 1), query.get('pageSize', 100)
+            segments = url.path[len(API_PATH):].split('/') if url.path.startswith(API_PATH) else []
+            match segments:
+                case ['Participante']:
+                    self.send_json(catalogue.company_page(page, page_size))
+                case ['Participante', cnpj]:
+                    self.send_json(catalogue.company(int(cnpj)))
+                case ['Demonstracao', 'pdf', _statement_id]:
+                    self.send_body(200, catalogue.pdf, 'application/pdf')
+                case ['Demonstracao', company_id, _, _]:
+                    self.send_json(catalogue.statement_page(int(company_id), page, page_size))
+                case _:
+                    self.send_json(None)
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def serve(port_queue, companies, statements_per_company, pdf_size, latency, error_rate, seed):
+    catalogue = Catalogue(companies, statements_per_company, pdf_size, seed)
+    server = QuietServer(('127.0.0.1', 0), build_handler(catalogue, latency, error_rate, seed))
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+class MockApi:
+
+    def __init__(self, companies=100, statements_per_company=5, pdf_size=64 * 1024, latency=0.0, error_rate=0.0,
+                 seed=0):
+        self.options = (companies, statements_per_company, pdf_size, latency, error_rate, seed)
+        self.process = None
+        self.base_url = None
+
+    def __enter__(self):
+        port_queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=serve, args=(port_queue, *self.options), daemon=True)
+        self.process.start()
+        self.base_url = f'http://127.0.0.1:{port_queue.get(timeout=30)}'
+        return self
+
+    def __exit__(self, *_args):
+        self.process.terminate()
+        self.process.join()
+
+
+class RedirectAdapter(HTTPAdapter):
+
+    def __init__(self, target, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.target = target
+
+    def send(self, request, *args, **kwargs):
+        request.url = self.target + request.url[len(API_HOST):]
+        return super().send(request, *args, **kwargs)
+
+
+def redirect(http_client, base_url, pool_size):
+    http_client.session.mount(API_HOST, RedirectAdapter(base_url, pool_connections=pool_size, pool_maxsize=pool_size))
+    return http_client
+
+
+__ALL__ = ['MockApi', 'Catalogue', 'redirect']
@@ -0,0 +1,84 @@
+import argparse
+import gc
+import json
+import random
+import tracemalloc
+
+from benchmarks.support import synthetic_company, synthetic_statement
+from central_balancos_py.src.client.decoding import loads
+from central_balancos_py.src.records import Company, StatementRow, url_pdf
+
+
+def legacy_company(item):
+    return item
+
+
+def legacy_row(statement, cnpj):
+    return {
+        'nomeParticipante': statement['nomeParticipante'],
+        'cnpj': cnpj,
+        'tipoDemonstracao': statement['tipoDemonstracao'],
+        'status': statement['status'],
+        'dataFim': statement['dataFim'],
+        'dataPublicacao': statement['dataPublicacao'],
+        'pdf': url_pdf(statement['id'])
+    }
+
+
+def company_pages(count, page_size=1000):
+    companies = [synthetic_company(company_id) for company_id in range(1, count + 1)]
+    return [json.dumps({'items': companies[start:start + page_size]}).encode()
+            for start in range(0, count, page_size)]
+
+
+def statement_pages(count, statements_per_company=10, seed=0):
+    rng = random.Random(seed)
+    pages = []
+    for company_id in range(count // statements_per_company):
+        company = synthetic_company(company_id)
+        items = [synthetic_statement(company_id * statements_per_company + index, company, rng)
+                 for index in range(statements_per_company)]
+        pages.append((json.dumps({'items': items}, ensure_ascii=False).encode(), company['cnpj']))
+    return pages
+
+
+def measure(build, pages):
+    gc.collect()
+    tracemalloc.start()
+    records = [record for page in pages for record in build(*page)]
+    gc.collect()
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return records, retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory retained by dict and __slots__ records')
+    parser.add_argument('--companies', type=int, default=10_000)
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    companies = [(page,) for page in company_pages(args.companies)]
+    statements = statement_pages(args.rows)
+    cases = [
+        ('companies', companies,
+         lambda page: map(legacy_company, loads(page)['items']),
+         lambda page: map(Company.from_json, loads(page)['items'])),
+        ('rows', statements,
+         lambda page, cnpj: [legacy_row(statement, cnpj) for statement in loads(page)['items']],
+         lambda page, cnpj: [StatementRow.from_statement(statement, cnpj) for statement in loads(page)['items']]),
+    ]
+    for name, pages, legacy, slotted in cases:
+        legacy_records, legacy_bytes = measure(legacy, pages)
+        slotted_records, slotted_bytes = measure(slotted, pages)
+        assert len(legacy_records) == len(slotted_records)
+        count = len(slotted_records)
+        del legacy_records, slotted_records
+        print(f'{name}: {count}')
+        print(f'  dict    {legacy_bytes / 2 ** 20:8.1f} MiB  {legacy_bytes / count:6.0f} B/record')
+        print(f'  slots   {slotted_bytes / 2 ** 20:8.1f} MiB  {slotted_bytes / count:6.0f} B/record')
+        print(f'  saving  {100 * (1 - slotted_bytes / legacy_bytes):8.1f} %')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MENU_PROMPT = b'Please choose one of the following options'
+HEAVY_MODULES = ['pandas', 'numpy', 'openpyxl', 'requests', 'pyarrow']
+
+
+def time_to_menu(command):
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    output = b''
+    try:
+        while MENU_PROMPT not in output:
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f'{" ".join(command)} exited before showing the menu')
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def modules_loaded_by_main():
+    probe = ('import sys, central_balancos_py.src.main; '
+             f'print(" ".join(name for name in {HEAVY_MODULES!r} if name in sys.modules))')
+    return subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True).stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure how long the application takes to show its menu')
+    parser.add_argument('--binary', help='bundled executable to measure instead of the Python module')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=1.0, help='fail when the median exceeds this')
+    args = parser.parse_args()
+
+    command = [args.binary] if args.binary else [sys.executable, '-m', 'central_balancos_py.src.main']
+    timings = [time_to_menu(command) for _ in range(args.runs)]
+    median = statistics.median(timings)
+
+    print(f'command: {" ".join(command)}')
+    print(f'time to menu: median {median:.3f}s  min {min(timings):.3f}s  max {max(timings):.3f}s')
+    if not args.binary:
+        print(f'heavy modules imported by main: {", ".join(modules_loaded_by_main()) or "none"}')
+    if median > args.max_seconds:
+        print(f'FAIL: median above {args.max_seconds}s')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
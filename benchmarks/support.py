@@ -0,0 +1,35 @@
+import random
+
+from central_balancos_py.src.extract import extract_row
+
+STATEMENT_TYPES = ['Balanço Patrimonial (BP)',
+                   'Demonstração do Resultado do Exercício (DRE)',
+                   'Demonstrações Contábeis Completas (DCC)']
+
+
+def synthetic_company(company_id):
+    return {'id': company_id, 'cnpj': f'{company_id:014d}', 'nome': f'COMPANY {company_id:05d} PARTICIPACOES S.A.'}
+
+
+def synthetic_statement(statement_id, company, rng=random):
+    year = rng.randint(2010, 2023)
+    return {'id': statement_id, 'cnpj': company['cnpj'], 'nomeParticipante': company['nome'],
+            'tipoDemonstracao': rng.choice(STATEMENT_TYPES), 'categoria': 'DEMONSTRACAODIVERSA',
+            'origem': 'Participante-Upload', 'dataInicio': f'{year}-01-01T00:00:00',
+            'dataFim': f'{year}-12-31T00:00:00', 'statusId': 0, 'status': 'Publicado', 'isPublicada': True,
+            'consolidada': False, 'titulo': f'DEMONSTRAÇÕES FINANCEIRAS DE {year}',
+            'descricao': f'DEMONSTRAÇÕES FINANCEIRAS REFERENTES AO EXERCÍCIO SOCIAL FINDO EM 31/12/{year}',
+            'dataPublicacao': f'{year + 1}-0{rng.randint(1, 9)}-{rng.randint(10, 28)}T11:24:{rng.randint(10, 59)}.34',
+            'dataModificacao': '0001-01-01T00:00:00', 'dataEnvio': '0001-01-01T00:00:00', 'tipoArquivo': 'PDF',
+            'ordem': 0, 'htmlXbrl': None, 'qrCode': None, 'hasAnexos': False, 'assinantes': None,
+            'podeEditar': False, 'filaProcessamentoId': None, 'nome1': None, 'nome2': None}
+
+
+def synthetic_rows(count, statements_per_company=10, seed=0):
+    rng = random.Random(seed)
+    for statement_id in range(count):
+        company = synthetic_company(statement_id // statements_per_company)
+        yield extract_row(synthetic_statement(statement_id, company, rng), company['cnpj'])
+
+
+__ALL__ = ['synthetic_company', 'synthetic_statement', 'synthetic_rows']
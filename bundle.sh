@@ -1,3 +1,18 @@
 #!/bin/zsh
 
-pyinstaller -F central_balancos_py/src/main.py -p central_balancos_py/src
+# onefile: a single executable that unpacks itself on every launch (slow start)
+# onedir:  a folder with the executable and its libraries, which starts without unpacking
+mode=${1:-onefile}
+
+case $mode in
+  onefile)
+    pyinstaller -F central_balancos_py/src/main.py -p central_balancos_py/src
+    ;;
+  onedir)
+    pyinstaller -D --noconfirm central_balancos_py/src/main.py -p central_balancos_py/src
+    ;;
+  *)
+    echo "usage: ./bundle.sh [onefile|onedir]"
+    exit 1
+    ;;
+esac
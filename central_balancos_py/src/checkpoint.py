@@ -0,0 +1,100 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from central_balancos_py.src.records import StatementRow
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_MAX_AGE = 24 * 60 * 60
+
+
+def checkpoint_path(worksheet_path, selected_cnpj=None):
+    scope = 'all' if selected_cnpj is None else selected_cnpj
+    return f'{worksheet_path}.{scope}.checkpoint.jsonl'
+
+
+class CheckpointJournal:
+
+    def __init__(self, path, max_age=CHECKPOINT_MAX_AGE, clock=time.time):
+        self.path = path
+        self.max_age = max_age
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.offsets = self._load()
+
+    def _is_stale(self):
+        with open(self.path, 'rb') as f:
+            try:
+                started = json.loads(f.readline()).get('started')
+            except (json.JSONDecodeError, AttributeError):
+                return True
+        return started is None or self.clock() - started > self.max_age
+
+    def _load(self):
+        offsets = {}
+        if not os.path.exists(self.path):
+            return offsets
+        if self._is_stale():
+            logger.info(f'Discarding checkpoint {self.path} started more than {self.max_age}s ago')
+            os.remove(self.path)
+            return offsets
+        with open(self.path, 'rb') as f:
+            offset = len(f.readline())
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f'Skipping truncated checkpoint entry in {self.path}')
+                    break
+                offsets[entry['id']] = offset
+                offset += len(line)
+        if offset < os.path.getsize(self.path):
+            os.truncate(self.path, offset)
+        logger.info(f'Resuming from checkpoint with {len(offsets)} companies already extracted')
+        return offsets
+
+    def __contains__(self, company):
+        return company.id in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def _read(self, f, company_id):
+        f.seek(self.offsets[company_id])
+        return [StatementRow.from_dict(row) for row in json.loads(f.readline())['rows']]
+
+    def get(self, company):
+        with open(self.path, 'rb') as f:
+            return self._read(f, company.id)
+
+    def items(self):
+        if len(self.offsets) == 0:
+            return
+        with open(self.path, 'rb') as f:
+            for company_id in sorted(self.offsets):
+                yield company_id, self._read(f, company_id)
+
+    def record(self, company, rows):
+        line = json.dumps({'id': company.id, 'rows': [row.to_dict() for row in rows]}, ensure_ascii=False)
+        with self.lock:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                if f.tell() == 0:
+                    f.write(json.dumps({'started': self.clock()}).encode('utf-8') + b'\n')
+                offset = f.tell()
+                f.write(line.encode('utf-8') + b'\n')
+            self.offsets[company.id] = offset
+
+    def clear(self):
+        with self.lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.offsets = {}
+
+
+__ALL__ = ['CheckpointJournal', 'checkpoint_path', 'CHECKPOINT_MAX_AGE']
@@ -0,0 +1,225 @@
+import argparse
+import json
+import logging
+import os
+import re
+
+from central_balancos_py.src.concurrency import DEFAULT_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = ['extract', 'download', 'both', 'merge']
+JOB_DEFAULTS = {
+    'command': None,
+    'worksheet': None,
+    'sheet': 'demonstracoes',
+    'pdfs_directory': None,
+    'cnpj': None,
+    'incremental': False,
+    'format': None,
+    'partition_by': None,
+    'statement_type': None,
+    'publish_date': None,
+    'published_from': None,
+    'published_to': None,
+    'cnpjs': None,
+    'workers': DEFAULT_MAX_WORKERS,
+    'download_workers': None,
+    'requests_per_second': None,
+    'cache_directory': None,
+    'shards': None,
+    'shard': None,
+    'shard_by': 'hash',
+    'processes': None,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='central_balancos',
+        description='Extract Central de Balanços statements and download their PDFs without prompts. '
+                    'Run without arguments for the interactive menu.')
+    parser.add_argument('command', nargs='?', choices=COMMANDS,
+                        help='extract the statements, download their PDFs or both. Unless incremental, both '
+                             'downloads PDFs while the extraction is still running. merge combines extracted shards')
+    parser.add_argument('--config', help='JSON job file with the same keys as the long options; flags override it')
+
+    paths = parser.add_argument_group('paths')
+    paths.add_argument('--worksheet', help='statements file (.xlsx, .parquet or .feather)')
+    paths.add_argument('--sheet', help='statements sheet name (default: demonstracoes)')
+    paths.add_argument('--pdfs-directory', help='folder the PDFs are saved to')
+
+    extraction = parser.add_argument_group('extraction')
+    extraction.add_argument('--cnpj', help='extract a single company, digits only')
+    extraction.add_argument('--incremental', action='store_true', default=None,
+                            help='only update companies whose statements changed since the last run')
+    extraction.add_argument('--format', help='output format for a statements file without extension. Without '
+                                             '--worksheet, the default statements file is named after it')
+    extraction.add_argument('--partition-by', action='append',
+                            help='Parquet partition column (repeatable, Parquet output only)')
+
+    sharding = parser.add_argument_group('sharding')
+    sharding.add_argument('--shards', type=int, help='split the companies into this many shards')
+    sharding.add_argument('--shard', type=int,
+                          help='only extract this shard (1 to --shards), e.g. on another machine, then run merge')
+    sharding.add_argument('--shard-by', choices=['hash', 'id'], help='split by CNPJ hash or blocks of company ids')
+    sharding.add_argument('--processes', type=int, help='shards extracted at once (default: one per CPU core)')
+
+    filters = parser.add_argument_group('download filters')
+    filters.add_argument('--statement-type', action='append',
+                         help='statement type name or acronym, e.g. BP or DRE (repeatable)')
+    filters.add_argument('--publish-date', choices=['latest', 'oldest'])
+    filters.add_argument('--published-from', help='first publish date, YYYY-MM-DD')
+    filters.add_argument('--published-to', help='last publish date, YYYY-MM-DD')
+    filters.add_argument('--cnpjs', action='append',
+                         help='CNPJs to download, comma separated or repeated (default: the cnpjs sheet)')
+
+    client = parser.add_argument_group('client')
+    client.add_argument('--workers', type=int, help=f'concurrent requests (default: {DEFAULT_MAX_WORKERS})')
+    client.add_argument('--download-workers', type=int,
+                        help='concurrent PDF downloads while extracting with both (default: --workers)')
+    client.add_argument('--requests-per-second', type=float, help='initial request rate per host')
+    client.add_argument('--cache-directory', help='cache API responses on disk in this folder')
+    client.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    return parser
+
+
+def read_job_file(path):
+    with open(path) as f:
+        job = json.load(f)
+    unknown = set(job) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f'unknown keys in job file {path}: {", ".join(sorted(unknown))}')
+    return job
+
+
+def split_values(values):
+    if values is None:
+        return None
+    if not isinstance(values, list):
+        values = [values]
+    return [value.strip() for entry in values for value in str(entry).split(',') if value.strip()]
+
+
+def resolve_job(args, env):
+    from central_balancos_py.src.output import format_path
+
+    flags = {key: value for key, value in vars(args).items()
+             if key in JOB_DEFAULTS and value is not None}
+    job = {**JOB_DEFAULTS, **(read_job_file(args.config) if args.config else {}), **flags}
+    if job['command'] not in COMMANDS:
+        raise ValueError(f'please choose a command: {", ".join(COMMANDS)}')
+    if job['cnpj'] is not None and re.match(r'^\d+$', str(job['cnpj'])) is None:
+        raise ValueError(f'please provide a CNPJ with only digits. "{job["cnpj"]}" provided')
+    check_sharding(job)
+    job['worksheet'] = job['worksheet'] or format_path(env['worksheet_path'], job['format'])
+    job['pdfs_directory'] = job['pdfs_directory'] or env['pdfs_directory']
+    job['cnpjs'] = split_values(job['cnpjs'])
+    job['statement_type'] = split_values(job['statement_type']) or ''
+    job['publish_date'] = job['publish_date'] or ''
+    return job
+
+
+def check_sharding(job):
+    if job['shards'] is None:
+        if job['command'] == 'merge' or job['shard'] is not None:
+            raise ValueError('please provide the number of shards with --shards')
+        return
+    if job['cnpj'] is not None or job['incremental']:
+        raise ValueError('sharded extraction covers every company. Please drop --cnpj and --incremental')
+    if job['shard'] is not None and job['command'] == 'both':
+        raise ValueError('please extract a single shard with the extract command and download after the merge')
+
+
+def run_sharded(job, workers, requests_per_second):
+    from central_balancos_py.src.shards import extract_shard, extract_sharded, merge_shards
+
+    if job['command'] == 'merge':
+        logger.info(f"Merging {job['shards']} shards into {job['worksheet']}")
+        merge_shards(job['worksheet'], job['sheet'], job['shards'], job['shard_by'], job['format'],
+                     job['partition_by'])
+    elif job['shard'] is not None:
+        logger.info(f"Extracting shard {job['shard']} of {job['shards']}")
+        extract_shard(job['worksheet'], job['shard'], job['shards'], job['shard_by'], workers, requests_per_second,
+                      cache_directory=job['cache_directory'])
+    else:
+        logger.info(f"Extracting statements to {job['worksheet']} in {job['shards']} shards")
+        extract_sharded(job['worksheet'], job['sheet'], job['shards'], job['shard_by'], job['processes'], workers,
+                        requests_per_second, output_format=job['format'], partition_by=job['partition_by'],
+                        cache_directory=job['cache_directory'])
+
+
+def run_job(job):
+    from central_balancos_py.src.client.http import DEFAULT_POOL_SIZE
+    from central_balancos_py.src.extract import build_http_client, extract_company_info, revalidation_cache, \
+        DEFAULT_REQUESTS_PER_SECOND
+    from central_balancos_py.src.pdfs import download_pdfs
+    from central_balancos_py.src.pipeline import extract_and_download
+
+    workers = job['workers']
+    download_workers = job['download_workers'] or workers
+    requests_per_second = job['requests_per_second'] or DEFAULT_REQUESTS_PER_SECOND
+    if job['shards'] is not None and job['command'] != 'download':
+        run_sharded(job, workers, requests_per_second)
+        if job['command'] != 'both':
+            return
+        job = {**job, 'command': 'download'}
+    cache = {'cache_directory': job['cache_directory']} if job['cache_directory'] else \
+        revalidation_cache(job['worksheet'], job['incremental'] and job['command'] != 'download')
+    with build_http_client(requests_per_second, pool_size=max(workers + download_workers, DEFAULT_POOL_SIZE),
+                           **cache) as http_client:
+        if job['command'] == 'both' and not job['incremental']:
+            logger.info(f"Extracting statements to {job['worksheet']} and PDFs to {job['pdfs_directory']}")
+            extract_and_download(worksheet_path=job['worksheet'],
+                                 statements_sheet_name=job['sheet'],
+                                 pdfs_directory=job['pdfs_directory'],
+                                 selected_cnpj=job['cnpj'],
+                                 statement_type=job['statement_type'],
+                                 publish_date=job['publish_date'],
+                                 cnpjs=job['cnpjs'],
+                                 published_from=job['published_from'],
+                                 published_to=job['published_to'],
+                                 max_workers=workers,
+                                 download_workers=download_workers,
+                                 http_client=http_client,
+                                 output_format=job['format'],
+                                 partition_by=job['partition_by'])
+            return
+        if job['command'] in ['extract', 'both']:
+            logger.info(f"Extracting statements to {job['worksheet']}")
+            extract_company_info(worksheet_path=job['worksheet'],
+                                 statements_sheet_name=job['sheet'],
+                                 selected_cnpj=job['cnpj'],
+                                 max_workers=workers,
+                                 http_client=http_client,
+                                 incremental=job['incremental'],
+                                 output_format=job['format'],
+                                 partition_by=job['partition_by'])
+        if job['command'] in ['download', 'both']:
+            if not os.path.exists(job['worksheet']):
+                raise KeyError(f"statements file not found at {job['worksheet']}. Run the extract command first.")
+            logger.info(f"Downloading PDFs to {job['pdfs_directory']}")
+            download_pdfs(pdfs_directory=job['pdfs_directory'],
+                          worksheet_path=job['worksheet'],
+                          statements_sheet_name=job['sheet'],
+                          statement_type=job['statement_type'],
+                          publish_date=job['publish_date'],
+                          max_workers=workers,
+                          http_client=http_client,
+                          cnpjs=job['cnpjs'],
+                          published_from=job['published_from'],
+                          published_to=job['published_to'])
+
+
+def run_cli(argv, env):
+    args = build_parser().parse_args(argv)
+    logging.getLogger().setLevel(args.log_level)
+    try:
+        run_job(resolve_job(args, env))
+    except Exception as error:
+        logger.exception(f'Job failed: {error}')
+        return 1
+    return 0
+
+
+__ALL__ = ['run_cli', 'build_parser', 'resolve_job', 'run_job']
@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+
+DEFAULT_WINDOW = 20
+DEFAULT_MIN_REQUESTS = 10
+DEFAULT_FAILURE_RATIO = 0.5
+DEFAULT_COOLDOWN = 30
+DEFAULT_PROBE_INTERVAL = 0.5
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+
+    def __init__(self, logger, window=DEFAULT_WINDOW, min_requests=DEFAULT_MIN_REQUESTS,
+                 failure_ratio=DEFAULT_FAILURE_RATIO, cooldown=DEFAULT_COOLDOWN, probe_interval=DEFAULT_PROBE_INTERVAL,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.logger = logger
+        self.outcomes = deque(maxlen=window)
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.state = CLOSED
+        self.reopen_at = None
+        self.probing = False
+        self.trips = 0
+
+    def wait(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                match self.state:
+                    case 'closed':
+                        return
+                    case 'open' if now >= self.reopen_at:
+                        self.state = HALF_OPEN
+                        self.probing = True
+                        self.logger.info('Circuit half-open, probing the server')
+                        return
+                    case 'open':
+                        delay = self.reopen_at - now
+                    case _:
+                        delay = self.probe_interval
+            self.sleep(delay)
+
+    def record(self, success):
+        with self.lock:
+            match self.state:
+                case 'half_open' if self.probing:
+                    self.probing = False
+                    if success:
+                        self._close()
+                    else:
+                        self._open()
+                case 'closed':
+                    self.outcomes.append(success)
+                    failures = self.outcomes.count(False)
+                    if len(self.outcomes) >= self.min_requests and failures / len(self.outcomes) >= self.failure_ratio:
+                        self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.reopen_at = self.clock() + self.cooldown
+        self.trips += 1
+        self.logger.warning(f'Circuit open after {self.outcomes.count(False)} failures in the last '
+                            f'{len(self.outcomes)} requests. Pausing requests for {self.cooldown} seconds')
+
+    def _close(self):
+        self.state = CLOSED
+        self.outcomes.clear()
+        self.logger.info('Circuit closed, resuming requests')
+
+
+__ALL__ = ['CircuitBreaker']
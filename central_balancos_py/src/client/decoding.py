@@ -0,0 +1,24 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DECODER = 'stdlib' if orjson is None else 'orjson'
+
+
+def loads(content):
+    if orjson is None:
+        return json.loads(content)
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return json.loads(content)
+
+
+def decode_json(response):
+    return loads(response.content)
+
+
+__ALL__ = ['decode_json', 'loads', 'DECODER']
@@ -1,5 +1,50 @@
+import time
+
 import requests
 
+TRANSIENT_STATUS_CODES = {408, 425, 429}
+
+
+def is_transient_status(status_code):
+    return status_code in TRANSIENT_STATUS_CODES or status_code >= 500
+
+
+def status_code_of(error):
+    response = getattr(error, 'response', None)
+    return None if response is None else response.status_code
+
+
+def is_retryable(error):
+    if isinstance(error, requests.exceptions.HTTPError):
+        status_code = status_code_of(error)
+        return status_code is not None and is_transient_status(status_code)
+    return isinstance(error, (requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout,
+                              requests.exceptions.ChunkedEncodingError))
+
+
+class RequestFailure:
+
+    def __init__(self, error, elapsed, attempts=1):
+        self.error = error
+        self.status_code = status_code_of(error)
+        self.retryable = is_retryable(error)
+        self.elapsed = elapsed
+        self.attempts = attempts
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        kind = 'transient' if self.retryable else 'permanent'
+        status = '' if self.status_code is None else f' {self.status_code}'
+        return (f'<RequestFailure {kind}{status} after {self.attempts} attempt(s) in {self.elapsed:.2f}s: '
+                f'{self.error}>')
+
+
+def is_failure(result):
+    return isinstance(result, RequestFailure)
+
 
 class ErrorHandler:
 
@@ -8,20 +53,30 @@ class ErrorHandler:
 
     def __call__(self, func):
         def wrapper(*args, **kwargs):
+            start = time.monotonic()
             try:
                 return func(*args, **kwargs)
             except requests.exceptions.HTTPError as http_err:
                 self.logger.error(f"HTTP error with status code {http_err.response.status_code}: {http_err}")
+                return self.failure(http_err, start)
             except requests.exceptions.ConnectionError as conn_err:
                 self.logger.error(f'Connection error occurred: {conn_err}')
+                return self.failure(conn_err, start)
             except requests.exceptions.Timeout as timeout_err:
                 self.logger.error(f'Timeout error occurred: {timeout_err}')
+                return self.failure(timeout_err, start)
             except requests.exceptions.RequestException as req_err:
                 self.logger.error(f'Request error occurred: {req_err}')
+                return self.failure(req_err, start)
             except Exception as e:
                 self.logger.error(f'An unexpected error occurred: {e}')
+                return self.failure(e, start)
 
         return wrapper
 
+    @staticmethod
+    def failure(error, start):
+        return RequestFailure(error, time.monotonic() - start, getattr(error, 'attempts', 1))
+
 
-__ALL__ = ['ErrorHandler']
+__ALL__ = ['ErrorHandler', 'RequestFailure', 'is_failure', 'is_retryable', 'is_transient_status']
@@ -1,18 +1,122 @@
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from central_balancos_py.src.client.rate_limiter import is_overloaded
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = (10, 60)
 
 
 class HttpClient:
-    def __init__(self, error_handler):
+    def __init__(self, error_handler, rate_limiter=None, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT,
+                 keep_alive=True, retry_scheduler=None, response_cache=None, circuit_breaker=None,
+                 metrics=None):
         self.error_handler = error_handler
+        self.rate_limiter = rate_limiter
+        self.retry_scheduler = retry_scheduler
+        self.response_cache = response_cache
+        self.circuit_breaker = circuit_breaker
+        self.metrics = metrics
+        self.timeout = timeout
+        self.session = self._build_session(pool_size, keep_alive)
+
+    @staticmethod
+    def _build_session(pool_size, keep_alive):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
 
-    def get(self, url, params=None):
-        decorated_get = self.error_handler(self._get)
-        return decorated_get(url, params)
+    def get(self, url, params=None, stream=False, consume=None):
+        get = self._get if self.retry_scheduler is None else self.retry_scheduler(self._get)
+        decorated_get = self.error_handler(get)
+        self._count('calls')
+        return decorated_get(url, params, stream, consume)
 
-    def _get(self, url, params):
-        response = requests.get(url, params=params)
+    def _get(self, url, params, stream=False, consume=None):
+        self._count('attempts')
+        if self.response_cache is not None and not stream:
+            response = self._cached_get(url, params)
+        else:
+            response = self._send(url, params=params, stream=stream)
+            response.raise_for_status()
+        return response if consume is None else consume(response)
+
+    def _cached_get(self, url, params):
+        cache = self.response_cache
+        entry = cache.lookup(url, params)
+        if cache.is_fresh(entry):
+            self._count('cache_hits')
+            return cache.hit(entry)
+        response = self._send(url, params=params, headers=cache.validators(entry))
+        if response.status_code == 304 and entry is not None:
+            self._count('cache_revalidated')
+            return cache.revalidate(entry)
         response.raise_for_status()
+        cache.store(url, params, response)
+        return response
+
+    def _send(self, url, **kwargs):
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.wait()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(url)
+        start = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self._observe(url, None, time.monotonic() - start)
+            raise
+        self._observe(url, response.status_code, time.monotonic() - start, self._size(response, kwargs))
         return response
 
+    def _size(self, response, kwargs):
+        if self.metrics is None or kwargs.get('stream'):
+            return 0
+        return len(response.content or b'')
+
+    def record_bytes(self, url, size):
+        if self.metrics is not None:
+            self.metrics.observe_bytes(url, size)
+
+    def _count(self, name):
+        if self.metrics is not None:
+            self.metrics.count(name)
+
+    def _observe(self, url, status_code, latency, size=0):
+        if self.metrics is not None:
+            self.metrics.observe_request(url, status_code, latency, size)
+        if self.rate_limiter is not None:
+            self.rate_limiter.observe(url, status_code, latency)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(not is_overloaded(status_code))
+
+    def connection_stats(self):
+        pools = [adapter.poolmanager.pools[key]
+                 for adapter in set(self.session.adapters.values())
+                 for key in adapter.poolmanager.pools.keys()]
+        requests_sent = sum(pool.num_requests for pool in pools)
+        connections = sum(pool.num_connections for pool in pools)
+        return {'requests': requests_sent,
+                'connections': connections,
+                'reused': max(requests_sent - connections, 0)}
+
+    def cache_stats(self):
+        return None if self.response_cache is None else self.response_cache.stats()
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
 
 __ALL__ = ['HttpClient']
@@ -0,0 +1,84 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+DEFAULT_MAX_REQUESTS_PER_SECOND = 50
+DEFAULT_MIN_REQUESTS_PER_SECOND = 0.5
+DEFAULT_LATENCY_TARGET = 5
+DEFAULT_BURST = 5
+
+
+def is_overloaded(status_code):
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+class TokenBucket:
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = now
+        self.decreased_at = None
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self, now):
+        self.refill(now)
+        self.tokens -= 1
+        return max(-self.tokens, 0) / self.rate
+
+
+class AdaptiveRateLimiter:
+
+    def __init__(self, requests_per_second, min_rate=DEFAULT_MIN_REQUESTS_PER_SECOND,
+                 max_rate=DEFAULT_MAX_REQUESTS_PER_SECOND, increase=1, decrease=0.5,
+                 latency_target=DEFAULT_LATENCY_TARGET, burst=DEFAULT_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.initial_rate = requests_per_second
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, requests_per_second or 0)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.buckets = {}
+
+    def _bucket(self, url, now):
+        host = urlparse(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.initial_rate, self.burst, now)
+        return self.buckets[host]
+
+    def acquire(self, url):
+        if not self.initial_rate:
+            return
+        with self.lock:
+            delay = self._bucket(url, self.clock()).reserve(self.clock())
+        if delay > 0:
+            self.sleep(delay)
+
+    def observe(self, url, status_code, latency):
+        if not self.initial_rate:
+            return
+        with self.lock:
+            now = self.clock()
+            bucket = self._bucket(url, now)
+            bucket.refill(now)
+            if is_overloaded(status_code) or (self.latency_target and latency > self.latency_target):
+                if bucket.decreased_at is None or now - bucket.decreased_at >= 1 / bucket.rate:
+                    bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+                    bucket.decreased_at = now
+            else:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase / bucket.rate)
+
+    def rates(self):
+        with self.lock:
+            return {host: bucket.rate for host, bucket in self.buckets.items()}
+
+
+__ALL__ = ['AdaptiveRateLimiter', 'is_overloaded']
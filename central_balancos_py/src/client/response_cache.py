@@ -0,0 +1,162 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+ENTRY_SUFFIX = '.response'
+CACHED_HEADERS = ['Content-Type', 'ETag', 'Last-Modified']
+
+
+def cache_key(url, params=None):
+    query = sorted((str(key), str(value)) for key, value in (params or {}).items())
+    return hashlib.sha256(repr((url, query)).encode()).hexdigest()
+
+
+def to_response(entry):
+    response = requests.Response()
+    response.status_code = entry['status_code']
+    response.reason = entry['reason']
+    response.url = entry['url']
+    response.encoding = entry['encoding']
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response._content = entry['content']
+    return response
+
+
+class ResponseCache:
+
+    def __init__(self, directory, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, clock=time.time):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'revalidated': 0, 'evictions': 0}
+        os.makedirs(directory, exist_ok=True)
+        self.sizes = self._scan()
+        self.used = sum(self.sizes.values())
+
+    def _scan(self):
+        entries = [entry for entry in os.scandir(self.directory)
+                   if entry.is_file() and entry.name.endswith(ENTRY_SUFFIX)]
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        return OrderedDict((entry.name[:-len(ENTRY_SUFFIX)], entry.stat().st_size) for entry in entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}{ENTRY_SUFFIX}')
+
+    def lookup(self, url, params=None):
+        key = cache_key(url, params)
+        try:
+            with open(self._path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+
+    def is_fresh(self, entry):
+        return entry is not None and self.clock() - entry['stored_at'] < self.ttl
+
+    @staticmethod
+    def validators(entry):
+        if entry is None:
+            return {}
+        headers = {}
+        if 'ETag' in entry['headers']:
+            headers['If-None-Match'] = entry['headers']['ETag']
+        if 'Last-Modified' in entry['headers']:
+            headers['If-Modified-Since'] = entry['headers']['Last-Modified']
+        return headers
+
+    def hit(self, entry):
+        self._touch(entry['key'])
+        self._count('hits')
+        return to_response(entry)
+
+    def revalidate(self, entry):
+        self._write({**entry, 'stored_at': self.clock()})
+        self._count('revalidated')
+        return to_response(entry)
+
+    def store(self, url, params, response):
+        self._count('misses')
+        if response.status_code != 200:
+            return
+        headers = {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers}
+        self._write({'key': cache_key(url, params),
+                     'url': response.url,
+                     'status_code': response.status_code,
+                     'reason': response.reason,
+                     'encoding': response.encoding,
+                     'headers': headers,
+                     'content': response.content,
+                     'stored_at': self.clock()})
+
+    def _count(self, counter):
+        with self.lock:
+            self.counters[counter] += 1
+
+    def _touch(self, key):
+        with self.lock:
+            if key in self.sizes:
+                self.sizes.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    def _write(self, entry):
+        key = entry['key']
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        with self.lock:
+            self.used += size - self.sizes.pop(key, 0)
+            self.sizes[key] = size
+            self._evict()
+
+    def _evict(self):
+        while self.used > self.max_bytes and len(self.sizes) > 1:
+            key, size = self.sizes.popitem(last=False)
+            self.used -= size
+            self.counters['evictions'] += 1
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            requests_seen = self.counters['hits'] + self.counters['revalidated'] + self.counters['misses']
+            served = self.counters['hits'] + self.counters['revalidated']
+            return {**self.counters,
+                    'entries': len(self.sizes),
+                    'bytes': self.used,
+                    'hit_rate': served / requests_seen if requests_seen else 0.0}
+
+    def clear(self):
+        with self.lock:
+            for key in self.sizes:
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+            self.sizes.clear()
+            self.used = 0
+
+
+__ALL__ = ['ResponseCache', 'cache_key', 'DEFAULT_TTL', 'DEFAULT_MAX_BYTES']
@@ -0,0 +1,70 @@
+import email.utils
+import random
+import time
+from datetime import datetime, timezone
+
+from central_balancos_py.src.client.error_handler import is_retryable
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_DELAY = 1
+DEFAULT_MAX_DELAY = 60
+
+
+def parse_retry_after(value):
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class RetryScheduler:
+
+    def __init__(self, logger, max_retries=DEFAULT_MAX_RETRIES, base_delay=DEFAULT_BASE_DELAY,
+                 max_delay=DEFAULT_MAX_DELAY, sleep=time.sleep):
+        self.logger = logger
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def delay(self, attempt, error):
+        backoff = self.backoff(attempt)
+        response = getattr(error, 'response', None)
+        if response is None:
+            return backoff
+        retry_after = parse_retry_after(response.headers.get('Retry-After'))
+        return backoff if retry_after is None else max(retry_after, backoff)
+
+    @staticmethod
+    def is_retryable(error):
+        return is_retryable(error)
+
+    def __call__(self, func):
+        def wrapper(*args, **kwargs):
+            attempt = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as error:
+                    if attempt >= self.max_retries or not self.is_retryable(error):
+                        error.attempts = attempt + 1
+                        raise
+                    delay = self.delay(attempt, error)
+                    attempt += 1
+                    self.logger.warning(f'Attempt {attempt} failed ({error}). Retrying in {delay:.2f} seconds')
+                    self.sleep(delay)
+
+        return wrapper
+
+
+__ALL__ = ['RetryScheduler', 'parse_retry_after']
@@ -0,0 +1,103 @@
+from array import array
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+from central_balancos_py.src.constants import ROW_COLUMNS
+from central_balancos_py.src.records import PDF_URL
+
+
+def sort_key(value):
+    return value is None, value or ''
+
+
+class DictionaryColumn:
+
+    def __init__(self):
+        self.codes = array('q')
+        self.lookup = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def values(self):
+        return list(self.lookup)
+
+    def append(self, value):
+        self.codes.append(self.lookup.setdefault(value, len(self.lookup)))
+
+    def code_array(self):
+        return np.frombuffer(self.codes, dtype=np.int64)
+
+    def object_values(self):
+        values = np.empty(len(self.lookup), dtype=object)
+        values[:] = self.values
+        return values
+
+    def ranks(self):
+        values = self.object_values()
+        try:
+            order = values.argsort(kind='stable')
+        except TypeError:
+            order = sorted(range(len(values)), key=lambda code: sort_key(values[code]))
+        ranks = np.empty(len(values), dtype=np.int64)
+        ranks[order] = np.arange(len(values))
+        return ranks[self.code_array()]
+
+    def take(self, positions):
+        return self.object_values()[self.code_array()[positions]]
+
+
+class UrlColumn:
+
+    def __init__(self):
+        self.ids = array('q')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append_id(self, statement_id):
+        self.ids.append(statement_id)
+
+    def take(self, positions):
+        ids = np.frombuffer(self.ids, dtype=np.int64)[positions]
+        urls = np.empty(len(ids), dtype=object)
+        urls[:] = [f'{PDF_URL}/{statement_id}' for statement_id in ids.tolist()]
+        return urls
+
+
+class StatementColumns:
+
+    def __init__(self):
+        self.columns = {name: DictionaryColumn() for name in ROW_COLUMNS if name != 'pdf'}
+        self.encoders = [(column.codes.append, column.lookup) for column in self.columns.values()]
+        self.fields = attrgetter(*self.columns)
+        self.columns['pdf'] = UrlColumn()
+        self.append_id = self.columns['pdf'].append_id
+
+    def __len__(self):
+        return len(self.columns['pdf'])
+
+    def append(self, row):
+        for (append_code, lookup), value in zip(self.encoders, self.fields(row)):
+            append_code(lookup.setdefault(value, len(lookup)))
+        self.append_id(row.statement_id)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+        return self
+
+    def sorted_positions(self, sort_by):
+        if len(self) == 0 or not sort_by:
+            return np.arange(len(self))
+        return np.lexsort([self.columns[name].ranks() for name in reversed(sort_by)])
+
+    def to_frame(self, sort_by=None):
+        positions = self.sorted_positions(sort_by)
+        return pd.DataFrame({name: self.columns[name].take(positions) for name in ROW_COLUMNS}, columns=ROW_COLUMNS)
+
+
+__ALL__ = ['StatementColumns', 'DictionaryColumn', 'UrlColumn']
@@ -0,0 +1,100 @@
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 8
+STOP = object()
+
+
+def ordered_map(func, items, max_workers=DEFAULT_MAX_WORKERS, window=None, gauge=None):
+    window = window or max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if gauge is not None:
+                gauge(len(pending))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            if gauge is not None:
+                gauge(len(pending))
+            yield pending.popleft().result()
+
+
+def prefetch(items, buffer_size, gauge=None):
+    buffer = queue.Queue(maxsize=buffer_size)
+
+    def produce():
+        try:
+            for item in items:
+                buffer.put((True, item))
+            buffer.put((False, None))
+        except Exception as error:
+            buffer.put((False, error))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        if gauge is not None:
+            gauge(buffer.qsize())
+        has_item, value = buffer.get()
+        if has_item:
+            yield value
+        elif value is None:
+            return
+        else:
+            raise value
+
+
+class WorkQueue:
+
+    def __init__(self, func, workers=DEFAULT_MAX_WORKERS, queue_size=None, gauge=None):
+        self.func = func
+        self.items = queue.Queue(maxsize=queue_size or workers * 2)
+        self.gauge = gauge
+        self.lock = threading.Lock()
+        self.results = []
+        self.errors = []
+        self.joined = False
+        self.threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            item = self.items.get()
+            if item is STOP:
+                return
+            try:
+                result = self.func(item)
+            except Exception as error:
+                with self.lock:
+                    self.errors.append(error)
+            else:
+                with self.lock:
+                    self.results.append(result)
+
+    def put(self, item):
+        self.items.put(item)
+        if self.gauge is not None:
+            self.gauge(self.items.qsize())
+
+    def join(self):
+        if self.joined:
+            return self.results
+        self.joined = True
+        for _ in self.threads:
+            self.items.put(STOP)
+        for thread in self.threads:
+            thread.join()
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.join()
+
+
+__ALL__ = ['ordered_map', 'prefetch', 'WorkQueue', 'DEFAULT_MAX_WORKERS']
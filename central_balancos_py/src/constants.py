@@ -1 +1,3 @@
 STATEMENTS_FILE_NAME = 'demonstracoes.xlsx'
+ROW_COLUMNS = ['nomeParticipante', 'cnpj', 'tipoDemonstracao', 'status', 'dataFim', 'dataPublicacao', 'pdf']
+INDEX_COLUMNS = ['nomeParticipante', 'tipoDemonstracao', 'dataPublicacao']
@@ -1,12 +1,26 @@
+import hashlib
+import json
 import logging
 import os
-import time
 
-import pandas as pd
 import requests
 
-from central_balancos_py.src.client.error_handler import ErrorHandler
-from central_balancos_py.src.client.http import HttpClient
+from central_balancos_py.src.checkpoint import CheckpointJournal, checkpoint_path
+from central_balancos_py.src.client.error_handler import ErrorHandler, is_failure
+from central_balancos_py.src.client.http import HttpClient, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT
+from central_balancos_py.src.client.circuit_breaker import CircuitBreaker
+from central_balancos_py.src.client.decoding import decode_json
+from central_balancos_py.src.client.rate_limiter import AdaptiveRateLimiter, DEFAULT_MAX_REQUESTS_PER_SECOND
+from central_balancos_py.src.client.response_cache import ResponseCache, DEFAULT_TTL
+from central_balancos_py.src.client.retry import RetryScheduler
+from central_balancos_py.src.columnar import StatementColumns
+from central_balancos_py.src.concurrency import ordered_map, prefetch, DEFAULT_MAX_WORKERS
+from central_balancos_py.src.constants import ROW_COLUMNS, INDEX_COLUMNS
+from central_balancos_py.src.metrics import Metrics, MetricsReporter, queue_gauge, report
+from central_balancos_py.src.output import write_statements, read_statements, check_output
+from central_balancos_py.src.records import Company, StatementRow
+from central_balancos_py.src.state import StateStore, state_path
+from central_balancos_py.src.statement_index import build_index, index_path
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
@@ -14,7 +28,10 @@ logging.basicConfig(level=logging.INFO,
 logger = logging.getLogger(__name__)
 
 MAX_RETRIES = 3
-PAGE_SIZE = 10000
+PAGE_SIZE = 100
+COMPANIES_PAGE_SIZE = 1000
+DEFAULT_REQUESTS_PER_SECOND = 10
+LISTED_FAILURES = 20
 
 
 def url_list(page, page_size, selected_cnpj):
@@ -32,107 +49,236 @@ def url_company(company_id, page, page_size):
            f"/{company_id}/0/0?page={page}&pageSize={page_size}"
 
 
-def url_pdf(company_id):
-    return "https://centraldebalancos.estaleiro.serpro.gov.br" \
-           f"/centralbalancos/servicesapi/api/Demonstracao/pdf/{company_id}"
-
-
 def extract_row(statement, cnpj):
-    return {
-        'nomeParticipante': statement['nomeParticipante'],
-        'cnpj': cnpj,
-        'tipoDemonstracao': statement['tipoDemonstracao'],
-        'status': statement['status'],
-        'dataFim': statement['dataFim'],
-        'dataPublicacao': statement['dataPublicacao'],
-        'pdf': url_pdf(statement['id'])
-    }
-
-
-def fetch_companies(http_client, selected_cnpj):
-    url = url_list(1, PAGE_SIZE, selected_cnpj)
-    response = http_client.get(url)
-    if response is None:
-        raise requests.HTTPError('Failed to fetch companies')
-    return response.json()['items']
-
-
-def try_parse_statement(company, http_client):
-    logger.info(f"--- Extracting {company['nome']}...")
-
-    url = url_company(company['id'], 1, PAGE_SIZE)
-    res = http_client.get(url)
-    if res is None:
-        logger.error(f"Failed to extract {company['nome']}. Queueing for retry.")
-        return
+    return StatementRow.from_statement(statement, cnpj)
+
+
+def is_last_page(body, page_size, fetched):
+    total_count = body.get('totalCount')
+    return len(body['items']) < page_size or (total_count is not None and fetched >= total_count)
+
+
+def fetch_companies_page(http_client, page, page_size, selected_cnpj):
+    response = http_client.get(url_list(page, page_size, selected_cnpj))
+    if is_failure(response):
+        raise requests.HTTPError(f'Failed to fetch companies (page {page}): {response!r}')
+    return decode_json(response)
+
+
+def fetch_companies(http_client, selected_cnpj, page_size=COMPANIES_PAGE_SIZE):
+    page = 1
+    fetched = 0
+    while True:
+        body = fetch_companies_page(http_client, page, page_size, selected_cnpj)
+        items = body['items']
+        yield from map(Company.from_json, items)
+        fetched += len(items)
+        if selected_cnpj is not None or is_last_page(body, page_size, fetched):
+            logger.info(f'Fetched {fetched} companies in {page} page(s)')
+            return
+        page += 1
+
+
+def fetch_statements(company, http_client, page_size=PAGE_SIZE):
+    statements = []
+    page = 1
+    while True:
+        res = http_client.get(url_company(company.id, page, page_size))
+        if is_failure(res):
+            logger.error(f"Failed to extract {company.nome} (page {page}): {res!r}")
+            return res
+
+        body = decode_json(res)
+        statements.extend(body['items'])
+        if is_last_page(body, page_size, len(statements)):
+            return statements
+        page += 1
+
+
+def statements_watermark(statements):
+    ordered = sorted(statements, key=lambda statement: statement['id'])
+    digest = hashlib.sha256(json.dumps(ordered, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+    return {'totalCount': len(statements), 'digest': digest}
+
+
+def try_parse_statement(company, http_client, page_size=PAGE_SIZE, state=None):
+    logger.info(f"--- Extracting {company.nome}...")
+
+    statements = fetch_statements(company, http_client, page_size)
+    if is_failure(statements):
+        return statements
+    if state is not None:
+        state.update(company, statements_watermark(statements))
+    return [extract_row(statement, company.cnpj) for statement in statements]
+
+
+def parse_with_checkpoint(company, http_client, journal, state=None):
+    if journal is None:
+        return try_parse_statement(company, http_client, state=state)
+    if company in journal:
+        return journal.get(company)
+    rows = try_parse_statement(company, http_client, state=state)
+    if not is_failure(rows):
+        journal.record(company, rows)
+    return rows
 
-    cnpj = company['cnpj'].replace('[^0-9]', '')
-    statements = res.json()['items']
-    for statement in statements:
-        return extract_row(statement, cnpj)
 
+def iter_statements(companies, http_client, max_workers=DEFAULT_MAX_WORKERS, journal=None, failed=None, state=None):
+    parsed = ordered_map(lambda company: (company, parse_with_checkpoint(company, http_client, journal, state)),
+                         companies, max_workers, gauge=queue_gauge(http_client.metrics, 'statements_pending'))
+    for company, rows in parsed:
+        if not is_failure(rows):
+            yield from rows
+        elif failed is not None:
+            failed.append((company, rows))
 
-def retry_delay(retry_count):
-    return 2 ** retry_count
 
+def parse_statements(companies, http_client, max_workers=DEFAULT_MAX_WORKERS, journal=None, failed=None):
+    return list(iter_statements(companies, http_client, max_workers, journal, failed))
 
-def maybe_retry_parse(retry_queue, http_client, retry_count):
-    should_retry = len(retry_queue) > 0 and retry_count < MAX_RETRIES
-    if should_retry:
-        delay = retry_delay(retry_count)
-        logger.info(f'Retrying parse in {delay} seconds')
-        time.sleep(delay)
-        return parse_statements(retry_queue, http_client, retry_count + 1)
-    return []
 
+def list_companies(companies):
+    names = ', '.join(f'{company.nome} ({company.cnpj})' for company in companies[:LISTED_FAILURES])
+    more = f' and {len(companies) - LISTED_FAILURES} more' if len(companies) > LISTED_FAILURES else ''
+    return f'{names}{more}'
 
-def parse_statements(companies, http_client, retry_count=0):
-    rows = []
-    retry_queue = []
 
-    for company in companies:
-        row = try_parse_statement(company, http_client)
-        if row is None:
-            retry_queue.append(company)
+def check_failures(failed):
+    dropped = [company for company, failure in failed if not failure.retryable]
+    if dropped:
+        logger.warning(f'{len(dropped)} companies were left out after a permanent error: {list_companies(dropped)}')
+    retryable = [company for company, failure in failed if failure.retryable]
+    if len(retryable) == 0:
+        return
+    logger.error(f'{len(retryable)} companies failed after {MAX_RETRIES} retries and were left out: '
+                 f'{list_companies(retryable)}. Re-run to extract them')
+    raise RuntimeError(f'{len(retryable)} companies failed to extract')
+
+
+def probe_company(company, http_client):
+    statements = fetch_statements(company, http_client)
+    if is_failure(statements):
+        return None, statements
+    return statements_watermark(statements), [extract_row(statement, company.cnpj) for statement in statements]
+
+
+def select_changed(companies, http_client, state, max_workers=DEFAULT_MAX_WORKERS, failed=None):
+    changed = []
+    new_rows = []
+    probed = 0
+    probes = ordered_map(lambda company: (company, probe_company(company, http_client)), companies, max_workers)
+    for company, (watermark, rows) in probes:
+        probed += 1
+        if is_failure(rows):
+            if failed is not None:
+                failed.append((company, rows))
+            continue
+        if watermark == state.get(company):
             continue
-        rows.append(row)
+        changed.append(company)
+        new_rows.extend(rows)
+        state.update(company, watermark)
+    logger.info(f'{len(changed)} of {probed} companies changed since the last extraction')
+    return changed, new_rows
 
-    recovered = maybe_retry_parse(retry_queue, http_client, retry_count)
-    rows.extend(recovered)
 
-    return rows
+def read_existing_rows(worksheet_path, statements_sheet_name, output_format=None):
+    if not os.path.exists(worksheet_path):
+        return []
+    existing = read_statements(worksheet_path, statements_sheet_name, output_format)
+    return [StatementRow.from_dict(row) for row in existing[ROW_COLUMNS].astype({'cnpj': 'str'}).to_dict('records')]
 
 
-def transpose(rows):
-    transposed = {k: [] for k in rows[0].keys()}
-    for row in rows:
-        for k, v in row.items():
-            transposed[k].append(v)
-    return transposed
+def merge_rows(existing_rows, new_rows):
+    refreshed_cnpjs = {row.cnpj for row in new_rows}
+    kept = [row for row in existing_rows if row.cnpj not in refreshed_cnpjs]
+    return kept + new_rows
 
 
 def to_df(rows):
-    transposed_dict = transpose(rows)
-    return (pd.DataFrame(data=transposed_dict)
+    columns = StatementColumns().extend(rows)
+    return (columns.to_frame(sort_by=INDEX_COLUMNS)
             .astype({'cnpj': 'str'})
-            .set_index(['nomeParticipante', 'tipoDemonstracao', 'dataPublicacao'])
-            .sort_values(by=['nomeParticipante', 'tipoDemonstracao', 'dataPublicacao']))
-
-
-def to_excel(df, path, sheet_name):
-    folder = os.path.dirname(path)
-    os.makedirs(folder, exist_ok=True)
-
-    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
-        df.to_excel(writer, sheet_name=sheet_name)
-        worksheet = writer.sheets[sheet_name]
-        worksheet.autofit()
-
-
-def extract_company_info(worksheet_path, statements_sheet_name, selected_cnpj=None):
-    http_client = HttpClient(error_handler=ErrorHandler(logger=logger))
-    selected_cnpj = None if selected_cnpj is None else int(selected_cnpj)
-    companies = fetch_companies(http_client, selected_cnpj)
-    statements = parse_statements(companies, http_client)
-    df = to_df(statements)
-    to_excel(df, path=worksheet_path, sheet_name=statements_sheet_name)
+            .set_index(INDEX_COLUMNS))
+
+
+def build_http_client(requests_per_second=DEFAULT_REQUESTS_PER_SECOND, pool_size=DEFAULT_POOL_SIZE,
+                      timeout=DEFAULT_TIMEOUT, keep_alive=True, cache_directory=None, cache_ttl=DEFAULT_TTL,
+                      max_requests_per_second=DEFAULT_MAX_REQUESTS_PER_SECOND):
+    response_cache = None if cache_directory is None else ResponseCache(cache_directory, ttl=cache_ttl)
+    return HttpClient(error_handler=ErrorHandler(logger=logger),
+                      rate_limiter=AdaptiveRateLimiter(requests_per_second, max_rate=max_requests_per_second),
+                      pool_size=pool_size,
+                      timeout=timeout,
+                      keep_alive=keep_alive,
+                      retry_scheduler=RetryScheduler(logger=logger, max_retries=MAX_RETRIES),
+                      response_cache=response_cache,
+                      circuit_breaker=CircuitBreaker(logger=logger),
+                      metrics=Metrics())
+
+
+def revalidation_cache(worksheet_path, incremental):
+    if not incremental:
+        return {}
+    return {'cache_directory': f'{worksheet_path}.http_cache', 'cache_ttl': 0}
+
+
+def extract_company_info(worksheet_path, statements_sheet_name, selected_cnpj=None,
+                         max_workers=DEFAULT_MAX_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                         http_client=None, journal_path=None, incremental=False,
+                         companies_page_size=COMPANIES_PAGE_SIZE, output_format=None, partition_by=None,
+                         statement_index=True, metrics_path=None):
+    output_format = check_output(worksheet_path, output_format, partition_by)
+    if incremental and not os.path.exists(worksheet_path):
+        logger.info(f'{worksheet_path} not found. Extracting every company instead of only the changed ones.')
+        incremental = False
+    owns_client = http_client is None
+    http_client = http_client or build_http_client(requests_per_second, pool_size=max(max_workers, DEFAULT_POOL_SIZE),
+                                                   **revalidation_cache(worksheet_path, incremental))
+    metrics = http_client.metrics
+    if metrics is not None:
+        metrics.reset()
+    try:
+        selected_cnpj = None if selected_cnpj is None else int(selected_cnpj)
+        journal = None
+        if not incremental:
+            journal = CheckpointJournal(journal_path or checkpoint_path(worksheet_path, selected_cnpj))
+        state = StateStore(state_path(worksheet_path))
+        failed = []
+        with MetricsReporter(metrics, logger):
+            companies = prefetch(fetch_companies(http_client, selected_cnpj, companies_page_size),
+                                 buffer_size=companies_page_size, gauge=queue_gauge(metrics, 'companies_buffer'))
+            if incremental:
+                df = extract_incrementally(companies, http_client, worksheet_path, statements_sheet_name,
+                                           max_workers, state, output_format, partition_by, failed)
+            else:
+                state.reset()
+                df = to_df(iter_statements(companies, http_client, max_workers=max_workers, journal=journal,
+                                           failed=failed, state=state))
+                write_statements(df, worksheet_path, statements_sheet_name, output_format, partition_by)
+                state.save()
+        if statement_index and df is not None:
+            build_index(df, index_path(worksheet_path), worksheet_path)
+        logger.info(f'Connection stats: {http_client.connection_stats()}')
+        if http_client.cache_stats() is not None:
+            logger.info(f'Cache stats: {http_client.cache_stats()}')
+        report(metrics, metrics_path or f'{worksheet_path}.metrics.json', logger)
+        check_failures(failed)
+        if journal is not None:
+            journal.clear()
+    finally:
+        if owns_client:
+            http_client.close()
+
+
+def extract_incrementally(companies, http_client, worksheet_path, statements_sheet_name, max_workers, state,
+                          output_format=None, partition_by=None, failed=None):
+    changed, new_rows = select_changed(companies, http_client, state, max_workers, failed)
+    if len(changed) == 0:
+        logger.info(f'No new statements. {worksheet_path} is up to date.')
+        return
+    rows = merge_rows(read_existing_rows(worksheet_path, statements_sheet_name, output_format), new_rows)
+    df = to_df(rows)
+    write_statements(df, worksheet_path, statements_sheet_name, output_format, partition_by)
+    state.save()
+    return df
@@ -2,9 +2,8 @@ import logging
 import os
 import re
 import sys
+import threading
 
-from central_balancos_py.src.extract import extract_company_info
-from central_balancos_py.src.pdfs import download_pdfs
 from central_balancos_py.src.constants import STATEMENTS_FILE_NAME
 
 green = "\x1b[32m"
@@ -81,23 +80,30 @@ def prompt_cnpj():
         raise ValueError(f'please input a valid number. "{selected_cnpj}" provided')
 
 
-def maybe_download_pdfs(env):
+def maybe_download_pdfs(env, http_client=None):
     download_now = input(
         '====== Extracted ======\nWould you like to download PDFs for all extracted documents now? [Y/n]')
     if download_now in ['', 'Y', 'y']:
-        handle_download(env)
+        handle_download(env, http_client)
 
 
 def handle_extraction(env):
+    from central_balancos_py.src.extract import extract_company_info, build_http_client
+
     selected_cnpj = prompt_cnpj()
     logger.info('Extracting company info...\nThe worksheet will be available at '
                 f"{env['worksheet_path']}.")
-    extract_company_info(
-        worksheet_path=env['worksheet_path'],
-        statements_sheet_name=env['statements_sheet_name'],
-        selected_cnpj=selected_cnpj
-    )
-    maybe_download_pdfs(env)
+    with build_http_client() as http_client:
+        try:
+            extract_company_info(
+                worksheet_path=env['worksheet_path'],
+                statements_sheet_name=env['statements_sheet_name'],
+                selected_cnpj=selected_cnpj,
+                http_client=http_client
+            )
+        except RuntimeError as error:
+            logger.error(f'{error}. The worksheet was saved without them; extract again later to fill them in.')
+        maybe_download_pdfs(env, http_client)
 
 
 def ensure_statement_file_exists(env):
@@ -120,22 +126,34 @@ def prompt_download_instructions():
           f"you would like to download PDFs from. Hit Enter when you're ready.\n")
 
 
-def handle_download(env):
+def handle_download(env, http_client=None):
+    from central_balancos_py.src.pdfs import download_pdfs
+
     ensure_statement_file_exists(env)
     prompt_download_instructions()
     statement_type = prompt_statement_type()
     publish_date = prompt_publish_date()
     logger.info('Downloading PDFs...\n'
                 f"The files will be available at {env['pdfs_directory']} "
-                f'and will follow the naming convention <company_name>_<statement_type>_<publish_date>')
+                f'and will follow the naming convention <company_name>_<statement_type>_<publish_date>_<statement_id>')
     download_pdfs(pdfs_directory=env['pdfs_directory'],
                   worksheet_path=env['worksheet_path'],
                   statements_sheet_name=env['statements_sheet_name'],
                   statement_type=statement_type,
-                  publish_date=publish_date)
+                  publish_date=publish_date,
+                  http_client=http_client)
+
+
+def preload():
+    def load():
+        import central_balancos_py.src.extract  # noqa: F401
+        import central_balancos_py.src.pdfs  # noqa: F401
+
+    threading.Thread(target=load, daemon=True).start()
 
 
 def run():
+    preload()
     env = config()
     selection = input('================= CENTRAL BALANCOS =================\n\n'
                       'Please choose one of the following options:\n'
@@ -150,5 +168,17 @@ def run():
             logger.warning('please enter a valid option (1 or 2)')
 
 
+def start(argv):
+    if len(argv) == 0:
+        run()
+        return 0
+    from central_balancos_py.src.cli import run_cli
+
+    return run_cli(argv, config())
+
+
 if __name__ == '__main__':
-    run()
+    from multiprocessing import freeze_support
+
+    freeze_support()
+    sys.exit(start(sys.argv[1:]))
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from central_balancos_py.src.records import pdf_id
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = '.manifest.jsonl'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+
+    def __init__(self, pdfs_directory):
+        self.path = os.path.join(pdfs_directory, MANIFEST_FILE_NAME)
+        self.lock = threading.Lock()
+        self.entries = self._load()
+        self.owners = {entry['file']: url for url, entry in self.entries.items()}
+
+    def _load(self):
+        entries = {}
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f'Skipping truncated manifest entry in {self.path}')
+                    continue
+                entries[entry['url']] = entry
+        return entries
+
+    def claim(self, url, path):
+        file_name = os.path.basename(path)
+        with self.lock:
+            owner = self.owners.setdefault(file_name, url)
+        if owner != url:
+            raise FileExistsError(f'{file_name} is claimed by both {owner} and {url}')
+
+    def is_valid(self, url, path):
+        entry = self.entries.get(url)
+        if entry is None or entry['file'] != os.path.basename(path) or not os.path.exists(path):
+            return False
+        if os.path.getsize(path) != entry['size']:
+            return False
+        return file_digest(path) == entry['sha256']
+
+    def record(self, url, path, size, sha256):
+        entry = {'id': pdf_id(url), 'url': url, 'file': os.path.basename(path), 'size': size, 'sha256': sha256}
+        line = json.dumps(entry, ensure_ascii=False)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.entries[url] = entry
+            self.owners[entry['file']] = url
+
+
+__ALL__ = ['Manifest', 'file_digest', 'MANIFEST_FILE_NAME']
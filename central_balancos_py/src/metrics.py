@@ -0,0 +1,180 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+LATENCY_BUCKETS = [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+DEFAULT_REPORT_INTERVAL = 30
+ENDPOINTS = ['Participante', 'Demonstracao', 'pdf']
+
+
+def endpoint_of(url):
+    segments = urlparse(url).path.split('/')
+    if 'pdf' in segments:
+        return 'pdf'
+    for endpoint in ENDPOINTS:
+        if endpoint in segments:
+            return endpoint
+    return 'other'
+
+
+class LatencyHistogram:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, latency):
+        self.counts[bisect.bisect_left(self.buckets, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count > 0:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        bounds = [f'<={bound}s' for bound in self.buckets] + [f'>{self.buckets[-1]}s']
+        return {'count': self.count,
+                'mean': self.total / self.count if self.count else None,
+                'p50': self.quantile(0.5),
+                'p95': self.quantile(0.95),
+                'p99': self.quantile(0.99),
+                'max': self.max,
+                'buckets': dict(zip(bounds, self.counts))}
+
+
+class Metrics:
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started_at = self.clock()
+            self.latencies = {}
+            self.statuses = {}
+            self.bytes = {}
+            self.counters = {'calls': 0, 'attempts': 0, 'cache_hits': 0, 'cache_revalidated': 0}
+            self.gauges = {}
+
+    def observe_request(self, url, status_code, latency, size=0):
+        endpoint = endpoint_of(url)
+        with self.lock:
+            self.latencies.setdefault(endpoint, LatencyHistogram()).observe(latency)
+            statuses = self.statuses.setdefault(endpoint, {})
+            status = 'error' if status_code is None else str(status_code)
+            statuses[status] = statuses.get(status, 0) + 1
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + size
+
+    def observe_bytes(self, url, size):
+        endpoint = endpoint_of(url)
+        with self.lock:
+            self.bytes[endpoint] = self.bytes.get(endpoint, 0) + size
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name):
+        def update(value):
+            with self.lock:
+                current = self.gauges.setdefault(name, {'current': 0, 'max': 0})
+                current['current'] = value
+                current['max'] = max(current['max'], value)
+
+        return update
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = self.clock() - self.started_at
+            requests_sent = sum(histogram.count for histogram in self.latencies.values())
+            return {'elapsed_seconds': elapsed,
+                    'requests': requests_sent,
+                    'requests_per_second': requests_sent / elapsed if elapsed > 0 else 0.0,
+                    'bytes': sum(self.bytes.values()),
+                    'retries': max(self.counters['attempts'] - self.counters['calls'], 0),
+                    'cache': {'hits': self.counters['cache_hits'],
+                              'revalidated': self.counters['cache_revalidated']},
+                    'endpoints': {endpoint: {**histogram.to_dict(),
+                                             'statuses': dict(self.statuses[endpoint]),
+                                             'bytes': self.bytes.get(endpoint, 0)}
+                                  for endpoint, histogram in self.latencies.items()},
+                    'queues': {name: dict(values) for name, values in self.gauges.items()},
+                    'counters': dict(self.counters)}
+
+    def summary(self):
+        snapshot = self.snapshot()
+        latencies = ', '.join(f"{endpoint} p50={values['p50']}s p95={values['p95']}s"
+                              for endpoint, values in snapshot['endpoints'].items())
+        queues = ', '.join(f"{name}={values['current']}" for name, values in snapshot['queues'].items())
+        return (f"{snapshot['requests']} requests ({snapshot['requests_per_second']:.1f}/s), "
+                f"{snapshot['bytes'] / 1024 / 1024:.1f}MB, {snapshot['retries']} retries, "
+                f"{snapshot['cache']['hits']} cache hits. Latency: {latencies or '-'}. Queues: {queues or '-'}")
+
+    def write(self, path):
+        folder = os.path.dirname(path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+class MetricsReporter:
+
+    def __init__(self, metrics, logger, interval=DEFAULT_REPORT_INTERVAL):
+        self.metrics = metrics
+        self.logger = logger
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.logger.info(f'Metrics: {self.metrics.summary()}')
+
+    def __enter__(self):
+        if self.metrics is not None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        return self
+
+    def __exit__(self, *_args):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+
+def queue_gauge(metrics, name):
+    return None if metrics is None else metrics.gauge(name)
+
+
+def report(metrics, path, logger):
+    if metrics is None:
+        return
+    metrics.write(path)
+    logger.info(f'Metrics: {metrics.summary()}. Full report at {path}')
+
+
+__ALL__ = ['Metrics', 'MetricsReporter', 'LatencyHistogram', 'endpoint_of', 'queue_gauge', 'report']
@@ -0,0 +1,123 @@
+import os
+import shutil
+
+import pandas as pd
+
+from central_balancos_py.src.constants import ROW_COLUMNS, INDEX_COLUMNS
+
+EXCEL = 'xlsx'
+PARQUET = 'parquet'
+FEATHER = 'feather'
+FORMATS = {'.xlsx': EXCEL, '.parquet': PARQUET, '.feather': FEATHER}
+FRAME_COLUMNS = INDEX_COLUMNS + [column for column in ROW_COLUMNS if column not in INDEX_COLUMNS]
+
+
+def resolve_format(path, output_format=None):
+    extension_format = FORMATS.get(os.path.splitext(path)[1].lower())
+    output_format = output_format or extension_format
+    if output_format not in FORMATS.values():
+        raise ValueError(f'unsupported statements file "{path}". '
+                         f'Please use one of these extensions: {", ".join(FORMATS.keys())}')
+    if extension_format not in [None, output_format]:
+        raise ValueError(f'"{path}" is a {extension_format} file but the {output_format} format was requested. '
+                         f'Please use a file name ending in {format_extension(output_format)} or drop the format')
+    return output_format
+
+
+def format_extension(output_format):
+    return next(extension for extension, extension_format in FORMATS.items() if extension_format == output_format)
+
+
+def format_path(path, output_format=None):
+    if output_format is None:
+        return path
+    stem = os.path.splitext(path)[0]
+    return stem + format_extension(resolve_format(stem, output_format))
+
+
+def require_pyarrow(output_format):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as error:
+        raise ImportError(f'{output_format} files require pyarrow. '
+                          f'Please install it with `poetry install --extras columnar`') from error
+
+
+def check_partitions(output_format, partition_by):
+    if partition_by and output_format != PARQUET:
+        raise ValueError(f'{output_format} files cannot be partitioned. Please write a .parquet file or drop '
+                         f'partition_by')
+
+
+def check_output(path, output_format=None, partition_by=None):
+    output_format = resolve_format(path, output_format)
+    check_partitions(output_format, partition_by)
+    if output_format != EXCEL:
+        require_pyarrow(output_format)
+    return output_format
+
+
+def ensure_folder(path):
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+
+def to_excel(df, path, sheet_name):
+    ensure_folder(path)
+
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        df.to_excel(writer, sheet_name=sheet_name)
+        worksheet = writer.sheets[sheet_name]
+        worksheet.autofit()
+
+
+def to_parquet(df, path, partition_by=None):
+    require_pyarrow(PARQUET)
+    ensure_folder(path)
+    if partition_by:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        df.reset_index().to_parquet(path, partition_cols=partition_by, index=False)
+    else:
+        df.reset_index().to_parquet(path, index=False)
+
+
+def to_feather(df, path):
+    require_pyarrow(FEATHER)
+    ensure_folder(path)
+    df.reset_index().to_feather(path)
+
+
+def write_statements(df, path, sheet_name, output_format=None, partition_by=None):
+    output_format = resolve_format(path, output_format)
+    check_partitions(output_format, partition_by)
+    match output_format:
+        case 'parquet':
+            to_parquet(df, path, partition_by)
+        case 'feather':
+            to_feather(df, path)
+        case _:
+            to_excel(df, path, sheet_name)
+
+
+def normalize_frame(frame):
+    categorical = [column for column in frame.columns if isinstance(frame[column].dtype, pd.CategoricalDtype)]
+    frame = frame.astype({column: 'str' for column in categorical})
+    return frame[FRAME_COLUMNS].sort_values(by=INDEX_COLUMNS, ignore_index=True)
+
+
+def read_statements(path, sheet_name, output_format=None):
+    match resolve_format(path, output_format):
+        case 'parquet':
+            require_pyarrow(PARQUET)
+            return normalize_frame(pd.read_parquet(path))
+        case 'feather':
+            require_pyarrow(FEATHER)
+            return normalize_frame(pd.read_feather(path))
+        case _:
+            return pd.read_excel(path, sheet_name=sheet_name, dtype={'cnpj': str}).ffill()
+
+
+__ALL__ = ['write_statements', 'read_statements', 'resolve_format', 'format_path', 'check_output', 'to_excel',
+           'to_parquet', 'to_feather', 'EXCEL', 'PARQUET', 'FEATHER']
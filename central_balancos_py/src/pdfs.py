@@ -1,18 +1,30 @@
+import hashlib
 import logging
 import os
 import re
+import tempfile
 
 import pandas as pd
 import requests
 
-from central_balancos_py.src.client.error_handler import ErrorHandler
-from central_balancos_py.src.client.http import HttpClient
+from central_balancos_py.src.client.error_handler import is_failure
+from central_balancos_py.src.client.http import DEFAULT_POOL_SIZE
+from central_balancos_py.src.concurrency import ordered_map, DEFAULT_MAX_WORKERS
+from central_balancos_py.src.extract import build_http_client
+from central_balancos_py.src.manifest import Manifest
+from central_balancos_py.src.metrics import MetricsReporter, queue_gauge, report
+from central_balancos_py.src.records import pdf_id
+from central_balancos_py.src.statement_index import index_path, is_current, query_statements
+from central_balancos_py.src.worksheet import load_worksheet, normalize_cnpjs
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 64 * 1024
+METRICS_FILE_NAME = '.metrics.json'
+
 
 def replace_with_underscore(to_replace):
     return re.sub(r'\W', '_', to_replace)
@@ -31,56 +43,175 @@ def build_file_name(row):
     type_accronym = parse_type(row['tipoDemonstracao'])
     statement_type = replace_with_underscore(row['tipoDemonstracao']).lower() if not type_accronym else type_accronym[1]
     published_date = parse_date(row['dataPublicacao'])
-    return f'{company_name}_{statement_type}_{published_date}.pdf'
+    return f'{company_name}_{statement_type}_{published_date}_{pdf_id(row["pdf"])}.pdf'
 
 
-def filter_cnpjs(worksheet_path, statements_sheet_name):
-    statements = pd.read_excel(worksheet_path, sheet_name=statements_sheet_name).ffill()
+def load_statements(worksheet_path, statements_sheet_name):
+    statements, sheet_cnpjs = load_worksheet(worksheet_path, statements_sheet_name)
     statements['cnpj'] = statements['cnpj'].astype('string')
-    if 'cnpjs' in pd.ExcelFile(worksheet_path).sheet_names:
-        cnpjs = pd.read_excel(worksheet_path, sheet_name='cnpjs')['cnpj'].values.tolist()
-        cnpjs = [re.sub(r'\D', '', str(cnpj)) for cnpj in cnpjs]
-        return statements[statements['cnpj'].isin(cnpjs)]
-    return statements
+    return statements, sheet_cnpjs
 
 
-def filter_types(statements, statement_type):
-    if statement_type != '':
-        return statements[statements['tipoDemonstracao'] == statement_type]
-    return statements
+def filter_cnpjs(worksheet_path, statements_sheet_name, cnpjs=None):
+    statements, sheet_cnpjs = load_statements(worksheet_path, statements_sheet_name)
+    return statements[cnpj_mask(statements, sheet_cnpjs if cnpjs is None else cnpjs)]
 
 
-def filter_dates(statements, publish_date):
-    if publish_date != '':
-        statements = statements.sort_values(by=['nomeParticipante', 'tipoDemonstracao', 'dataPublicacao'])
-        statements = statements.sort_values(by=['dataPublicacao'], ascending=(publish_date == 'latest'))
-    return statements
+def as_set(values):
+    if values is None or isinstance(values, str):
+        return {values} - {None, ''}
+    return set(values) - {None, ''}
 
 
-def filter_statements(worksheet_path, statements_sheet_name, statement_type='', publish_date=''):
-    statements = filter_cnpjs(worksheet_path, statements_sheet_name)
-    statements = filter_types(statements, statement_type)
-    statements = filter_dates(statements, publish_date)
-    return statements
+def cnpj_mask(statements, cnpjs):
+    if cnpjs is None:
+        return pd.Series(True, index=statements.index)
+    return statements['cnpj'].isin(normalize_cnpjs(cnpjs))
 
 
-def fetch_pdf(url):
-    http_client = HttpClient(error_handler=ErrorHandler(logger=logger))
-    response = http_client.get(url)
-    if response is None:
-        raise requests.HTTPError(f'Failed to fetch PDF: {url}')
-    return response.content
+def type_mask(statements, statement_types):
+    statement_types = as_set(statement_types)
+    if len(statement_types) == 0:
+        return pd.Series(True, index=statements.index)
+    names = statements['tipoDemonstracao']
+    matching = [name for name in names.dropna().unique()
+                if name in statement_types or (parse_type(name) and parse_type(name)[1] in statement_types)]
+    return names.isin(matching)
 
 
-def fetch_pdfs(statements, pdfs_directory):
-    os.makedirs(pdfs_directory, exist_ok=True)
-    for _index, row in statements.iterrows():
-        pdf = fetch_pdf(url=row['pdf'])
-        file_name = build_file_name(row)
-        with open(os.path.join(pdfs_directory, file_name), 'wb') as f:
-            f.write(pdf)
+def parse_published(statements):
+    return pd.to_datetime(statements['dataPublicacao'], format='ISO8601', errors='coerce')
+
+
+def date_range_mask(published, published_from=None, published_to=None):
+    mask = pd.Series(True, index=published.index)
+    published_dates = published.dt.normalize()
+    if published_from:
+        mask &= published_dates >= pd.Timestamp(published_from).normalize()
+    if published_to:
+        mask &= published_dates <= pd.Timestamp(published_to).normalize()
+    return mask
+
 
+def select_edges(statements, published, publish_date):
+    if publish_date not in ['latest', 'oldest']:
+        return statements
+    published = published.dropna()
+    groups = published.groupby([statements['cnpj'], statements['tipoDemonstracao']], sort=False)
+    selected = groups.idxmax() if publish_date == 'latest' else groups.idxmin()
+    return statements[statements.index.isin(selected.values)]
 
-def download_pdfs(pdfs_directory, worksheet_path, statements_sheet_name, statement_type='', publish_date=''):
-    statements = filter_statements(worksheet_path, statements_sheet_name, statement_type, publish_date)
-    fetch_pdfs(statements, pdfs_directory)
+
+def filter_types(statements, statement_type):
+    return statements[type_mask(statements, statement_type)]
+
+
+def filter_dates(statements, publish_date):
+    return select_edges(statements, parse_published(statements), publish_date)
+
+
+def filter_frame(statements, cnpjs=None, statement_type='', publish_date='', published_from=None, published_to=None):
+    published = parse_published(statements)
+    mask = (cnpj_mask(statements, cnpjs)
+            & type_mask(statements, statement_type)
+            & date_range_mask(published, published_from, published_to))
+    return select_edges(statements[mask], published[mask], publish_date)
+
+
+def filter_statements(worksheet_path, statements_sheet_name, statement_type='', publish_date='', cnpjs=None,
+                      published_from=None, published_to=None):
+    statements, sheet_cnpjs = load_statements(worksheet_path, statements_sheet_name)
+    return filter_frame(statements, sheet_cnpjs if cnpjs is None else cnpjs, statement_type, publish_date,
+                        published_from, published_to)
+
+
+def select_statements(worksheet_path, statements_sheet_name, statement_type='', publish_date='', cnpjs=None,
+                      published_from=None, published_to=None):
+    statement_index = index_path(worksheet_path)
+    if is_current(statement_index, worksheet_path):
+        logger.info(f'Selecting statements from {statement_index}')
+        return query_statements(statement_index, cnpjs, statement_type, publish_date, published_from, published_to)
+    return filter_statements(worksheet_path, statements_sheet_name, statement_type, publish_date, cnpjs,
+                             published_from, published_to)
+
+
+def write_stream(response, path):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.', suffix='.part')
+    size = 0
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                size += len(chunk)
+                digest.update(chunk)
+        os.replace(temp_path, path)
+        return size, digest.hexdigest()
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    finally:
+        response.close()
+
+
+def fetch_pdf(url, path, http_client):
+    result = http_client.get(url, stream=True, consume=lambda response: write_stream(response, path))
+    if is_failure(result):
+        raise requests.HTTPError(f'Failed to fetch PDF: {url}: {result!r}')
+    size, sha256 = result
+    http_client.record_bytes(url, size)
+    return size, sha256
+
+
+def download_statement(row, pdfs_directory, manifest, http_client):
+    url = row['pdf']
+    try:
+        path = os.path.join(pdfs_directory, build_file_name(row))
+        manifest.claim(url, path)
+        if manifest.is_valid(url, path):
+            return False
+        size, sha256 = fetch_pdf(url, path, http_client)
+    except Exception as error:
+        logger.error(f'Failed to download {url}: {error}')
+        return
+    manifest.record(url, path, size, sha256)
+    return True
+
+
+def check_downloads(results):
+    downloaded = results.count(True)
+    failed = results.count(None)
+    logger.info(f'Downloaded {downloaded} PDFs, skipped {len(results) - downloaded - failed} already present, '
+                f'{failed} failed')
+    if failed > 0:
+        raise RuntimeError(f'{failed} PDFs failed to download')
+
+
+def fetch_pdfs(statements, pdfs_directory, http_client, max_workers=DEFAULT_MAX_WORKERS):
+    os.makedirs(pdfs_directory, exist_ok=True)
+    manifest = Manifest(pdfs_directory)
+
+    rows = (row for _index, row in statements.iterrows())
+    results = list(ordered_map(lambda row: download_statement(row, pdfs_directory, manifest, http_client), rows,
+                               max_workers, gauge=queue_gauge(http_client.metrics, 'downloads_pending')))
+    check_downloads(results)
+
+
+def download_pdfs(pdfs_directory, worksheet_path, statements_sheet_name, statement_type='', publish_date='',
+                  max_workers=DEFAULT_MAX_WORKERS, http_client=None, cnpjs=None, published_from=None,
+                  published_to=None, metrics_path=None):
+    statements = select_statements(worksheet_path, statements_sheet_name, statement_type, publish_date, cnpjs,
+                                   published_from, published_to)
+    owns_client = http_client is None
+    http_client = http_client or build_http_client(pool_size=max(max_workers, DEFAULT_POOL_SIZE))
+    metrics = http_client.metrics
+    if metrics is not None:
+        metrics.reset()
+    try:
+        with MetricsReporter(metrics, logger):
+            fetch_pdfs(statements, pdfs_directory, http_client, max_workers=max_workers)
+        logger.info(f'Connection stats: {http_client.connection_stats()}')
+        report(metrics, metrics_path or os.path.join(pdfs_directory, METRICS_FILE_NAME), logger)
+    finally:
+        if owns_client:
+            http_client.close()
@@ -0,0 +1,90 @@
+import logging
+import os
+
+import pandas as pd
+
+from central_balancos_py.src.checkpoint import CheckpointJournal, checkpoint_path
+from central_balancos_py.src.client.error_handler import is_failure
+from central_balancos_py.src.client.http import DEFAULT_POOL_SIZE
+from central_balancos_py.src.concurrency import WorkQueue, ordered_map, prefetch, DEFAULT_MAX_WORKERS
+from central_balancos_py.src.constants import ROW_COLUMNS
+from central_balancos_py.src.extract import build_http_client, check_failures, fetch_companies, parse_with_checkpoint, \
+    to_df, COMPANIES_PAGE_SIZE
+from central_balancos_py.src.manifest import Manifest
+from central_balancos_py.src.metrics import MetricsReporter, queue_gauge, report
+from central_balancos_py.src.output import check_output, write_statements
+from central_balancos_py.src.pdfs import check_downloads, download_statement, filter_frame
+from central_balancos_py.src.state import StateStore, state_path
+from central_balancos_py.src.statement_index import build_index, index_path
+
+logger = logging.getLogger(__name__)
+
+
+def has_filters(cnpjs, statement_type, publish_date, published_from, published_to):
+    return cnpjs is not None or bool(statement_type or publish_date or published_from or published_to)
+
+
+def select_downloads(rows, cnpjs=None, statement_type='', publish_date='', published_from=None, published_to=None):
+    if len(rows) == 0 or not has_filters(cnpjs, statement_type, publish_date, published_from, published_to):
+        return rows
+    statements = pd.DataFrame([row.to_dict() for row in rows], columns=ROW_COLUMNS).astype({'cnpj': 'string'})
+    selected = filter_frame(statements, cnpjs, statement_type, publish_date, published_from, published_to)
+    return [rows[position] for position in selected.index]
+
+
+def extract_and_download(worksheet_path, statements_sheet_name, pdfs_directory, selected_cnpj=None,
+                         statement_type='', publish_date='', cnpjs=None, published_from=None, published_to=None,
+                         max_workers=DEFAULT_MAX_WORKERS, download_workers=None, queue_size=None, http_client=None,
+                         journal_path=None, companies_page_size=COMPANIES_PAGE_SIZE, output_format=None,
+                         partition_by=None, metrics_path=None):
+    output_format = check_output(worksheet_path, output_format, partition_by)
+    download_workers = download_workers or max_workers
+    owns_client = http_client is None
+    http_client = http_client or build_http_client(pool_size=max(max_workers + download_workers, DEFAULT_POOL_SIZE))
+    metrics = http_client.metrics
+    if metrics is not None:
+        metrics.reset()
+    os.makedirs(pdfs_directory, exist_ok=True)
+    manifest = Manifest(pdfs_directory)
+    try:
+        selected_cnpj = None if selected_cnpj is None else int(selected_cnpj)
+        journal = CheckpointJournal(journal_path or checkpoint_path(worksheet_path, selected_cnpj))
+        state = StateStore(state_path(worksheet_path))
+        state.reset()
+        failed = []
+        downloads = WorkQueue(lambda row: download_statement(row.to_dict(), pdfs_directory, manifest, http_client),
+                              download_workers, queue_size, gauge=queue_gauge(metrics, 'downloads_pending'))
+
+        def stream():
+            companies = prefetch(fetch_companies(http_client, selected_cnpj, companies_page_size),
+                                 buffer_size=companies_page_size, gauge=queue_gauge(metrics, 'companies_buffer'))
+            parsed = ordered_map(lambda company: (company, parse_with_checkpoint(company, http_client, journal, state)),
+                                 companies, max_workers, gauge=queue_gauge(metrics, 'statements_pending'))
+            for company, rows in parsed:
+                if is_failure(rows):
+                    failed.append((company, rows))
+                    continue
+                for row in select_downloads(rows, cnpjs, statement_type, publish_date, published_from,
+                                            published_to):
+                    downloads.put(row)
+                yield from rows
+
+        with MetricsReporter(metrics, logger), downloads:
+            df = to_df(stream())
+        write_statements(df, worksheet_path, statements_sheet_name, output_format, partition_by)
+        state.save()
+        build_index(df, index_path(worksheet_path), worksheet_path)
+
+        logger.info(f'Connection stats: {http_client.connection_stats()}')
+        report(metrics, metrics_path or f'{worksheet_path}.metrics.json', logger)
+        check_failures(failed)
+        journal.clear()
+        if downloads.errors:
+            raise downloads.errors[0]
+        check_downloads(downloads.results)
+    finally:
+        if owns_client:
+            http_client.close()
+
+
+__ALL__ = ['extract_and_download', 'select_downloads']
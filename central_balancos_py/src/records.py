@@ -0,0 +1,88 @@
+import re
+import sys
+
+from central_balancos_py.src.constants import ROW_COLUMNS
+
+PDF_URL = "https://centraldebalancos.estaleiro.serpro.gov.br" \
+          "/centralbalancos/servicesapi/api/Demonstracao/pdf"
+
+
+def url_pdf(statement_id):
+    return f'{PDF_URL}/{statement_id}'
+
+
+def pdf_id(url):
+    match = re.match(r'^.*/pdf/(\d+)$', url)
+    return int(match[1]) if match else None
+
+
+def only_digits(cnpj):
+    return re.sub(r'\D', '', str(cnpj))
+
+
+def intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Record:
+    __slots__ = ()
+
+    def values(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.values() == other.values()
+
+    def __hash__(self):
+        return hash(self.values())
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+class Company(Record):
+    __slots__ = ('id', 'cnpj', 'nome')
+
+    def __init__(self, id, cnpj, nome):
+        self.id = id
+        self.cnpj = cnpj
+        self.nome = nome
+
+    @classmethod
+    def from_json(cls, item):
+        return cls(int(item['id']), only_digits(item['cnpj']), item['nome'])
+
+
+class StatementRow(Record):
+    __slots__ = ('nomeParticipante', 'cnpj', 'tipoDemonstracao', 'status', 'dataFim', 'dataPublicacao',
+                 'statement_id')
+
+    def __init__(self, nomeParticipante, cnpj, tipoDemonstracao, status, dataFim, dataPublicacao, statement_id):
+        self.nomeParticipante = intern(nomeParticipante)
+        self.cnpj = cnpj
+        self.tipoDemonstracao = intern(tipoDemonstracao)
+        self.status = intern(status)
+        self.dataFim = intern(dataFim)
+        self.dataPublicacao = dataPublicacao
+        self.statement_id = statement_id
+
+    @property
+    def pdf(self):
+        return url_pdf(self.statement_id)
+
+    @classmethod
+    def from_statement(cls, statement, cnpj):
+        return cls(statement['nomeParticipante'], cnpj, statement['tipoDemonstracao'], statement['status'],
+                   statement['dataFim'], statement['dataPublicacao'], int(statement['id']))
+
+    @classmethod
+    def from_dict(cls, row):
+        return cls(row['nomeParticipante'], row['cnpj'], row['tipoDemonstracao'], row['status'], row['dataFim'],
+                   row['dataPublicacao'], pdf_id(row['pdf']))
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in ROW_COLUMNS}
+
+
+__ALL__ = ['Company', 'StatementRow', 'url_pdf', 'pdf_id', 'only_digits', 'PDF_URL']
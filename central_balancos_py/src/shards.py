@@ -0,0 +1,141 @@
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from central_balancos_py.src.checkpoint import CheckpointJournal
+from central_balancos_py.src.client.http import DEFAULT_POOL_SIZE
+from central_balancos_py.src.client.rate_limiter import DEFAULT_MAX_REQUESTS_PER_SECOND
+from central_balancos_py.src.concurrency import DEFAULT_MAX_WORKERS
+from central_balancos_py.src.extract import build_http_client, check_failures, fetch_companies, iter_statements, \
+    to_df, COMPANIES_PAGE_SIZE, DEFAULT_REQUESTS_PER_SECOND
+from central_balancos_py.src.metrics import MetricsReporter, report
+from central_balancos_py.src.output import check_output, write_statements
+from central_balancos_py.src.records import StatementRow
+from central_balancos_py.src.statement_index import build_index, index_path
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ['hash', 'id']
+ID_BLOCK_SIZE = 100
+
+
+def shard_path(worksheet_path, shard, shards, strategy='hash'):
+    return f'{worksheet_path}.shard-{strategy}-{shard}-of-{shards}.jsonl'
+
+
+def check_shard(shard, shards, strategy='hash'):
+    if strategy not in STRATEGIES:
+        raise ValueError(f'unknown shard strategy "{strategy}". Please use one of: {", ".join(STRATEGIES)}')
+    if shards < 1 or not 1 <= shard <= shards:
+        raise ValueError(f'shard must be between 1 and {shards}. {shard} provided')
+
+
+def hash_shard(company, shards):
+    return zlib.crc32(company.cnpj.encode()) % shards + 1
+
+
+def id_shard(company, shards, block_size=ID_BLOCK_SIZE):
+    return company.id // block_size % shards + 1
+
+
+def select_shard(companies, shard, shards, strategy='hash', block_size=ID_BLOCK_SIZE):
+    check_shard(shard, shards, strategy)
+    match strategy:
+        case 'id':
+            yield from (company for company in companies if id_shard(company, shards, block_size) == shard)
+        case _:
+            yield from (company for company in companies if hash_shard(company, shards) == shard)
+
+
+def write_shard(path, entries):
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.part')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for company_id, rows in entries:
+            rows = [row.to_dict() for row in rows]
+            f.write(json.dumps({'id': company_id, 'rows': rows}, ensure_ascii=False) + '\n')
+    os.replace(temp_path, path)
+
+
+def read_shard(path):
+    with open(path, encoding='utf-8') as f:
+        return {entry['id']: [StatementRow.from_dict(row) for row in entry['rows']] for entry in map(json.loads, f)}
+
+
+def extract_shard(worksheet_path, shard, shards, strategy='hash', max_workers=DEFAULT_MAX_WORKERS,
+                  requests_per_second=DEFAULT_REQUESTS_PER_SECOND, http_client=None,
+                  companies_page_size=COMPANIES_PAGE_SIZE, max_requests_per_second=DEFAULT_MAX_REQUESTS_PER_SECOND,
+                  cache_directory=None):
+    check_shard(shard, shards, strategy)
+    path = shard_path(worksheet_path, shard, shards, strategy)
+    owns_client = http_client is None
+    http_client = http_client or build_http_client(requests_per_second, pool_size=max(max_workers, DEFAULT_POOL_SIZE),
+                                                   max_requests_per_second=max_requests_per_second,
+                                                   cache_directory=cache_directory)
+    metrics = http_client.metrics
+    if metrics is not None:
+        metrics.reset()
+    try:
+        journal = CheckpointJournal(path.replace('.jsonl', '.checkpoint.jsonl'))
+        failed = []
+        with MetricsReporter(metrics, logger):
+            companies = select_shard(fetch_companies(http_client, None, companies_page_size), shard, shards, strategy)
+            for _row in iter_statements(companies, http_client, max_workers=max_workers, journal=journal,
+                                        failed=failed):
+                pass
+        check_failures(failed)
+        write_shard(path, journal.items())
+        logger.info(f'Shard {shard} of {shards} extracted {len(journal)} companies to {path}')
+        journal.clear()
+        report(metrics, path.replace('.jsonl', '.metrics.json'), logger)
+        return path
+    finally:
+        if owns_client:
+            http_client.close()
+
+
+def merge_shards(worksheet_path, statements_sheet_name, shards, strategy='hash', output_format=None,
+                 partition_by=None, statement_index=True):
+    output_format = check_output(worksheet_path, output_format, partition_by)
+    paths = [shard_path(worksheet_path, shard, shards, strategy) for shard in range(1, shards + 1)]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f'missing {len(missing)} of {shards} shards: {", ".join(missing)}. '
+                                f'Please extract them before merging.')
+    entries = {}
+    for path in paths:
+        entries.update(read_shard(path))
+    df = to_df(row for company_id in sorted(entries) for row in entries[company_id])
+    write_statements(df, worksheet_path, statements_sheet_name, output_format, partition_by)
+    if statement_index:
+        build_index(df, index_path(worksheet_path), worksheet_path)
+    for path in paths:
+        os.remove(path)
+    logger.info(f'Merged {len(entries)} companies from {shards} shards into {worksheet_path}')
+    return df
+
+
+def extract_sharded(worksheet_path, statements_sheet_name, shards, strategy='hash', processes=None,
+                    max_workers=DEFAULT_MAX_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                    companies_page_size=COMPANIES_PAGE_SIZE, output_format=None, partition_by=None,
+                    max_requests_per_second=DEFAULT_MAX_REQUESTS_PER_SECOND, cache_directory=None):
+    check_output(worksheet_path, output_format, partition_by)
+    check_shard(1, shards, strategy)
+    processes = min(processes or os.cpu_count() or 1, shards)
+    with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = [executor.submit(extract_shard, worksheet_path, shard, shards, strategy, max_workers,
+                                   requests_per_second / processes, None, companies_page_size,
+                                   max_requests_per_second / processes, cache_directory)
+                   for shard in range(1, shards + 1)]
+        for future in futures:
+            future.result()
+    return merge_shards(worksheet_path, statements_sheet_name, shards, strategy, output_format, partition_by)
+
+
+__ALL__ = ['extract_shard', 'extract_sharded', 'merge_shards', 'select_shard', 'shard_path', 'STRATEGIES',
+           'ID_BLOCK_SIZE']
@@ -0,0 +1,49 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def state_path(worksheet_path):
+    return f'{worksheet_path}.state.json'
+
+
+class StateStore:
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.watermarks = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def get(self, company):
+        return self.watermarks.get(str(company.id))
+
+    def update(self, company, watermark):
+        with self.lock:
+            self.watermarks[str(company.id)] = watermark
+
+    def reset(self):
+        with self.lock:
+            self.watermarks = {}
+
+    def save(self):
+        folder = os.path.dirname(self.path) or '.'
+        os.makedirs(folder, exist_ok=True)
+        with self.lock:
+            fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.part')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.watermarks, f)
+            os.replace(temp_path, self.path)
+        logger.info(f'Saved watermarks for {len(self.watermarks)} companies to {self.path}')
+
+
+__ALL__ = ['StateStore', 'state_path']
@@ -0,0 +1,141 @@
+import logging
+import os
+import sqlite3
+import tempfile
+
+import pandas as pd
+
+from central_balancos_py.src.output import FRAME_COLUMNS
+from central_balancos_py.src.worksheet import normalize_cnpjs
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE companies (cnpj TEXT PRIMARY KEY, nomeParticipante TEXT NOT NULL);
+CREATE TABLE statements (
+    nomeParticipante TEXT NOT NULL,
+    tipoDemonstracao TEXT NOT NULL,
+    sigla TEXT,
+    dataPublicacao TEXT,
+    cnpj TEXT NOT NULL REFERENCES companies (cnpj),
+    status TEXT,
+    dataFim TEXT,
+    pdf TEXT NOT NULL
+);
+CREATE INDEX statements_cnpj ON statements (cnpj, tipoDemonstracao, dataPublicacao);
+CREATE INDEX statements_tipo ON statements (tipoDemonstracao, dataPublicacao);
+CREATE INDEX statements_sigla ON statements (sigla, dataPublicacao);
+CREATE INDEX statements_data ON statements (dataPublicacao);
+"""
+ORDER_BY = 'ORDER BY nomeParticipante, tipoDemonstracao, dataPublicacao'
+
+
+def index_path(worksheet_path):
+    return f'{worksheet_path}.index.sqlite'
+
+
+def source_signature(worksheet_path):
+    stat = os.stat(worksheet_path)
+    return {'source_mtime_ns': str(stat.st_mtime_ns), 'source_size': str(stat.st_size)}
+
+
+def build_index(df, path, worksheet_path=None):
+    frame = df.reset_index()[FRAME_COLUMNS].astype({'cnpj': 'str'})
+    frame['sigla'] = frame['tipoDemonstracao'].str.extract(r'\(([^)]*)\)\s*$', expand=False)
+    companies = frame.drop_duplicates(subset='cnpj')[['cnpj', 'nomeParticipante']]
+    meta = source_signature(worksheet_path) if worksheet_path else {}
+
+    folder = os.path.dirname(path) or '.'
+    os.makedirs(folder, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=folder, prefix='.', suffix='.part')
+    os.close(fd)
+    try:
+        with sqlite3.connect(temp_path) as connection:
+            connection.executescript(SCHEMA)
+            connection.executemany('INSERT INTO meta VALUES (?, ?)', meta.items())
+            connection.executemany('INSERT INTO companies VALUES (?, ?)', companies.itertuples(index=False))
+            columns = FRAME_COLUMNS + ['sigla']
+            connection.executemany(f'INSERT INTO statements ({", ".join(columns)}) '
+                                   f'VALUES ({", ".join("?" for _ in columns)})',
+                                   frame[columns].astype(object).where(frame[columns].notna(), None)
+                                   .itertuples(index=False))
+        connection.close()
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    logger.info(f'Indexed {len(frame)} statements from {len(companies)} companies at {path}')
+
+
+def is_current(path, worksheet_path):
+    if not os.path.exists(path) or not os.path.exists(worksheet_path):
+        return False
+    connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        meta = dict(connection.execute('SELECT key, value FROM meta').fetchall())
+    except sqlite3.DatabaseError:
+        return False
+    finally:
+        connection.close()
+    return meta == source_signature(worksheet_path)
+
+
+def as_list(values):
+    if values is None or isinstance(values, str):
+        return [value for value in [values] if value]
+    return [value for value in values if value]
+
+
+def day_after(date):
+    return (pd.Timestamp(date).normalize() + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def query_statements(path, cnpjs=None, statement_type='', publish_date='', published_from=None, published_to=None):
+    conditions = []
+    params = []
+    statement_types = as_list(statement_type)
+    if statement_types:
+        placeholders = ', '.join('?' for _ in statement_types)
+        conditions.append(f'(tipoDemonstracao IN ({placeholders}) OR sigla IN ({placeholders}))')
+        params.extend(statement_types + statement_types)
+    if published_from:
+        conditions.append('dataPublicacao >= ?')
+        params.append(pd.Timestamp(published_from).strftime('%Y-%m-%d'))
+    if published_to:
+        conditions.append('dataPublicacao < ?')
+        params.append(day_after(published_to))
+    if publish_date in ['latest', 'oldest']:
+        conditions.append('dataPublicacao IS NOT NULL')
+
+    source = 'statements'
+    if cnpjs is not None:
+        source = 'statements JOIN temp.wanted USING (cnpj)'
+    where = f'WHERE {" AND ".join(conditions)}' if conditions else ''
+    columns = ', '.join(FRAME_COLUMNS)
+    sql = f'SELECT {columns} FROM {source} {where}'
+    if publish_date in ['latest', 'oldest']:
+        direction = 'DESC' if publish_date == 'latest' else 'ASC'
+        sql = (f'SELECT {columns} FROM ('
+               f'SELECT {columns}, ROW_NUMBER() OVER ('
+               f'PARTITION BY cnpj, tipoDemonstracao ORDER BY dataPublicacao {direction}) AS position '
+               f'FROM {source} {where}) WHERE position = 1')
+
+    connection = sqlite3.connect(path)
+    try:
+        if cnpjs is not None:
+            connection.execute('CREATE TEMP TABLE wanted (cnpj TEXT PRIMARY KEY)')
+            connection.executemany('INSERT OR IGNORE INTO temp.wanted VALUES (?)',
+                                   ((cnpj,) for cnpj in normalize_cnpjs(cnpjs)))
+        statements = pd.read_sql_query(f'{sql} {ORDER_BY}', connection, params=params)
+    finally:
+        connection.close()
+    statements['cnpj'] = statements['cnpj'].astype('string')
+    return statements
+
+
+def lookup_cnpj(path, cnpj):
+    return query_statements(path, cnpjs=[cnpj])
+
+
+__ALL__ = ['build_index', 'query_statements', 'lookup_cnpj', 'index_path', 'is_current']
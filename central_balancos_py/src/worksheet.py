@@ -0,0 +1,74 @@
+import functools
+import logging
+import os
+import pickle
+import re
+import tempfile
+
+import pandas as pd
+
+from central_balancos_py.src.output import FRAME_COLUMNS, EXCEL, read_statements, resolve_format
+
+logger = logging.getLogger(__name__)
+
+CNPJS_SHEET_NAME = 'cnpjs'
+
+
+def cache_path(worksheet_path):
+    return f'{worksheet_path}.cache.pkl'
+
+
+def normalize_cnpjs(cnpjs):
+    return [re.sub(r'\D', '', str(cnpj)) for cnpj in cnpjs]
+
+
+def parse_workbook(worksheet_path, statements_sheet_name):
+    with pd.ExcelFile(worksheet_path, engine='openpyxl') as workbook:
+        statements = workbook.parse(statements_sheet_name, usecols=FRAME_COLUMNS,
+                                    dtype={column: str for column in FRAME_COLUMNS}).ffill()
+        cnpjs = None
+        if CNPJS_SHEET_NAME in workbook.sheet_names:
+            cnpjs = normalize_cnpjs(workbook.parse(CNPJS_SHEET_NAME, usecols=['cnpj'], dtype={'cnpj': str})['cnpj']
+                                    .dropna())
+    return statements[FRAME_COLUMNS], cnpjs
+
+
+def read_cache(path, key):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    return cached['frames'] if cached.get('key') == key else None
+
+
+def write_cache(path, key, frames):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.', suffix='.part')
+    with os.fdopen(fd, 'wb') as f:
+        pickle.dump({'key': key, 'frames': frames}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+@functools.lru_cache(maxsize=4)
+def load_workbook(worksheet_path, statements_sheet_name, mtime_ns, size):
+    key = (statements_sheet_name, mtime_ns, size)
+    frames = read_cache(cache_path(worksheet_path), key)
+    if frames is not None:
+        logger.info(f'Loaded {worksheet_path} from cache')
+        return frames
+    frames = parse_workbook(worksheet_path, statements_sheet_name)
+    write_cache(cache_path(worksheet_path), key, frames)
+    return frames
+
+
+def load_worksheet(worksheet_path, statements_sheet_name):
+    if resolve_format(worksheet_path) != EXCEL:
+        return read_statements(worksheet_path, statements_sheet_name), None
+    stat = os.stat(worksheet_path)
+    statements, cnpjs = load_workbook(worksheet_path, statements_sheet_name, stat.st_mtime_ns, stat.st_size)
+    return statements.copy(), cnpjs
+
+
+__ALL__ = ['load_worksheet', 'cache_path', 'normalize_cnpjs', 'CNPJS_SHEET_NAME']
@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from central_balancos_py.src.checkpoint import CheckpointJournal, checkpoint_path
+from central_balancos_py.src.records import Company
+from tests.constants import TEMP_CHECKPOINT_PATH
+from tests.support import factory
+
+
+@pytest.fixture(autouse=True)
+def clean_up_journal():
+    yield
+    if os.path.exists(TEMP_CHECKPOINT_PATH):
+        os.remove(TEMP_CHECKPOINT_PATH)
+
+
+def test_checkpoint_path():
+    assert 'data/demonstracoes.xlsx.all.checkpoint.jsonl' == checkpoint_path('data/demonstracoes.xlsx')
+    assert 'data/demonstracoes.xlsx.123.checkpoint.jsonl' == checkpoint_path('data/demonstracoes.xlsx', 123)
+
+
+def test_record_and_reload():
+    journal = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    assert factory.company_record() not in journal
+
+    journal.record(factory.company_record(), [factory.statement_row()])
+
+    reloaded = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    assert factory.company_record() in reloaded
+    assert 1 == len(reloaded)
+    assert [factory.statement_row()] == reloaded.get(factory.company_record())
+
+
+def test_reload_skips_truncated_entry():
+    journal = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    journal.record(factory.company_record(), [factory.statement_row()])
+    with open(TEMP_CHECKPOINT_PATH, 'a', encoding='utf-8') as f:
+        f.write('{"id": 1, "rows": [{"nomePart')
+
+    reloaded = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    assert 1 == len(reloaded)
+
+    other = Company(1, '12345670000890', 'OTHER')
+    reloaded.record(other, [factory.statement_row('OTHER', '12345670000890')])
+    assert [factory.statement_row('OTHER', '12345670000890')] == CheckpointJournal(TEMP_CHECKPOINT_PATH).get(other)
+
+
+def test_reads_rows_back_from_disk():
+    journal = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    first, second = Company(2, '23456700008901', 'SECOND'), Company(1, '12345670000890', 'FIRST')
+    journal.record(first, [factory.statement_row('SECOND', '23456700008901')])
+    journal.record(second, [factory.statement_row('FIRST', '12345670000890'), factory.statement_row()])
+
+    assert 0 < journal.offsets[2] < journal.offsets[1]
+    assert [factory.statement_row('SECOND', '23456700008901')] == journal.get(first)
+    assert [1, 2] == [company_id for company_id, _rows in journal.items()]
+    assert 2 == len(dict(journal.items())[1])
+
+
+def test_discards_stale_checkpoint():
+    now = [1000.0]
+    journal = CheckpointJournal(TEMP_CHECKPOINT_PATH, max_age=60, clock=lambda: now[0])
+    journal.record(factory.company_record(), [factory.statement_row()])
+
+    now[0] += 30
+    assert 1 == len(CheckpointJournal(TEMP_CHECKPOINT_PATH, max_age=60, clock=lambda: now[0]))
+
+    now[0] += 31
+    assert 0 == len(CheckpointJournal(TEMP_CHECKPOINT_PATH, max_age=60, clock=lambda: now[0]))
+    assert not os.path.exists(TEMP_CHECKPOINT_PATH)
+
+
+def test_discards_checkpoint_without_start_time():
+    with open(TEMP_CHECKPOINT_PATH, 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 1, 'rows': []}) + '\n')
+
+    assert 0 == len(CheckpointJournal(TEMP_CHECKPOINT_PATH))
+    assert not os.path.exists(TEMP_CHECKPOINT_PATH)
+
+
+def test_clear():
+    journal = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    journal.record(factory.company_record(), [factory.statement_row()])
+
+    journal.clear()
+
+    assert not os.path.exists(TEMP_CHECKPOINT_PATH)
+    assert 0 == len(journal)
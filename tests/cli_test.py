@@ -0,0 +1,243 @@
+import json
+from unittest.mock import patch, ANY
+
+import pytest
+import requests
+
+from central_balancos_py.src import main
+from central_balancos_py.src.cli import build_parser, resolve_job, run_cli
+from tests.support import factory
+from tests.constants import PDFS_DIRECTORY, READ_ONLY_WORKSHEET_PATH, TEMP_WORKSHEET_PATH
+
+ENV = {'worksheet_path': READ_ONLY_WORKSHEET_PATH,
+       'pdfs_directory': PDFS_DIRECTORY,
+       'statements_sheet_name': 'demonstracoes'}
+
+
+def parse(*argv):
+    return build_parser().parse_args(list(argv))
+
+
+def test_resolve_job_defaults():
+    job = resolve_job(parse('download'), ENV)
+
+    assert 'download' == job['command']
+    assert READ_ONLY_WORKSHEET_PATH == job['worksheet']
+    assert PDFS_DIRECTORY == job['pdfs_directory']
+    assert 'demonstracoes' == job['sheet']
+    assert '' == job['statement_type']
+    assert '' == job['publish_date']
+    assert job['cnpjs'] is None
+
+
+def test_resolve_job_flags():
+    job = resolve_job(parse('both', '--cnpjs', '13385440000156,12345678000199', '--cnpjs', '11111111000111',
+                            '--statement-type', 'BP', '--statement-type', 'DRE', '--publish-date', 'latest',
+                            '--published-from', '2022-01-01', '--workers', '16', '--incremental'), ENV)
+
+    assert ['13385440000156', '12345678000199', '11111111000111'] == job['cnpjs']
+    assert ['BP', 'DRE'] == job['statement_type']
+    assert 'latest' == job['publish_date']
+    assert '2022-01-01' == job['published_from']
+    assert 16 == job['workers']
+    assert job['incremental']
+
+
+def test_resolve_job_flags_override_job_file(tmp_path):
+    job_file = tmp_path / 'job.json'
+    job_file.write_text(json.dumps({'command': 'extract', 'workers': 4, 'format': 'parquet',
+                                    'worksheet': 'from_file.parquet'}))
+
+    job = resolve_job(parse('--config', str(job_file), '--workers', '2'), ENV)
+
+    assert 'extract' == job['command']
+    assert 2 == job['workers']
+    assert 'parquet' == job['format']
+    assert 'from_file.parquet' == job['worksheet']
+
+
+def test_resolve_job_reads_numeric_cnpjs_from_job_file(tmp_path):
+    job_file = tmp_path / 'job.json'
+    job_file.write_text(json.dumps({'command': 'download', 'cnpjs': [13385440000156, '12345678000199,11111111000111']}))
+
+    job = resolve_job(parse('--config', str(job_file)), ENV)
+
+    assert ['13385440000156', '12345678000199', '11111111000111'] == job['cnpjs']
+
+
+@patch('central_balancos_py.src.shards.extract_shard')
+def test_run_cli_passes_cache_directory_to_shards(mock_extract_shard, tmp_path):
+    cache_directory = str(tmp_path / 'http_cache')
+
+    assert 0 == run_cli(['extract', '--shards', '4', '--shard', '1', '--cache-directory', cache_directory], ENV)
+
+    assert cache_directory == mock_extract_shard.call_args.kwargs['cache_directory']
+
+
+def test_resolve_job_names_default_worksheet_after_format():
+    assert READ_ONLY_WORKSHEET_PATH.replace('.xlsx', '.feather') == \
+           resolve_job(parse('extract', '--format', 'feather'), ENV)['worksheet']
+
+    with pytest.raises(ValueError):
+        resolve_job(parse('extract', '--format', 'csv'), ENV)
+
+
+@pytest.mark.parametrize(
+    'job_file, argv',
+    [
+        ({'command': 'extract', 'unknown': 1}, []),
+        ({}, []),
+        ({'command': 'extract'}, ['--cnpj', '13.385.440/0001-56']),
+    ]
+)
+def test_resolve_job_rejects_invalid_jobs(tmp_path, job_file, argv):
+    path = tmp_path / 'job.json'
+    path.write_text(json.dumps(job_file))
+
+    with pytest.raises(ValueError):
+        resolve_job(parse('--config', str(path), *argv), ENV)
+
+
+def test_invalid_command_exits():
+    with pytest.raises(SystemExit):
+        parse('upload')
+
+
+@patch('central_balancos_py.src.pipeline.extract_and_download')
+def test_run_cli_both_pipelines(mock_pipeline):
+    assert 0 == run_cli(['both', '--cnpj', '13385440000156', '--statement-type', 'BP', '--download-workers', '4'],
+                        ENV)
+
+    mock_pipeline.assert_called_once_with(worksheet_path=READ_ONLY_WORKSHEET_PATH,
+                                          statements_sheet_name='demonstracoes',
+                                          pdfs_directory=PDFS_DIRECTORY,
+                                          selected_cnpj='13385440000156',
+                                          statement_type=['BP'],
+                                          publish_date='',
+                                          cnpjs=None,
+                                          published_from=None,
+                                          published_to=None,
+                                          max_workers=8,
+                                          download_workers=4,
+                                          http_client=ANY,
+                                          output_format=None,
+                                          partition_by=None)
+
+
+@patch('central_balancos_py.src.pdfs.download_pdfs')
+@patch('central_balancos_py.src.extract.extract_company_info')
+def test_run_cli_both_incremental(mock_extract, mock_download):
+    assert 0 == run_cli(['both', '--cnpj', '13385440000156', '--format', 'xlsx', '--statement-type', 'BP',
+                         '--publish-date', 'oldest', '--incremental'], ENV)
+
+    mock_extract.assert_called_once_with(worksheet_path=READ_ONLY_WORKSHEET_PATH,
+                                         statements_sheet_name='demonstracoes',
+                                         selected_cnpj='13385440000156',
+                                         max_workers=8,
+                                         http_client=ANY,
+                                         incremental=True,
+                                         output_format='xlsx',
+                                         partition_by=None)
+    mock_download.assert_called_once_with(pdfs_directory=PDFS_DIRECTORY,
+                                          worksheet_path=READ_ONLY_WORKSHEET_PATH,
+                                          statements_sheet_name='demonstracoes',
+                                          statement_type=['BP'],
+                                          publish_date='oldest',
+                                          max_workers=8,
+                                          http_client=mock_extract.call_args.kwargs['http_client'],
+                                          cnpjs=None,
+                                          published_from=None,
+                                          published_to=None)
+
+
+@patch('central_balancos_py.src.pdfs.download_pdfs')
+@patch('central_balancos_py.src.extract.extract_company_info')
+def test_run_cli_extract_only(mock_extract, mock_download):
+    assert 0 == run_cli(['extract'], ENV)
+
+    mock_extract.assert_called_once()
+    mock_download.assert_not_called()
+
+
+@patch('central_balancos_py.src.pdfs.download_pdfs')
+def test_run_cli_download_without_worksheet_fails(mock_download):
+    assert 1 == run_cli(['download', '--worksheet', TEMP_WORKSHEET_PATH], ENV)
+
+    mock_download.assert_not_called()
+
+
+@patch('central_balancos_py.src.extract.extract_company_info')
+def test_run_cli_reports_failures(mock_extract):
+    mock_extract.side_effect = ValueError('boom')
+
+    assert 1 == run_cli(['extract'], ENV)
+
+
+@pytest.mark.parametrize('status_code, exit_status', [(503, 1), (404, 0)])
+@patch('central_balancos_py.src.client.retry.random.uniform', return_value=0)
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_run_cli_fails_when_companies_are_left_out(mock_get, _mock_backoff, tmp_path, status_code, exit_status):
+    def failing_statements(url, **_kwargs):
+        response = requests.Response()
+        response.status_code = 200 if 'Participante' in url else status_code
+        response._content = json.dumps({'items': [factory.company()], 'totalCount': 1}).encode()
+        return response
+
+    mock_get.side_effect = failing_statements
+    worksheet_path = tmp_path / 'demonstracoes.xlsx'
+
+    assert exit_status == run_cli(['extract', '--worksheet', str(worksheet_path)], ENV)
+    assert worksheet_path.exists()
+
+
+@patch('central_balancos_py.src.main.run')
+@patch('central_balancos_py.src.cli.run_cli')
+def test_start_dispatches(mock_run_cli, mock_run):
+    mock_run_cli.return_value = 0
+
+    assert 0 == main.start([])
+    mock_run.assert_called_once()
+    mock_run_cli.assert_not_called()
+
+    assert 0 == main.start(['extract'])
+    mock_run_cli.assert_called_once_with(['extract'], ANY)
+
+
+@pytest.mark.parametrize(
+    'argv',
+    [
+        ['merge'],
+        ['extract', '--shard', '1'],
+        ['extract', '--shards', '2', '--incremental'],
+        ['extract', '--shards', '2', '--cnpj', '13385440000156'],
+        ['both', '--shards', '2', '--shard', '1'],
+    ]
+)
+def test_resolve_job_rejects_invalid_sharding(argv):
+    with pytest.raises(ValueError):
+        resolve_job(parse(*argv), ENV)
+
+
+@patch('central_balancos_py.src.shards.extract_shard')
+def test_run_cli_extracts_single_shard(mock_extract_shard):
+    assert 0 == run_cli(['extract', '--shards', '4', '--shard', '2', '--shard-by', 'id'], ENV)
+
+    mock_extract_shard.assert_called_once_with(READ_ONLY_WORKSHEET_PATH, 2, 4, 'id', 8, 10, cache_directory=None)
+
+
+@patch('central_balancos_py.src.pdfs.download_pdfs')
+@patch('central_balancos_py.src.shards.extract_sharded')
+def test_run_cli_both_sharded_downloads_after_merge(mock_extract_sharded, mock_download):
+    assert 0 == run_cli(['both', '--shards', '4', '--processes', '2'], ENV)
+
+    mock_extract_sharded.assert_called_once_with(READ_ONLY_WORKSHEET_PATH, 'demonstracoes', 4, 'hash', 2, 8, 10,
+                                                 output_format=None, partition_by=None, cache_directory=None)
+    mock_download.assert_called_once()
+
+
+@patch('central_balancos_py.src.shards.merge_shards')
+def test_run_cli_merge(mock_merge):
+    assert 0 == run_cli(['merge', '--shards', '4', '--format', 'parquet'], ENV)
+
+    mock_merge.assert_called_once_with(READ_ONLY_WORKSHEET_PATH.replace('.xlsx', '.parquet'), 'demonstracoes', 4, 'hash',
+                                       'parquet', None)
@@ -0,0 +1,83 @@
+import logging
+from unittest.mock import patch
+
+import requests
+
+from central_balancos_py.src.client.circuit_breaker import CircuitBreaker
+from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.http import HttpClient
+from tests.support.clock import FakeClock
+
+logger = logging.getLogger(__name__)
+
+
+def circuit_breaker(clock):
+    return CircuitBreaker(logger, window=4, min_requests=4, failure_ratio=0.5, cooldown=30, clock=clock,
+                          sleep=clock.sleep)
+
+
+def response(status_code):
+    result = requests.Response()
+    result.status_code = status_code
+    return result
+
+
+def test_stays_closed_below_failure_ratio():
+    clock = FakeClock()
+    breaker = circuit_breaker(clock)
+    for success in [True, True, True, False]:
+        breaker.record(success)
+    breaker.wait()
+    assert 'closed' == breaker.state
+    assert 0 == clock.now
+
+
+def test_opens_and_pauses_until_cooldown():
+    clock = FakeClock()
+    breaker = circuit_breaker(clock)
+    for success in [True, False, True, False]:
+        breaker.record(success)
+    assert 'open' == breaker.state
+
+    breaker.wait()
+    assert 30 == clock.now
+    assert 'half_open' == breaker.state
+
+
+def test_probe_success_closes():
+    clock = FakeClock()
+    breaker = circuit_breaker(clock)
+    for _ in range(4):
+        breaker.record(False)
+    breaker.wait()
+    breaker.record(True)
+    assert 'closed' == breaker.state
+    assert 0 == len(breaker.outcomes)
+
+
+def test_probe_failure_reopens():
+    clock = FakeClock()
+    breaker = circuit_breaker(clock)
+    for _ in range(4):
+        breaker.record(False)
+    breaker.wait()
+    breaker.record(False)
+    assert 'open' == breaker.state
+    assert 2 == breaker.trips
+
+    breaker.wait()
+    assert 60 == clock.now
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_http_client_records_outcomes(mock_get):
+    clock = FakeClock()
+    breaker = circuit_breaker(clock)
+    mock_get.side_effect = [response(503), response(404), requests.exceptions.ConnectionError('refused'),
+                            response(200)]
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), circuit_breaker=breaker)
+
+    for _ in range(4):
+        client.get('https://example.com')
+
+    assert [False, True, False, True] == list(breaker.outcomes)
@@ -0,0 +1,36 @@
+import json
+from unittest.mock import patch
+
+import pytest
+from requests.models import Response
+
+from central_balancos_py.src.client import decoding
+from central_balancos_py.src.client.decoding import decode_json, loads
+from tests.support import factory
+
+BODY = {'items': [factory.statement()], 'totalCount': 1}
+
+
+def response(content):
+    result = Response()
+    result.status_code = 200
+    result._content = content
+    return result
+
+
+@pytest.mark.parametrize('accelerated', [True, False])
+def test_decode_json_matches_requests(accelerated):
+    content = json.dumps(BODY, ensure_ascii=False).encode()
+
+    with patch.object(decoding, 'orjson', decoding.orjson if accelerated else None):
+        assert response(content).json() == decode_json(response(content))
+
+
+def test_loads_falls_back_for_other_encodings():
+    assert BODY == loads(json.dumps(BODY).encode('utf-16'))
+
+
+@pytest.mark.parametrize('content', [b'', b'{"items": [', b'<html></html>'])
+def test_loads_rejects_invalid_json(content):
+    with pytest.raises(ValueError):
+        loads(content)
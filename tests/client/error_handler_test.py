@@ -4,7 +4,7 @@ import pytest
 from requests.models import Response
 from requests.exceptions import HTTPError, ConnectionError, Timeout, RequestException
 
-from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.error_handler import ErrorHandler, RequestFailure, is_failure, is_retryable
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
@@ -36,3 +36,53 @@ def test_handle_errors(caplog, error):
     with caplog.at_level(logging.ERROR):
         error_handler(lambda: raise_error(error))()
         assert 'error' in caplog.text
+
+
+def http_error(status_code):
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(response=response)
+
+
+@pytest.mark.parametrize(
+    "error, status_code, retryable",
+    [
+        (http_error(404), 404, False),
+        (http_error(400), 400, False),
+        (http_error(429), 429, True),
+        (http_error(503), 503, True),
+        (ConnectionError(), None, True),
+        (Timeout(), None, True),
+        (RequestException(), None, False),
+        (ValueError(), None, False),
+    ]
+)
+def test_returns_typed_failure(error, status_code, retryable):
+    error_handler = ErrorHandler(logger=logger)
+
+    result = error_handler(lambda: raise_error(error))()
+
+    assert is_failure(result)
+    assert not result
+    assert error is result.error
+    assert status_code == result.status_code
+    assert retryable == result.retryable
+    assert 0 <= result.elapsed
+    assert 1 == result.attempts
+
+
+def test_failure_carries_attempts():
+    error = ConnectionError()
+    error.attempts = 4
+
+    assert 4 == ErrorHandler(logger=logger)(lambda: raise_error(error))().attempts
+
+
+def test_passes_results_through():
+    assert 'ok' == ErrorHandler(logger=logger)(lambda: 'ok')()
+    assert not is_failure('ok')
+
+
+def test_is_retryable_without_response():
+    assert not is_retryable(HTTPError())
+    assert 'permanent 404' in repr(RequestFailure(http_error(404), 0.5))
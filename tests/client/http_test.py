@@ -6,6 +6,7 @@ import requests
 
 from central_balancos_py.src.client.http import HttpClient
 from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.retry import RetryScheduler
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
@@ -33,10 +34,55 @@ def mocked_requests_get(status_code):
 )
 def test_get(caplog, status_code, expected_result):
     with caplog.at_level(logging.ERROR):
-        with patch('central_balancos_py.src.client.http.requests.get') as mock_get:
+        with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
             mock_get.return_value = mocked_requests_get(status_code)
 
             client = HttpClient(error_handler=ErrorHandler(logger=logger))
             client.get('https://example.com')
             if status_code != 200:
                 assert f"HTTP error with status code {status_code}:" in caplog.text
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_get_uses_default_timeout(mock_get):
+    mock_get.return_value = mocked_requests_get(200)
+
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), timeout=(1, 2))
+    client.get('https://example.com')
+
+    mock_get.assert_called_once_with('https://example.com', params=None, stream=False, timeout=(1, 2))
+
+
+def test_session_pool_configuration():
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), pool_size=32, keep_alive=False)
+
+    adapter = client.session.get_adapter('https://example.com')
+    assert adapter is client.session.get_adapter('http://example.com')
+    assert 32 == adapter._pool_maxsize
+    assert 'close' == client.session.headers['Connection']
+    client.close()
+
+
+def test_connection_stats():
+    client = HttpClient(error_handler=ErrorHandler(logger=logger))
+    assert {'requests': 0, 'connections': 0, 'reused': 0} == client.connection_stats()
+
+    adapter = client.session.get_adapter('https://example.com')
+    pool = adapter.poolmanager.connection_from_url('https://example.com')
+    pool.num_requests, pool.num_connections = 5, 2
+
+    assert {'requests': 5, 'connections': 2, 'reused': 3} == client.connection_stats()
+    client.close()
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_get_with_retry_scheduler(mock_get):
+    mock_get.side_effect = [mocked_requests_get(503), mocked_requests_get(200)]
+    delays = []
+
+    client = HttpClient(error_handler=ErrorHandler(logger=logger),
+                        retry_scheduler=RetryScheduler(logger=logger, sleep=delays.append))
+
+    assert 200 == client.get('https://example.com').status_code
+    assert 2 == mock_get.call_count
+    assert 1 == len(delays)
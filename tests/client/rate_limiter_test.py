@@ -0,0 +1,70 @@
+import pytest
+
+from central_balancos_py.src.client.rate_limiter import AdaptiveRateLimiter
+from tests.support.clock import FakeClock
+
+
+def adaptive_rate_limiter(clock, requests_per_second=10, **kwargs):
+    return AdaptiveRateLimiter(requests_per_second, burst=1, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_adaptive_acquire_follows_current_rate():
+    clock = FakeClock()
+    rate_limiter = adaptive_rate_limiter(clock)
+    for _ in range(11):
+        rate_limiter.acquire('https://example.com/a')
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_adaptive_rate_increases_additively_on_success():
+    clock = FakeClock()
+    rate_limiter = adaptive_rate_limiter(clock, max_rate=11)
+    for _ in range(30):
+        rate_limiter.observe('https://example.com/a', 200, 0.1)
+    assert {'example.com': 11} == rate_limiter.rates()
+
+
+@pytest.mark.parametrize(
+    "status_code, latency",
+    [
+        (429, 0.1),
+        (503, 0.1),
+        (None, 0.1),
+        (200, 10),
+    ]
+)
+def test_adaptive_rate_decreases_multiplicatively_on_congestion(status_code, latency):
+    clock = FakeClock()
+    rate_limiter = adaptive_rate_limiter(clock)
+    rate_limiter.observe('https://example.com/a', status_code, latency)
+    assert {'example.com': 5} == rate_limiter.rates()
+
+
+def test_adaptive_rate_decreases_once_per_burst_of_failures():
+    clock = FakeClock()
+    rate_limiter = adaptive_rate_limiter(clock, min_rate=1)
+    for _ in range(5):
+        rate_limiter.observe('https://example.com/a', 429, 0.1)
+    assert {'example.com': 5} == rate_limiter.rates()
+
+    clock.now += 1
+    rate_limiter.observe('https://example.com/a', 429, 0.1)
+    assert {'example.com': 2.5} == rate_limiter.rates()
+
+
+def test_adaptive_rate_is_bounded():
+    clock = FakeClock()
+    rate_limiter = adaptive_rate_limiter(clock, min_rate=4)
+    for _ in range(5):
+        clock.now += 10
+        rate_limiter.observe('https://example.com/a', 500, 0.1)
+    assert {'example.com': 4} == rate_limiter.rates()
+
+
+def test_adaptive_unlimited():
+    clock = FakeClock()
+    rate_limiter = adaptive_rate_limiter(clock, requests_per_second=None)
+    for _ in range(100):
+        rate_limiter.acquire('https://example.com/a')
+        rate_limiter.observe('https://example.com/a', 500, 0.1)
+    assert 0 == clock.now
@@ -0,0 +1,139 @@
+import logging
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.http import HttpClient
+from central_balancos_py.src.client.response_cache import ResponseCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+URL = 'https://example.com/Participante'
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(status_code=200, content=b'{"items": []}', headers=None):
+    result = requests.Response()
+    result.status_code = status_code
+    result.url = URL
+    result._content = content
+    result.headers.update(headers or {})
+    return result
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResponseCache(str(tmp_path), ttl=60, clock=clock)
+
+
+def test_cache_key_ignores_params_order():
+    assert cache_key(URL, {'a': 1, 'b': 2}) == cache_key(URL, {'b': 2, 'a': 1})
+    assert cache_key(URL, {'a': 1}) != cache_key(URL, {'a': 2})
+
+
+def test_store_and_hit(cache):
+    cache.store(URL, {'page': 1}, response(headers={'ETag': '"v1"'}))
+    entry = cache.lookup(URL, {'page': 1})
+
+    assert cache.is_fresh(entry)
+    assert {'items': []} == cache.hit(entry).json()
+    assert cache.lookup(URL, {'page': 2}) is None
+    assert {'hits': 1, 'misses': 1} == {key: cache.stats()[key] for key in ['hits', 'misses']}
+
+
+def test_entry_expires_after_ttl(cache, clock):
+    cache.store(URL, None, response())
+    clock.now += 61
+
+    assert not cache.is_fresh(cache.lookup(URL))
+
+
+def test_validators(cache):
+    cache.store(URL, None, response(headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'}))
+
+    assert {'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Wed, 01 Jan 2025 00:00:00 GMT'} == cache.validators(cache.lookup(URL))
+    assert {} == cache.validators(None)
+
+
+def test_errors_are_not_stored(cache):
+    cache.store(URL, None, response(status_code=500))
+
+    assert cache.lookup(URL) is None
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path), clock=clock)
+    for page in range(3):
+        cache.store(URL, {'page': page}, response(content=b'x' * 300))
+    cache.max_bytes = cache.stats()['bytes'] + 100
+    cache.hit(cache.lookup(URL, {'page': 0}))
+    cache.store(URL, {'page': 3}, response(content=b'x' * 300))
+
+    assert cache.lookup(URL, {'page': 0}) is not None
+    assert cache.lookup(URL, {'page': 1}) is None
+    assert 1 == cache.stats()['evictions']
+    assert cache.stats()['bytes'] <= cache.max_bytes
+
+
+def test_reloads_entries_from_disk(tmp_path, clock):
+    ResponseCache(str(tmp_path), clock=clock).store(URL, None, response())
+
+    reloaded = ResponseCache(str(tmp_path), clock=clock)
+    assert 1 == reloaded.stats()['entries']
+    assert reloaded.is_fresh(reloaded.lookup(URL))
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_http_client_serves_fresh_entries_from_cache(mock_get, cache):
+    mock_get.return_value = response(headers={'ETag': '"v1"'})
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), response_cache=cache)
+
+    first = client.get(URL, params={'page': 1})
+    second = client.get(URL, params={'page': 1})
+
+    assert 1 == mock_get.call_count
+    assert first.json() == second.json()
+    assert 1 == client.cache_stats()['hits']
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_http_client_revalidates_stale_entries(mock_get, cache, clock):
+    mock_get.return_value = response(headers={'ETag': '"v1"'})
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), response_cache=cache)
+    client.get(URL)
+    clock.now += 61
+    mock_get.return_value = response(status_code=304, content=b'')
+
+    revalidated = client.get(URL)
+
+    assert {'items': []} == revalidated.json()
+    assert {'If-None-Match': '"v1"'} == mock_get.call_args.kwargs['headers']
+    assert 1 == client.cache_stats()['revalidated']
+    assert cache.is_fresh(cache.lookup(URL))
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_http_client_does_not_cache_streams(mock_get, cache):
+    mock_get.return_value = response()
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), response_cache=cache)
+
+    client.get(URL, stream=True)
+    client.get(URL, stream=True)
+
+    assert 2 == mock_get.call_count
+    assert 0 == cache.stats()['entries']
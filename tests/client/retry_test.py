@@ -0,0 +1,107 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from requests.exceptions import HTTPError, ConnectionError
+from requests.models import Response
+
+from central_balancos_py.src.client.retry import RetryScheduler, parse_retry_after
+
+logging.basicConfig(level=logging.INFO,
+                    format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
+
+logger = logging.getLogger(__name__)
+
+
+def throttled_error(retry_after):
+    response = Response()
+    response.status_code = 429
+    response.headers['Retry-After'] = retry_after
+    return HTTPError(response=response)
+
+
+def flaky(failures, error):
+    state = {'calls': 0}
+
+    def func():
+        state['calls'] += 1
+        if state['calls'] <= failures:
+            raise error
+        return state['calls']
+
+    return func
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert 5 == parse_retry_after('5')
+    assert parse_retry_after('soon') is None
+    in_ten_seconds = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=10), usegmt=True)
+    assert 8 < parse_retry_after(in_ten_seconds) <= 10
+
+
+def test_backoff_is_jittered_and_capped():
+    scheduler = RetryScheduler(logger=logger, base_delay=1, max_delay=5)
+    for attempt in range(10):
+        assert 0 <= scheduler.backoff(attempt) <= min(5, 2 ** attempt)
+
+
+def test_retries_until_success():
+    delays = []
+    scheduler = RetryScheduler(logger=logger, max_retries=3, sleep=delays.append)
+
+    assert 3 == scheduler(flaky(2, ConnectionError()))()
+    assert 2 == len(delays)
+
+
+def test_gives_up_after_max_retries():
+    delays = []
+    scheduler = RetryScheduler(logger=logger, max_retries=2, sleep=delays.append)
+
+    with pytest.raises(ConnectionError):
+        scheduler(flaky(5, ConnectionError()))()
+    assert 2 == len(delays)
+
+
+def test_honours_retry_after():
+    delays = []
+    scheduler = RetryScheduler(logger=logger, base_delay=0.01, sleep=delays.append)
+
+    scheduler(flaky(1, throttled_error('7')))()
+    assert [7] == delays
+
+
+def test_does_not_retry_unexpected_errors():
+    delays = []
+    scheduler = RetryScheduler(logger=logger, sleep=delays.append)
+
+    with pytest.raises(ValueError):
+        scheduler(flaky(1, ValueError()))()
+    assert [] == delays
+
+
+def http_error(status_code):
+    response = Response()
+    response.status_code = status_code
+    return HTTPError(response=response)
+
+
+def test_does_not_retry_permanent_http_errors():
+    delays = []
+    scheduler = RetryScheduler(logger=logger, sleep=delays.append)
+
+    with pytest.raises(HTTPError) as error:
+        scheduler(flaky(1, http_error(404)))()
+    assert [] == delays
+    assert 1 == error.value.attempts
+
+
+def test_retries_transient_http_errors():
+    delays = []
+    scheduler = RetryScheduler(logger=logger, max_retries=2, base_delay=0.01, sleep=delays.append)
+
+    with pytest.raises(HTTPError) as error:
+        scheduler(flaky(5, http_error(503)))()
+    assert 2 == len(delays)
+    assert 3 == error.value.attempts
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from central_balancos_py.src.columnar import StatementColumns, DictionaryColumn
+from central_balancos_py.src.constants import ROW_COLUMNS, INDEX_COLUMNS
+from central_balancos_py.src.records import StatementRow
+from tests.support import factory
+
+
+def test_dictionary_column_encodes_repeated_values():
+    column = DictionaryColumn()
+    for value in ['b', 'a', 'b', 'b']:
+        column.append(value)
+
+    assert 4 == len(column)
+    assert ['b', 'a'] == column.values
+    assert [0, 1, 0, 0] == column.code_array().tolist()
+    assert [1, 0, 1, 1] == column.ranks().tolist()
+    assert ['a', 'b'] == column.take(np.array([1, 0])).tolist()
+
+
+def test_to_frame():
+    rows = [factory.row('Google', '12345670000890'), factory.row('Apple', '23456700008901')]
+    columns = StatementColumns().extend(StatementRow.from_dict(row) for row in rows)
+
+    assert 2 == len(columns)
+    assert pd.DataFrame(rows, columns=ROW_COLUMNS).equals(columns.to_frame())
+
+
+def test_to_frame_sorted():
+    rows = [{**factory.row('Google'), 'dataPublicacao': '2023-01-01'},
+            {**factory.row('Apple'), 'dataPublicacao': '2022-01-01'},
+            {**factory.row('Google'), 'dataPublicacao': '2021-01-01'},
+            {**factory.row('Apple'), 'tipoDemonstracao': 'Balanço Patrimonial (BP)'}]
+
+    expected = pd.DataFrame(rows, columns=ROW_COLUMNS).sort_values(by=INDEX_COLUMNS).reset_index(drop=True)
+    records = [StatementRow.from_dict(row) for row in rows]
+    assert expected.equals(StatementColumns().extend(records).to_frame(sort_by=INDEX_COLUMNS))
+
+
+def test_to_frame_empty():
+    frame = StatementColumns().to_frame(sort_by=INDEX_COLUMNS)
+    assert ROW_COLUMNS == frame.columns.tolist()
+    assert 0 == len(frame)
@@ -0,0 +1,105 @@
+import random
+import threading
+import time
+
+import pytest
+
+from central_balancos_py.src.concurrency import WorkQueue, ordered_map, prefetch
+
+
+def test_ordered_map_preserves_order():
+    def slow_identity(item):
+        time.sleep(random.uniform(0, 0.01))
+        return item
+
+    assert list(range(50)) == list(ordered_map(slow_identity, range(50), max_workers=8))
+
+
+def test_ordered_map_bounds_in_flight_items():
+    state = {'in_flight': 0, 'peak': 0}
+    lock = threading.Lock()
+
+    def track(item):
+        with lock:
+            state['in_flight'] += 1
+            state['peak'] = max(state['peak'], state['in_flight'])
+        time.sleep(0.005)
+        with lock:
+            state['in_flight'] -= 1
+        return item
+
+    list(ordered_map(track, range(30), max_workers=3))
+    assert state['peak'] <= 3
+
+
+def test_ordered_map_empty():
+    assert [] == list(ordered_map(lambda item: item, []))
+
+
+def test_prefetch_yields_all_items():
+    assert list(range(100)) == list(prefetch(iter(range(100)), buffer_size=10))
+
+
+def test_prefetch_reads_ahead():
+    produced = []
+
+    def produce():
+        for item in range(5):
+            produced.append(item)
+            yield item
+
+    items = prefetch(produce(), buffer_size=3)
+    assert 0 == next(items)
+    time.sleep(0.05)
+    assert len(produced) > 1
+    assert [1, 2, 3, 4] == list(items)
+
+
+def test_prefetch_propagates_errors():
+    def produce():
+        yield 1
+        raise ValueError('broken page')
+
+    items = prefetch(produce(), buffer_size=3)
+    assert 1 == next(items)
+    with pytest.raises(ValueError):
+        next(items)
+
+
+def test_work_queue_runs_all_items():
+    with WorkQueue(lambda item: item * 2, workers=3, queue_size=1) as work:
+        for item in range(20):
+            work.put(item)
+
+    assert [item * 2 for item in range(20)] == sorted(work.results)
+    assert [] == work.errors
+
+
+def test_work_queue_blocks_when_full():
+    release = threading.Event()
+    work = WorkQueue(lambda item: release.wait(), workers=1, queue_size=1)
+    work.put(0)
+    work.put(1)
+
+    producer = threading.Thread(target=work.put, args=(2,), daemon=True)
+    producer.start()
+    producer.join(timeout=0.05)
+    assert producer.is_alive()
+
+    release.set()
+    producer.join()
+    assert 3 == len(work.join())
+
+
+def test_work_queue_collects_errors():
+    def fail_on_odd(item):
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    with WorkQueue(fail_on_odd, workers=2) as work:
+        for item in range(6):
+            work.put(item)
+
+    assert [0, 2, 4] == sorted(work.results)
+    assert [1, 3, 5] == sorted(error.args[0] for error in work.errors)
@@ -1,8 +1,13 @@
 import os
 
+DATA_DIRECTORY = os.path.join(os.getcwd(), 'tests', 'data')
 PDFS_DIRECTORY = os.path.join(os.getcwd(), 'tests', 'data', 'pdfs')
 PROJECT_ROOT_PATH = '/Users/example/Downloads/central_balancos_py'
 SAMPLE_PDF_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'sample.pdf')
 READ_ONLY_FILTERED_WORKSHEET_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'demonstracoes_filtered.xlsx')
 READ_ONLY_WORKSHEET_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'demonstracoes.xlsx')
 TEMP_WORKSHEET_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'temp_demonstracoes.xlsx')
+TEMP_CHECKPOINT_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'temp_demonstracoes.checkpoint.jsonl')
+TEMP_STATE_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'temp_demonstracoes.state.json')
+TEMP_PARQUET_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'temp_demonstracoes.parquet')
+TEMP_FEATHER_PATH = os.path.join(os.getcwd(), 'tests', 'data', 'temp_demonstracoes.feather')
@@ -1,5 +1,7 @@
+import json
 import logging
 import os
+import re
 from unittest.mock import patch
 
 import pandas as pd
@@ -7,11 +9,18 @@ import pytest
 import requests
 
 import tests.support.factory as factory
-from tests.constants import TEMP_WORKSHEET_PATH
-from central_balancos_py.src.client.error_handler import ErrorHandler
+from tests.constants import TEMP_WORKSHEET_PATH, TEMP_CHECKPOINT_PATH, TEMP_STATE_PATH, TEMP_PARQUET_PATH
+from tests.util import clean_up_worksheet_caches
+from central_balancos_py.src.checkpoint import CheckpointJournal
+from central_balancos_py.src.output import to_excel, read_statements
+from central_balancos_py.src.records import Company
+from central_balancos_py.src.state import StateStore
+from central_balancos_py.src.client.error_handler import ErrorHandler, is_failure
 from central_balancos_py.src.client.http import HttpClient
-from central_balancos_py.src.extract import url_company, url_list, extract_row, try_parse_statement, maybe_retry_parse, \
-    parse_statements, transpose, to_df, to_excel, fetch_companies, extract_company_info
+from central_balancos_py.src.client.retry import RetryScheduler
+from central_balancos_py.src.extract import url_company, url_list, extract_row, try_parse_statement, parse_statements, \
+    to_df, fetch_companies, extract_company_info, statements_watermark, \
+    probe_company, select_changed, merge_rows, read_existing_rows, iter_statements, PAGE_SIZE
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
@@ -26,8 +35,10 @@ def on_exit():
     logger.info("Setting up resources...")
     yield
     logger.info("Tearing down resources...")
-    if os.path.exists(TEMP_WORKSHEET_PATH):
-        os.remove(TEMP_WORKSHEET_PATH)
+    for path in [TEMP_WORKSHEET_PATH, f'{TEMP_WORKSHEET_PATH}.state.json']:
+        if os.path.exists(path):
+            os.remove(path)
+    clean_up_worksheet_caches()
 
 
 class MockResponse(requests.Response):
@@ -35,6 +46,7 @@ class MockResponse(requests.Response):
         super().__init__()
         self.json_data = json_data
         self.status_code = status_code
+        self._content = json.dumps(json_data).encode()
 
     def json(self, **kwargs):
         return self.json_data
@@ -71,12 +83,12 @@ def test_fetch_companies_success_all():
                            {'id': 2311, 'cnpj': '07921278000140', 'nome': '18N PARTICIPACOES S/A'},
                            {'id': 1468, 'cnpj': '19625833000176', 'nome': '1DOC TECNOLOGIA S.A'}],
                  'totalCount': 4}
-    with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
         mock_get.return_value = mocked_requests_get(json_data, status_code)
-        items = fetch_companies(http_client, cnpj)
+        items = list(fetch_companies(http_client, cnpj))
         assert len(items) == 4
         for item in items:
-            assert item.keys() == {'id', 'cnpj', 'nome'}
+            assert isinstance(item, Company)
 
 
 def test_fetch_companies_success_single():
@@ -88,27 +100,73 @@ def test_fetch_companies_success_single():
         ],
         'totalCount': 1
     }
-    with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
         mock_get.return_value = mocked_requests_get(json_data, status_code)
-        items = fetch_companies(http_client, cnpj)
+        items = list(fetch_companies(http_client, cnpj))
         assert len(items) == 1
         for item in items:
-            assert item.keys() == {'id', 'cnpj', 'nome'}
+            assert isinstance(item, Company)
 
 
 def test_fetch_companies_error(caplog):
     cnpj = None
     status_code = 500
     with caplog.at_level(logging.ERROR):
-        with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+        with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
             mock_get.return_value = mocked_requests_get({}, status_code)
             with pytest.raises(requests.HTTPError) as exception:
-                fetch_companies(http_client, cnpj)
-                assert f"HTTP error with status code {status_code}:" in caplog.text
+                list(fetch_companies(http_client, cnpj))
+            assert f"HTTP error with status code {status_code}:" in caplog.text
+
+
+def test_fetch_companies_paginates():
+    companies = [{'id': i, 'cnpj': f'{i:014d}', 'nome': f'COMPANY {i}'} for i in range(5)]
+    urls = []
+
+    def paginated_requests_get(url, **_kwargs):
+        urls.append(url)
+        page = int(re.search(r'page=(\d+)', url)[1])
+        return mocked_requests_get({'items': companies[(page - 1) * 2:page * 2], 'totalCount': 5}, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = paginated_requests_get
+        pages = fetch_companies(http_client, None, page_size=2)
+
+        assert Company.from_json(companies[0]) == next(pages)
+        assert [url_list(1, 2, None)] == urls
+        assert [Company.from_json(company) for company in companies[1:]] == list(pages)
+        assert [url_list(1, 2, None), url_list(2, 2, None), url_list(3, 2, None)] == urls
+
+
+def test_fetch_companies_paginates_without_total_count():
+    companies = [{'id': i, 'cnpj': f'{i:014d}', 'nome': f'COMPANY {i}'} for i in range(5)]
+
+    def paginated_requests_get(url, **_kwargs):
+        page = int(re.search(r'page=(\d+)', url)[1])
+        return mocked_requests_get({'items': companies[(page - 1) * 2:page * 2]}, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = paginated_requests_get
+        fetched = list(fetch_companies(http_client, None, page_size=2))
+        assert [Company.from_json(company) for company in companies] == fetched
+        assert 3 == mock_get.call_count
+
+
+def test_try_parse_statement_paginates_without_total_count():
+    statements = [{**factory.statement(), 'id': i} for i in range(4)]
+
+    def paginated_requests_get(url, **_kwargs):
+        page = int(re.search(r'page=(\d+)', url)[1])
+        return mocked_requests_get({'items': statements[(page - 1) * 2:page * 2]}, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = paginated_requests_get
+        assert 4 == len(try_parse_statement(factory.company_record(), http_client, page_size=2))
+        assert 3 == mock_get.call_count
 
 
 def test_extract_row():
-    assert factory.row() == extract_row(factory.statement(), '13385440000156')
+    assert factory.statement_row() == extract_row(factory.statement(), '13385440000156')
 
 
 def test_try_parse_statement_success():
@@ -117,66 +175,91 @@ def test_try_parse_statement_success():
         'items': [factory.statement()],
         'totalCount': 1
     }
-    with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
         mock_get.return_value = mocked_requests_get(json_data, status_code)
-        assert factory.row() == try_parse_statement(factory.company(), http_client)
+        assert [factory.statement_row()] == try_parse_statement(factory.company_record(), http_client)
+
+
+def test_try_parse_statement_paginates():
+    statements = [{**factory.statement(), 'id': statement_id} for statement_id in range(5)]
+    urls = []
+
+    def paginated_requests_get(url, **_kwargs):
+        urls.append(url)
+        page = int(re.search(r'page=(\d+)', url)[1])
+        return mocked_requests_get({'items': statements[(page - 1) * 2:page * 2], 'totalCount': 5}, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = paginated_requests_get
+        rows = try_parse_statement(factory.company_record(), http_client, page_size=2)
+
+    assert list(range(5)) == [row.statement_id for row in rows]
+    assert [url_company(635, page, 2) for page in (1, 2, 3)] == urls
+
+
+def test_try_parse_statement_without_statements():
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.return_value = mocked_requests_get({'items': [], 'totalCount': 0}, 200)
+        assert [] == try_parse_statement(factory.company_record(), http_client)
 
 
 def test_try_parse_statement_error(caplog):
-    fake_company = {'id': -1, 'cnpj': '12345670000890', 'nome': 'FANTASY'}
+    fake_company = Company(-1, '12345670000890', 'FANTASY')
     status_code = 404
     json_data = {}
     with caplog.at_level(logging.ERROR):
-        with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+        with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
             mock_get.return_value = mocked_requests_get(json_data, status_code)
-            assert try_parse_statement(fake_company, http_client) is None
+            assert is_failure(try_parse_statement(fake_company, http_client))
             assert f"Failed to extract" in caplog.text
 
 
-def test_maybe_retry_parse_noop():
-    assert [] == maybe_retry_parse([], http_client, 0)
-
-
-def test_maybe_retry_parse_execution():
-    status_code = 200
-    json_data = {
-        'items': [factory.statement()],
-        'totalCount': 1
-    }
-    with patch('central_balancos_py.src.extract.requests.get') as mock_get:
-        mock_get.return_value = mocked_requests_get(json_data, status_code)
-        assert [factory.row()] == maybe_retry_parse([factory.company()], http_client, 0)
-
-
 def test_parse_statements_success():
     status_code = 200
     json_data = {
         'items': [factory.statement(), factory.statement()],
         'totalCount': 2
     }
-    companies = [factory.company(), factory.company()]
-    rows = [factory.row(), factory.row()]
-    with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+    companies = [factory.company_record(), factory.company_record()]
+    rows = [factory.statement_row(), factory.statement_row(), factory.statement_row(), factory.statement_row()]
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
         mock_get.return_value = mocked_requests_get(json_data, status_code)
         assert rows == parse_statements(companies, http_client)
 
 
-def test_parse_statements_success_after_retry():
-    state = {'retry_count': 0}
-
-    def try_parse_statement_mock(_company, _client):
-        if state['retry_count'] == 0:
-            state['retry_count'] += 1
-            return None
-        return factory.row()
-
-    companies = [factory.company(), factory.company()]
-    rows = [factory.row(), factory.row()]
-    with patch('central_balancos_py.src.extract.try_parse_statement') as mock_parse, patch(
-            'central_balancos_py.src.extract.retry_delay') as mock_delay:
-        mock_delay.return_value = 0
+def test_parse_statements_preserves_company_order():
+    companies = [Company(i, f'{i:014d}', f'COMPANY {i}') for i in range(20)]
+
+    def try_parse_statement_mock(company, _client, **_kwargs):
+        return [factory.statement_row(company.nome, company.cnpj)]
+
+    with patch('central_balancos_py.src.extract.try_parse_statement') as mock_parse:
         mock_parse.side_effect = try_parse_statement_mock
-        assert rows == parse_statements(companies, http_client)
+        rows = parse_statements(companies, http_client, max_workers=4)
+        assert [company.nome for company in companies] == [row.nomeParticipante for row in rows]
+
+
+def test_parse_statements_success_after_retry():
+    state = {'calls': 0}
+    json_data = {
+        'items': [factory.statement()],
+        'totalCount': 1
+    }
+
+    def flaky_requests_get(_url, **_kwargs):
+        state['calls'] += 1
+        if state['calls'] == 1:
+            raise requests.exceptions.ConnectionError('connection reset')
+        return mocked_requests_get(json_data, 200)
+
+    retrying_client = HttpClient(error_handler=ErrorHandler(logger=logger),
+                                 retry_scheduler=RetryScheduler(logger=logger, sleep=lambda _delay: None))
+    companies = [factory.company_record(), factory.company_record()]
+    rows = [factory.statement_row(), factory.statement_row()]
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = flaky_requests_get
+        assert rows == parse_statements(companies, retrying_client, max_workers=1)
+        assert 3 == state['calls']
 
 
 def test_parse_statements_error(caplog):
@@ -185,35 +268,44 @@ def test_parse_statements_error(caplog):
         'items': [],
         'totalCount': 0
     }
-    companies = [factory.company(), factory.company()]
+    companies = [factory.company_record(), factory.company_record()]
     rows = []
-    with caplog.at_level(logging.INFO):
-        with patch('central_balancos_py.src.extract.requests.get') as mock_get, patch(
-                'central_balancos_py.src.extract.retry_delay') as mock_delay:
+    with caplog.at_level(logging.ERROR):
+        with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
             mock_get.return_value = mocked_requests_get(json_data, status_code)
-            mock_delay.return_value = 0
             assert rows == parse_statements(companies, http_client)
-            assert f"Retrying parse" in caplog.text
+            assert "Failed to extract" in caplog.text
+
+
+def test_parse_statements_resumes_from_checkpoint():
+    journal = CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    done = Company(1, '12345670000890', 'DONE')
+    pending = factory.company_record()
+    journal.record(done, [factory.statement_row('DONE', '12345670000890')])
+
+    with patch('central_balancos_py.src.extract.try_parse_statement') as mock_parse:
+        mock_parse.return_value = [factory.statement_row()]
+        rows = parse_statements([done, pending], http_client, journal=CheckpointJournal(TEMP_CHECKPOINT_PATH))
+        mock_parse.assert_called_once_with(pending, http_client, state=None)
+
+    assert [factory.statement_row('DONE', '12345670000890'), factory.statement_row()] == rows
+    assert pending in CheckpointJournal(TEMP_CHECKPOINT_PATH)
+    os.remove(TEMP_CHECKPOINT_PATH)
+
+
+def test_iter_statements_streams_rows():
+    companies = [factory.company_record(), factory.company_record()]
 
+    with patch('central_balancos_py.src.extract.try_parse_statement') as mock_parse:
+        mock_parse.return_value = [factory.statement_row(), factory.statement_row()]
+        rows = iter_statements(companies, http_client, max_workers=1)
 
-def test_transpose():
-    rows = [factory.row('Google', '12345670000890'), factory.row('Apple', '23456700008901')]
-    assert {
-               'nomeParticipante': ['Google', 'Apple'],
-               'cnpj': ['12345670000890', '23456700008901'],
-               'tipoDemonstracao': ['Demonstrações Contábeis Completas (DCC)',
-                                    'Demonstrações Contábeis Completas (DCC)'],
-               'status': ['Publicado', 'Publicado'],
-               'dataFim': ['2022-12-31T00:00:00', '2022-12-31T00:00:00'],
-               'dataPublicacao': ['2023-06-21T11:24:32.34', '2023-06-21T11:24:32.34'],
-               'pdf': [
-                   'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820',
-                   'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820']
-           } == transpose(rows)
+        assert factory.statement_row() == next(rows)
+        assert 3 == len(list(rows))
 
 
 def test_to_df():
-    rows = [factory.row('Google', '12345670000890'), factory.row('Apple', '23456700008901')]
+    rows = [factory.statement_row('Google', '12345670000890'), factory.statement_row('Apple', '23456700008901')]
     expected = pd.DataFrame({
         'nomeParticipante': ['Apple', 'Google'],
         'tipoDemonstracao': ['Demonstrações Contábeis Completas (DCC)',
@@ -229,21 +321,9 @@ def test_to_df():
     assert expected.equals(to_df(rows))
 
 
-def test_to_excel():
-    rows = [factory.row('Google', '12345670000890'), factory.row('Apple', '23456700008901')]
-    df = to_df(rows)
-    sheet_name = 'demonstracoes'
-
-    to_excel(df, TEMP_WORKSHEET_PATH, sheet_name)
-
-    saved = pd.read_excel(TEMP_WORKSHEET_PATH, sheet_name=sheet_name)
-    saved['cnpj'] = saved['cnpj'].astype('string')
-    expected = df.reset_index()
-    expected['cnpj'] = saved['cnpj'].astype('string')
-
-    assert saved.equals(expected)
-
-    os.remove(TEMP_WORKSHEET_PATH)
+def test_to_df_streams_generator():
+    rows = (factory.statement_row(name, '12345670000890') for name in ['Google', 'Apple', 'Meta'])
+    assert ['Apple', 'Google', 'Meta'] == to_df(rows).index.get_level_values('nomeParticipante').tolist()
 
 
 def test_extract_company_info():
@@ -266,7 +346,7 @@ def test_extract_company_info():
 
     expected = factory.statement_df()
 
-    with patch('central_balancos_py.src.extract.requests.get') as mock_get:
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
         mock_get.side_effect = multi_mock_requests_get
 
         sheet_name = 'demonstracoes'
@@ -276,5 +356,278 @@ def test_extract_company_info():
         saved['cnpj'] = saved['cnpj'].astype('string')
 
         assert saved.equals(expected)
+        assert not os.path.exists(f'{TEMP_WORKSHEET_PATH}.all.checkpoint.jsonl')
+
+    os.remove(TEMP_WORKSHEET_PATH)
+
+
+def test_extract_company_info_seeds_state_for_incremental_runs():
+    companies_json_data = {'items': [factory.company()], 'totalCount': 1}
+    older = {**factory.statement(), 'id': 3003, 'dataPublicacao': '2019-11-20T22:55:55.627'}
+    statements = [factory.statement(), older]
+
+    def multi_mock_requests_get(url, **_kwargs):
+        if 'Participante' in url:
+            return mocked_requests_get(companies_json_data, 200)
+        return mocked_requests_get({'items': statements, 'totalCount': len(statements)}, 200)
+
+    sheet_name = 'demonstracoes'
+    state_file = f'{TEMP_WORKSHEET_PATH}.state.json'
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = multi_mock_requests_get
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name)
+        assert os.path.exists(state_file)
+
+        modified_at = os.path.getmtime(TEMP_WORKSHEET_PATH)
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name, incremental=True)
+        assert modified_at == os.path.getmtime(TEMP_WORKSHEET_PATH)
+
+        statements[1] = {**older, 'status': 'Retificado', 'dataModificacao': '2024-01-01T00:00:00'}
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name, incremental=True)
+        assert ['Publicado', 'Retificado'] == sorted(read_statements(TEMP_WORKSHEET_PATH, sheet_name)['status'])
+
+    os.remove(TEMP_WORKSHEET_PATH)
+    os.remove(state_file)
+
+
+def test_extract_company_info_revalidates_statements_on_incremental_runs():
+    companies_json_data = {'items': [factory.company()], 'totalCount': 1}
+    statements_json_data = {'items': [factory.statement()], 'totalCount': 1}
+    validators = []
+
+    def conditional_requests_get(url, headers=None, **_kwargs):
+        validators.append((headers or {}).get('If-None-Match'))
+        if (headers or {}).get('If-None-Match') == '"v1"':
+            return mocked_requests_get({}, 304)
+        response = mocked_requests_get(companies_json_data if 'Participante' in url else statements_json_data, 200)
+        response.headers['ETag'] = '"v1"'
+        return response
+
+    sheet_name = 'demonstracoes'
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = conditional_requests_get
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name)
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name, incremental=True)
+
+        validators.clear()
+        modified_at = os.path.getmtime(TEMP_WORKSHEET_PATH)
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name, incremental=True)
+
+        assert ['"v1"', '"v1"'] == validators
+        assert modified_at == os.path.getmtime(TEMP_WORKSHEET_PATH)
+
+    os.remove(TEMP_WORKSHEET_PATH)
+    clean_up_worksheet_caches()
+
+
+def test_extract_company_info_incremental_without_worksheet_extracts_everything():
+    companies_json_data = {'items': [factory.company()], 'totalCount': 1}
+    statements_json_data = {'items': [factory.statement()], 'totalCount': 1}
+    journal_path = f'{TEMP_WORKSHEET_PATH}.all.checkpoint.jsonl'
+    state = StateStore(f'{TEMP_WORKSHEET_PATH}.state.json')
+    state.update(factory.company_record(), statements_watermark([factory.statement()]))
+    state.save()
+
+    def multi_mock_requests_get(url, **_kwargs):
+        if 'Participante' in url:
+            return mocked_requests_get(companies_json_data, 200)
+        return mocked_requests_get(statements_json_data, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = multi_mock_requests_get
+        extract_company_info(TEMP_WORKSHEET_PATH, 'demonstracoes', incremental=True)
+        assert factory.statement_df().equals(read_statements(TEMP_WORKSHEET_PATH, 'demonstracoes')
+                                             .astype({'cnpj': 'string'}))
+
+        interrupted = CheckpointJournal(journal_path)
+        interrupted.record(Company(1, '12345670000890', 'OTHER'), [factory.statement_row('OTHER', '12345670000890')])
+        extract_company_info(TEMP_WORKSHEET_PATH, 'demonstracoes', incremental=True)
+
+    assert 1 == len(CheckpointJournal(journal_path))
+
+    os.remove(TEMP_WORKSHEET_PATH)
+    os.remove(journal_path)
+    clean_up_worksheet_caches()
+
+
+def test_extract_company_info_keeps_checkpoint_of_failed_companies():
+    failing = {**factory.company(), 'id': 636, 'cnpj': '12345670000890', 'nome': 'FAILING S.A.'}
+    companies_json_data = {'items': [factory.company(), failing], 'totalCount': 2}
+    statements_json_data = {'items': [factory.statement()], 'totalCount': 1}
+    journal_path = f'{TEMP_WORKSHEET_PATH}.all.checkpoint.jsonl'
+    urls = []
+
+    def multi_mock_requests_get(url, **_kwargs):
+        urls.append(url)
+        if 'Participante' in url:
+            return mocked_requests_get(companies_json_data, 200)
+        if '/636/' in url and fail:
+            return mocked_requests_get({}, 503)
+        return mocked_requests_get(statements_json_data, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get, \
+            patch('central_balancos_py.src.client.retry.random.uniform', return_value=0):
+        mock_get.side_effect = multi_mock_requests_get
+        fail = True
+        with pytest.raises(RuntimeError):
+            extract_company_info(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+        assert 1 == len(read_statements(TEMP_WORKSHEET_PATH, 'demonstracoes'))
+        assert 1 == len(CheckpointJournal(journal_path))
+
+        fail = False
+        urls.clear()
+        extract_company_info(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+        assert url_company(635, 1, PAGE_SIZE) not in urls
+        assert url_company(636, 1, PAGE_SIZE) in urls
+        assert 2 == len(read_statements(TEMP_WORKSHEET_PATH, 'demonstracoes'))
+        assert not os.path.exists(journal_path)
+
+    os.remove(TEMP_WORKSHEET_PATH)
+
+
+def test_extract_company_info_drops_companies_with_permanent_errors(caplog):
+    failing = {**factory.company(), 'id': 636, 'cnpj': '12345670000890', 'nome': 'FAILING S.A.'}
+    companies_json_data = {'items': [factory.company(), failing], 'totalCount': 2}
+    statements = [factory.statement()]
+    journal_path = f'{TEMP_WORKSHEET_PATH}.all.checkpoint.jsonl'
+
+    def multi_mock_requests_get(url, **_kwargs):
+        if 'Participante' in url:
+            return mocked_requests_get(companies_json_data, 200)
+        if '/636/' in url:
+            return mocked_requests_get({}, 404)
+        return mocked_requests_get({'items': statements, 'totalCount': len(statements)}, 200)
+
+    with caplog.at_level(logging.WARNING), \
+            patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = multi_mock_requests_get
+        extract_company_info(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+        assert '1 companies were left out after a permanent error: FAILING S.A. (12345670000890)' in caplog.text
+        assert not os.path.exists(journal_path)
+
+        statements[0] = {**factory.statement(), 'dataPublicacao': '2024-01-01T00:00:00'}
+        extract_company_info(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+        saved = read_statements(TEMP_WORKSHEET_PATH, 'demonstracoes')
+        assert ['2024-01-01T00:00:00'] == list(saved['dataPublicacao'].astype(str))
+
+    os.remove(TEMP_WORKSHEET_PATH)
+
+
+def test_extract_company_info_parquet():
+    companies_json_data = {'items': [factory.company()], 'totalCount': 1}
+    statements_json_data = {'items': [factory.statement()], 'totalCount': 1}
+
+    def multi_mock_requests_get(url, **_kwargs):
+        if 'Participante' in url:
+            return mocked_requests_get(companies_json_data, 200)
+        return mocked_requests_get(statements_json_data, 200)
+
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = multi_mock_requests_get
+        extract_company_info(TEMP_PARQUET_PATH, 'demonstracoes')
+
+    assert factory.statement_df().equals(read_statements(TEMP_PARQUET_PATH, 'demonstracoes')
+                                         .astype({'cnpj': 'string'}))
+    os.remove(TEMP_PARQUET_PATH)
+
+
+def test_statements_watermark():
+    older = {**factory.statement(), 'id': 3003, 'dataPublicacao': '2019-11-20T22:55:55.627'}
+    watermark = statements_watermark([factory.statement(), older])
+
+    assert 2 == watermark['totalCount']
+    assert watermark == statements_watermark([older, factory.statement()])
+    assert watermark != statements_watermark([factory.statement(), {**older, 'dataModificacao': '2024-01-01T00:00:00'}])
+
+
+def test_probe_company():
+    json_data = {'items': [factory.statement()], 'totalCount': 1}
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.return_value = mocked_requests_get(json_data, 200)
+        watermark, rows = probe_company(factory.company_record(), http_client)
+
+        assert statements_watermark([factory.statement()]) == watermark
+        assert [factory.statement_row()] == rows
+        assert mock_get.call_args[0][0] == url_company(factory.company_record().id, 1, PAGE_SIZE)
+
+
+def test_select_changed():
+    unchanged = factory.company_record()
+    updated = Company(1, '12345670000890', 'UPDATED')
+    new = Company(2, '23456700008901', 'NEW')
+    failing = Company(3, '34567000089012', 'FAILING')
+    state = StateStore(TEMP_STATE_PATH)
+    state.update(unchanged, statements_watermark([factory.statement()]))
+    state.update(updated, statements_watermark([]))
+
+    def multi_mock_requests_get(url, **_kwargs):
+        if url.startswith(url_company(failing.id, 1, PAGE_SIZE).split('?')[0]):
+            return mocked_requests_get({}, 404)
+        return mocked_requests_get({'items': [factory.statement()], 'totalCount': 1}, 200)
+
+    failed = []
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = multi_mock_requests_get
+        changed, new_rows = select_changed([unchanged, updated, new, failing], http_client, state, failed=failed)
+
+    assert [updated, new] == changed
+    assert [factory.statement_row(cnpj=updated.cnpj), factory.statement_row(cnpj=new.cnpj)] == new_rows
+    assert [failing] == [company for company, _failure in failed]
+    assert state.get(updated) == state.get(unchanged)
+
+
+def test_merge_rows():
+    existing = [factory.statement_row('Google', '12345670000890'), factory.statement_row('Apple', '23456700008901')]
+    new = [factory.statement_row('Apple Inc', '23456700008901'), factory.statement_row('Meta', '34567000089012')]
+
+    assert [factory.statement_row('Google', '12345670000890'), factory.statement_row('Apple Inc', '23456700008901'),
+            factory.statement_row('Meta', '34567000089012')] == merge_rows(existing, new)
+
+
+def test_read_existing_rows():
+    assert [] == read_existing_rows(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+    rows = [factory.statement_row('Google', '02345670000890'), factory.statement_row('Apple', '23456700008901')]
+    to_excel(to_df(rows), TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+    assert sorted(rows, key=lambda row: row.nomeParticipante) == read_existing_rows(TEMP_WORKSHEET_PATH,
+                                                                                      'demonstracoes')
+    os.remove(TEMP_WORKSHEET_PATH)
+
+
+def test_extract_company_info_incremental():
+    companies_json_data = {'items': [factory.company()], 'totalCount': 1}
+    statements_json_data = {'items': [factory.statement()], 'totalCount': 1}
+    urls = []
+
+    def multi_mock_requests_get(url, **_kwargs):
+        urls.append(url)
+        if 'Participante' in url:
+            return mocked_requests_get(companies_json_data, 200)
+        return mocked_requests_get(statements_json_data, 200)
+
+    sheet_name = 'demonstracoes'
+    state_file = f'{TEMP_WORKSHEET_PATH}.state.json'
+    with patch('central_balancos_py.src.client.http.requests.Session.get') as mock_get:
+        mock_get.side_effect = multi_mock_requests_get
+
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name, incremental=True)
+        assert url_company(635, 1, PAGE_SIZE) in urls
+        assert os.path.exists(state_file)
+
+        urls.clear()
+        modified_at = os.path.getmtime(TEMP_WORKSHEET_PATH)
+        extract_company_info(TEMP_WORKSHEET_PATH, sheet_name, incremental=True)
+        assert [url_company(635, 1, PAGE_SIZE)] == [url for url in urls if 'Participante' not in url]
+        assert modified_at == os.path.getmtime(TEMP_WORKSHEET_PATH)
+
+        saved = pd.read_excel(TEMP_WORKSHEET_PATH, sheet_name=sheet_name)
+        saved['cnpj'] = saved['cnpj'].astype('string')
+        assert saved.equals(factory.statement_df())
 
     os.remove(TEMP_WORKSHEET_PATH)
+    os.remove(state_file)
@@ -1,5 +1,8 @@
+import json
 import logging
 import os
+import subprocess
+import sys
 from unittest.mock import patch, Mock
 
 import pandas as pd
@@ -9,7 +12,7 @@ from central_balancos_py.src import main
 from tests.constants import PDFS_DIRECTORY, PROJECT_ROOT_PATH, SAMPLE_PDF_PATH, READ_ONLY_WORKSHEET_PATH, \
     TEMP_WORKSHEET_PATH
 from tests.support import factory
-from tests.util import clean_up_pdf_directory
+from tests.util import clean_up_pdf_directory, clean_up_worksheet_caches, list_pdfs
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
@@ -25,6 +28,7 @@ def on_exit():
     if os.path.exists(TEMP_WORKSHEET_PATH):
         os.remove(TEMP_WORKSHEET_PATH)
     clean_up_pdf_directory()
+    clean_up_worksheet_caches()
 
 
 @pytest.mark.parametrize(
@@ -165,7 +169,7 @@ def test_prompt_download_instructions(mock_input, user_input, expected_result):
 
 
 @patch("central_balancos_py.src.main.input")
-@patch('central_balancos_py.src.pdfs.requests.get')
+@patch('central_balancos_py.src.client.http.requests.Session.get')
 def test_handle_download(mock_get, mock_input):
     mock_input.return_value = ''
     env = {'worksheet_path': READ_ONLY_WORKSHEET_PATH,
@@ -174,13 +178,10 @@ def test_handle_download(mock_get, mock_input):
 
     with open(SAMPLE_PDF_PATH, 'rb') as file:
         mock_pdf_data = file.read()
-    mock_response = Mock()
-    mock_response.content = mock_pdf_data
-    mock_response.status_code = 200
-    mock_get.return_value = mock_response
+    mock_get.return_value = factory.pdf_response(mock_pdf_data)
 
     main.handle_download(env)
-    assert len(os.listdir(PDFS_DIRECTORY)) == 3
+    assert len(list_pdfs()) == 3
     clean_up_pdf_directory()
 
 
@@ -194,7 +195,7 @@ def test_handle_download(mock_get, mock_input):
     ]
 )
 @patch("central_balancos_py.src.main.input")
-@patch('central_balancos_py.src.pdfs.requests.get')
+@patch('central_balancos_py.src.client.http.requests.Session.get')
 def test_handle_download(mock_get, mock_input, user_input, should_download):
     mock_input.return_value = user_input
     env = {'worksheet_path': READ_ONLY_WORKSHEET_PATH,
@@ -203,14 +204,11 @@ def test_handle_download(mock_get, mock_input, user_input, should_download):
 
     with open(SAMPLE_PDF_PATH, 'rb') as file:
         mock_pdf_data = file.read()
-    mock_response = Mock()
-    mock_response.content = mock_pdf_data
-    mock_response.status_code = 200
-    mock_get.return_value = mock_response
+    mock_get.return_value = factory.pdf_response(mock_pdf_data)
 
     main.maybe_download_pdfs(env)
     if should_download:
-        assert len(os.listdir(PDFS_DIRECTORY)) == 3
+        assert len(list_pdfs()) == 3
         clean_up_pdf_directory()
     else:
         assert not os.path.exists(PDFS_DIRECTORY)
@@ -228,23 +226,24 @@ def mock_requests_get(url, *_args, **_kwargs):
         'totalCount': 1
     }
 
-    mock_response = Mock(status_code=200)
+    mock_response = Mock(status_code=200, content=b'{}')
     if 'Participante' in url:
         mock_response.json.return_value = companies_json_data
+        mock_response.content = json.dumps(companies_json_data).encode()
     elif 'pdf' in url:
         with open(SAMPLE_PDF_PATH, 'rb') as file:
             mock_pdf_data = file.read()
-        mock_response.content = mock_pdf_data
-        mock_response.return_value = mock_response
+        return factory.pdf_response(mock_pdf_data)
     elif 'Demonstracao' in url:
         mock_response.json.return_value = statements_json_data
+        mock_response.content = json.dumps(statements_json_data).encode()
     else:
         mock_response.status_code = 404
 
     return mock_response
 
 
-@patch('central_balancos_py.src.client.http.requests.get')
+@patch('central_balancos_py.src.client.http.requests.Session.get')
 @patch("central_balancos_py.src.main.input")
 def test_handle_extraction(mock_input, mock_get):
     mock_input.return_value = ''
@@ -263,12 +262,29 @@ def test_handle_extraction(mock_input, mock_get):
     expected = factory.statement_df()
 
     assert saved.equals(expected)
-    assert len(os.listdir(PDFS_DIRECTORY)) == 1
+    assert len(list_pdfs()) == 1
 
     os.remove(TEMP_WORKSHEET_PATH)
     clean_up_pdf_directory()
 
 
+@patch('central_balancos_py.src.main.maybe_download_pdfs')
+@patch('central_balancos_py.src.extract.extract_company_info')
+@patch("central_balancos_py.src.main.input")
+def test_handle_extraction_offers_downloads_after_failures(mock_input, mock_extract, mock_download, caplog):
+    mock_input.return_value = ''
+    mock_extract.side_effect = RuntimeError('1 companies failed to extract')
+    env = {'worksheet_path': TEMP_WORKSHEET_PATH,
+           'statements_sheet_name': 'demonstracoes',
+           'pdfs_directory': PDFS_DIRECTORY}
+
+    with caplog.at_level(logging.ERROR):
+        main.handle_extraction(env)
+
+    assert '1 companies failed to extract' in caplog.text
+    mock_download.assert_called_once()
+
+
 def mock_selection(text, selection):
     print(text)
     if 'Please choose one of the following options:' in text:
@@ -283,7 +299,7 @@ def mock_selection(text, selection):
     ['1', '2', '']
 )
 @patch("central_balancos_py.src.main.config")
-@patch('central_balancos_py.src.client.http.requests.get')
+@patch('central_balancos_py.src.client.http.requests.Session.get')
 @patch("central_balancos_py.src.main.input")
 def test_run(mock_input, mock_get, mock_config, selection):
     mock_input.side_effect = lambda text, *_args, **_kwargs: mock_selection(text, selection)
@@ -309,10 +325,18 @@ def test_run(mock_input, mock_get, mock_config, selection):
                                         'pdfs_directory': PDFS_DIRECTORY}
             main.run()
 
-            assert len(os.listdir(PDFS_DIRECTORY)) == 3
+            assert len(list_pdfs()) == 3
             clean_up_pdf_directory()
 
         case _:
             main.run()
             assert not os.path.exists(TEMP_WORKSHEET_PATH)
             assert not os.path.exists(PDFS_DIRECTORY)
+
+
+def test_main_does_not_import_heavy_modules():
+    probe = ('import sys, central_balancos_py.src.main; '
+             'print(" ".join(name for name in ["pandas", "openpyxl", "requests"] if name in sys.modules))')
+    result = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    assert '' == result.stdout.strip()
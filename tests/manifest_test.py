@@ -0,0 +1,72 @@
+import hashlib
+import os
+
+import pytest
+
+from central_balancos_py.src.manifest import Manifest, file_digest, MANIFEST_FILE_NAME
+from tests.constants import PDFS_DIRECTORY, SAMPLE_PDF_PATH
+from tests.util import clean_up_pdf_directory
+
+URL = 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
+
+
+@pytest.fixture(autouse=True)
+def pdf_path():
+    os.makedirs(PDFS_DIRECTORY, exist_ok=True)
+    path = os.path.join(PDFS_DIRECTORY, 'sample.pdf')
+    with open(SAMPLE_PDF_PATH, 'rb') as source, open(path, 'wb') as target:
+        target.write(source.read())
+    yield path
+    clean_up_pdf_directory()
+
+
+def test_file_digest(pdf_path):
+    with open(SAMPLE_PDF_PATH, 'rb') as file:
+        assert hashlib.sha256(file.read()).hexdigest() == file_digest(pdf_path)
+
+
+def test_record_and_reload(pdf_path):
+    manifest = Manifest(PDFS_DIRECTORY)
+    assert not manifest.is_valid(URL, pdf_path)
+
+    manifest.record(URL, pdf_path, os.path.getsize(pdf_path), file_digest(pdf_path))
+
+    reloaded = Manifest(PDFS_DIRECTORY)
+    assert reloaded.is_valid(URL, pdf_path)
+    assert 77820 == reloaded.entries[URL]['id']
+    assert os.path.exists(os.path.join(PDFS_DIRECTORY, MANIFEST_FILE_NAME))
+
+
+def test_is_valid_detects_corruption(pdf_path):
+    manifest = Manifest(PDFS_DIRECTORY)
+    manifest.record(URL, pdf_path, os.path.getsize(pdf_path), file_digest(pdf_path))
+
+    with open(pdf_path, 'r+b') as file:
+        file.write(b'XXXX')
+    assert not manifest.is_valid(URL, pdf_path)
+
+    with open(pdf_path, 'ab') as file:
+        file.write(b'trailing')
+    assert not manifest.is_valid(URL, pdf_path)
+
+    os.remove(pdf_path)
+    assert not manifest.is_valid(URL, pdf_path)
+
+
+def test_is_valid_checks_file_name(pdf_path):
+    manifest = Manifest(PDFS_DIRECTORY)
+    manifest.record(URL, pdf_path, os.path.getsize(pdf_path), file_digest(pdf_path))
+
+    assert not manifest.is_valid(URL, os.path.join(PDFS_DIRECTORY, 'renamed.pdf'))
+
+
+def test_claim_rejects_two_urls_for_one_file(pdf_path):
+    manifest = Manifest(PDFS_DIRECTORY)
+    manifest.record(URL, pdf_path, os.path.getsize(pdf_path), file_digest(pdf_path))
+    manifest.claim(URL, pdf_path)
+    manifest.claim(f'{URL}1', os.path.join(PDFS_DIRECTORY, 'other.pdf'))
+
+    with pytest.raises(FileExistsError):
+        Manifest(PDFS_DIRECTORY).claim(f'{URL}1', pdf_path)
+    with pytest.raises(FileExistsError):
+        manifest.claim(URL, os.path.join(PDFS_DIRECTORY, 'other.pdf'))
@@ -0,0 +1,115 @@
+import json
+import logging
+import time
+from unittest.mock import patch
+
+import requests
+
+from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.http import HttpClient
+from central_balancos_py.src.client.retry import RetryScheduler
+from central_balancos_py.src.concurrency import ordered_map, prefetch
+from central_balancos_py.src.extract import url_company, url_list
+from central_balancos_py.src.records import url_pdf
+from central_balancos_py.src.metrics import LatencyHistogram, Metrics, MetricsReporter, endpoint_of, report
+from tests.support.clock import FakeClock
+
+logger = logging.getLogger(__name__)
+
+
+def response(status_code=200, content=b'{"items": []}'):
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = content
+    return result
+
+
+def test_endpoint_of():
+    assert 'Participante' == endpoint_of(url_list(1, 10, None))
+    assert 'Participante' == endpoint_of(url_list(1, 10, 13385440000156))
+    assert 'Demonstracao' == endpoint_of(url_company(635, 1, 10))
+    assert 'pdf' == endpoint_of(url_pdf(1234))
+    assert 'other' == endpoint_of('https://example.com')
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram(buckets=[0.1, 1])
+    for latency in [0.05, 0.05, 0.5, 2]:
+        histogram.observe(latency)
+
+    assert {'<=0.1s': 2, '<=1s': 1, '>1s': 1} == histogram.to_dict()['buckets']
+    assert 0.1 == histogram.quantile(0.5)
+    assert 2 == histogram.quantile(0.99)
+    assert LatencyHistogram().quantile(0.5) is None
+
+
+def test_snapshot():
+    clock = FakeClock()
+    metrics = Metrics(clock=clock)
+    metrics.observe_request(url_company(1, 1, 10), 200, 0.2, 100)
+    metrics.observe_request(url_company(1, 2, 10), None, 1.5)
+    metrics.observe_bytes(url_pdf(1), 1000)
+    metrics.count('calls')
+    metrics.count('attempts', 3)
+    metrics.gauge('pending')(4)
+    metrics.gauge('pending')(1)
+    clock.now = 2
+
+    snapshot = metrics.snapshot()
+    assert 2 == snapshot['requests']
+    assert 1 == snapshot['requests_per_second']
+    assert 1100 == snapshot['bytes']
+    assert 2 == snapshot['retries']
+    assert {'200': 1, 'error': 1} == snapshot['endpoints']['Demonstracao']['statuses']
+    assert {'current': 1, 'max': 4} == snapshot['queues']['pending']
+
+    metrics.reset()
+    assert 0 == metrics.snapshot()['requests']
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_http_client_records_requests_and_retries(mock_get):
+    metrics = Metrics()
+    mock_get.side_effect = [requests.exceptions.ConnectionError('reset'), response()]
+    client = HttpClient(error_handler=ErrorHandler(logger=logger), metrics=metrics,
+                        retry_scheduler=RetryScheduler(logger=logger, sleep=lambda _delay: None))
+
+    client.get(url_company(1, 1, 10))
+
+    snapshot = metrics.snapshot()
+    assert 2 == snapshot['requests']
+    assert 1 == snapshot['retries']
+    assert len(b'{"items": []}') == snapshot['bytes']
+    assert {'error': 1, '200': 1} == snapshot['endpoints']['Demonstracao']['statuses']
+
+
+def test_queue_gauges():
+    metrics = Metrics()
+    list(ordered_map(lambda item: item, range(10), max_workers=2, gauge=metrics.gauge('pending')))
+    list(prefetch(iter(range(10)), buffer_size=3, gauge=metrics.gauge('buffer')))
+
+    queues = metrics.snapshot()['queues']
+    assert 4 == queues['pending']['max']
+    assert queues['buffer']['max'] <= 4
+
+
+def test_report_writes_json(tmp_path):
+    metrics = Metrics()
+    metrics.observe_request(url_pdf(1), 200, 0.3)
+    path = tmp_path / 'run.metrics.json'
+
+    report(metrics, str(path), logger)
+    report(None, str(tmp_path / 'missing.json'), logger)
+
+    with open(path) as f:
+        assert 1 == json.load(f)['endpoints']['pdf']['count']
+    assert not (tmp_path / 'missing.json').exists()
+
+
+def test_reporter_logs_periodically(caplog):
+    metrics = Metrics()
+    with caplog.at_level(logging.INFO):
+        with MetricsReporter(metrics, logger, interval=0.01) as reporter:
+            time.sleep(0.1)
+    assert 'Metrics:' in caplog.text
+    assert not reporter.thread.is_alive()
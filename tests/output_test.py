@@ -0,0 +1,127 @@
+import os
+import shutil
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from central_balancos_py.src.extract import to_df
+from central_balancos_py.src.records import StatementRow
+from central_balancos_py.src.output import to_excel, write_statements, read_statements, resolve_format, \
+    format_path, check_output
+from tests.constants import TEMP_WORKSHEET_PATH, TEMP_PARQUET_PATH, TEMP_FEATHER_PATH, READ_ONLY_WORKSHEET_PATH
+from tests.support import factory
+
+
+@pytest.fixture(autouse=True)
+def clean_up_outputs():
+    yield
+    for path in [TEMP_WORKSHEET_PATH, TEMP_PARQUET_PATH, TEMP_FEATHER_PATH]:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+
+def sample_df():
+    rows = [factory.row('Google', '12345670000890'),
+            {**factory.row('Apple', '03456700008901'), 'tipoDemonstracao': 'Balanço Patrimonial (BP)'},
+            factory.row('Apple', '03456700008901')]
+    return to_df(StatementRow.from_dict(row) for row in rows)
+
+
+@pytest.mark.parametrize(
+    "path, output_format, expected",
+    [
+        ('data/demonstracoes.xlsx', None, 'xlsx'),
+        ('data/demonstracoes.parquet', None, 'parquet'),
+        ('data/demonstracoes.FEATHER', None, 'feather'),
+        ('data/demonstracoes', 'parquet', 'parquet'),
+        ('data/demonstracoes.csv', None, ValueError),
+        ('data/demonstracoes.xlsx', 'csv', ValueError),
+        ('data/demonstracoes.xlsx', 'parquet', ValueError),
+        ('data/demonstracoes.parquet', 'parquet', 'parquet'),
+    ]
+)
+def test_resolve_format(path, output_format, expected):
+    if expected == ValueError:
+        with pytest.raises(ValueError):
+            resolve_format(path, output_format)
+    else:
+        assert expected == resolve_format(path, output_format)
+
+
+@pytest.mark.parametrize(
+    "path, output_format, expected",
+    [
+        ('data/demonstracoes.xlsx', None, 'data/demonstracoes.xlsx'),
+        ('data/demonstracoes.xlsx', 'parquet', 'data/demonstracoes.parquet'),
+        ('data/demonstracoes', 'feather', 'data/demonstracoes.feather'),
+    ]
+)
+def test_format_path(path, output_format, expected):
+    assert expected == format_path(path, output_format)
+
+
+def test_check_output_rejects_partitions_outside_parquet():
+    assert 'parquet' == check_output('data/demonstracoes.parquet', partition_by=['tipoDemonstracao'])
+    with pytest.raises(ValueError):
+        check_output('data/demonstracoes.xlsx', partition_by=['tipoDemonstracao'])
+    with pytest.raises(ValueError):
+        write_statements(sample_df(), 'data/demonstracoes.feather', 'demonstracoes', partition_by=['tipoDemonstracao'])
+
+
+def test_check_output_requires_pyarrow():
+    with patch.dict('sys.modules', {'pyarrow': None}):
+        assert 'xlsx' == check_output('data/demonstracoes.xlsx')
+        with pytest.raises(ImportError):
+            check_output('data/demonstracoes.parquet')
+
+
+def test_to_excel():
+    df = to_df([factory.statement_row('Google', '12345670000890'), factory.statement_row('Apple', '23456700008901')])
+    sheet_name = 'demonstracoes'
+
+    to_excel(df, TEMP_WORKSHEET_PATH, sheet_name)
+
+    saved = pd.read_excel(TEMP_WORKSHEET_PATH, sheet_name=sheet_name)
+    saved['cnpj'] = saved['cnpj'].astype('string')
+    expected = df.reset_index()
+    expected['cnpj'] = saved['cnpj'].astype('string')
+
+    assert saved.equals(expected)
+
+
+@pytest.mark.parametrize(
+    "path, partition_by",
+    [
+        (TEMP_WORKSHEET_PATH, None),
+        (TEMP_PARQUET_PATH, None),
+        (TEMP_PARQUET_PATH, ['tipoDemonstracao']),
+        (TEMP_FEATHER_PATH, None),
+    ]
+)
+def test_write_and_read_statements(path, partition_by):
+    pytest.importorskip('pyarrow')
+    df = sample_df()
+
+    write_statements(df, path, 'demonstracoes', partition_by=partition_by)
+    saved = read_statements(path, 'demonstracoes')
+
+    assert df.reset_index().equals(saved)
+
+
+def test_write_partitioned_parquet_replaces_previous_dataset():
+    pytest.importorskip('pyarrow')
+    write_statements(sample_df(), TEMP_PARQUET_PATH, 'demonstracoes', partition_by=['tipoDemonstracao'])
+    write_statements(to_df([factory.statement_row()]), TEMP_PARQUET_PATH, 'demonstracoes', partition_by=['tipoDemonstracao'])
+
+    assert 1 == len(read_statements(TEMP_PARQUET_PATH, 'demonstracoes'))
+    assert 1 == len(os.listdir(TEMP_PARQUET_PATH))
+
+
+def test_read_statements_excel():
+    saved = read_statements(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+    saved['cnpj'] = saved['cnpj'].astype('string')
+
+    assert factory.statements_df().equals(saved)
@@ -1,6 +1,5 @@
 import logging
 import os
-import unittest
 from unittest import TestCase
 from unittest.mock import patch
 
@@ -11,9 +10,12 @@ import requests
 import central_balancos_py.src.pdfs as pdfs
 from central_balancos_py.src.client.error_handler import ErrorHandler
 from central_balancos_py.src.client.http import HttpClient
-from tests.constants import READ_ONLY_FILTERED_WORKSHEET_PATH, PDFS_DIRECTORY, SAMPLE_PDF_PATH, READ_ONLY_WORKSHEET_PATH
+from central_balancos_py.src.client.retry import RetryScheduler
+from central_balancos_py.src.output import write_statements
+from tests.constants import READ_ONLY_FILTERED_WORKSHEET_PATH, PDFS_DIRECTORY, SAMPLE_PDF_PATH, READ_ONLY_WORKSHEET_PATH, \
+    TEMP_PARQUET_PATH
 from tests.support import factory
-from tests.util import clean_up_pdf_directory
+from tests.util import clean_up_pdf_directory, clean_up_worksheet_caches, list_pdfs
 
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s')
@@ -29,6 +31,7 @@ def on_exit():
     yield
     logger.info("Tearing down resources...")
     clean_up_pdf_directory()
+    clean_up_worksheet_caches()
 
 
 def test_replace_with_underscore():
@@ -63,7 +66,7 @@ def test_build_file_name():
         'pdf': 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
     })
 
-    assert 'ITATIAIA_INVESTIMENTOS_IMOBILIARIOS_E_PARTICIPACOES_S_A__BP_2023_06_21.pdf' == pdfs.build_file_name(row)
+    assert 'ITATIAIA_INVESTIMENTOS_IMOBILIARIOS_E_PARTICIPACOES_S_A__BP_2023_06_21_77820.pdf' == pdfs.build_file_name(row)
 
 
 def test_filter_cnpjs_no_filter():
@@ -97,6 +100,19 @@ def test_filter_cnpjs():
     assert saved_df.equals(expected_df)
 
 
+def test_filter_cnpjs_columnar_file():
+    pytest.importorskip('pyarrow')
+    statements = factory.statements_df()
+    write_statements(statements.set_index(['nomeParticipante', 'tipoDemonstracao', 'dataPublicacao']),
+                     TEMP_PARQUET_PATH, 'demonstracoes')
+
+    filtered = pdfs.filter_cnpjs(TEMP_PARQUET_PATH, 'demonstracoes', cnpjs=['12.345.670/0008-90'])
+
+    assert ['APPLE'] == filtered['nomeParticipante'].tolist()
+    assert 3 == len(pdfs.filter_cnpjs(TEMP_PARQUET_PATH, 'demonstracoes'))
+    os.remove(TEMP_PARQUET_PATH)
+
+
 def test_filter_types():
     statements = factory.statements_df()
 
@@ -119,31 +135,60 @@ def test_filter_types():
     assert expected_df.equals(filtered_df)
 
 
+def multi_period_statements():
+    statements = pd.DataFrame({
+        'nomeParticipante': ['ITATIAIA', 'ITATIAIA', 'ITATIAIA', 'APPLE', 'APPLE'],
+        'tipoDemonstracao': ['Balanço Patrimonial (BP)', 'Balanço Patrimonial (BP)',
+                             'Demonstração do Resultado do Exercício (DRE)',
+                             'Balanço Patrimonial (BP)', 'Balanço Patrimonial (BP)'],
+        'dataPublicacao': ['2019-11-20T22:55:55.627', '2023-06-21T11:24:32.34', '2021-03-01T10:00:00',
+                           '2022-11-20T22:55:55.627', '2020-01-15T08:00:00'],
+        'cnpj': ['13385440000156', '13385440000156', '13385440000156', '12345670000890', '12345670000890'],
+        'status': ['Publicado'] * 5,
+        'dataFim': ['2018-12-31T00:00:00', '2022-12-31T00:00:00', '2020-12-31T00:00:00',
+                    '2021-12-31T00:00:00', '2019-12-31T00:00:00'],
+        'pdf': [f'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/{i}'
+                for i in range(5)]
+    })
+    statements['cnpj'] = statements['cnpj'].astype('string')
+    return statements
+
+
 def test_filter_dates():
     statements = factory.statements_df()
 
     assert statements.equals(pdfs.filter_dates(statements, ''))
+    assert statements.equals(pdfs.filter_dates(statements, 'latest'))
+
+    statements = multi_period_statements()
+    assert [1, 2, 3] == pdfs.filter_dates(statements, 'latest').index.tolist()
+    assert [0, 2, 4] == pdfs.filter_dates(statements, 'oldest').index.tolist()
+
+
+def test_filter_types_by_acronym_or_set():
+    statements = multi_period_statements()
+
+    assert [2] == pdfs.filter_types(statements, 'DRE').index.tolist()
+    assert [0, 1, 2, 3, 4] == pdfs.filter_types(statements, {'BP', 'DRE'}).index.tolist()
+    assert [] == pdfs.filter_types(statements, 'DCC').index.tolist()
+
+
+def test_date_range_mask():
+    statements = multi_period_statements()
+    published = pdfs.parse_published(statements)
+
+    assert [False, True, True, True, False] == pdfs.date_range_mask(published, '2021-03-01', '2023-06-21').tolist()
+    assert [True, False, False, False, True] == pdfs.date_range_mask(published, None, '2020-12-31').tolist()
 
-    expected_df = pd.DataFrame({
-        'nomeParticipante': ['ITATIAIA INVESTIMENTOS IMOBILIARIOS E PARTICIPACOES S.A.',
-                             'APPLE',
-                             'ITATIAIA INVESTIMENTOS IMOBILIARIOS E PARTICIPACOES S.A.'],
-        'tipoDemonstracao': ['Demonstrações Contábeis Completas (DCC)',
-                             'Demonstração do Resultado do Exercício (DRE)',
-                             'Balanço Patrimonial (BP)'],
-        'dataPublicacao': ['2019-11-20T22:55:55.627', '2022-11-20T22:55:55.627', '2023-06-21T11:24:32.34'],
-        'cnpj': ['13385440000156', '12345670000890', '13385440000156'],
-        'status': ['Publicado', 'Publicado', 'Publicado'],
-        'dataFim': ['2018-12-31T00:00:00', '2022-12-31T00:00:00', '2022-12-31T00:00:00'],
-        'pdf': [
-            'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/3003',
-            'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/0001',
-            'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820',
-        ]
-    })
-    expected_df['cnpj'] = expected_df['cnpj'].astype('string').reset_index(drop=True)
 
-    assert expected_df.equals(pdfs.filter_dates(statements, 'latest').reset_index(drop=True))
+def test_filter_frame():
+    statements = multi_period_statements()
+
+    filtered = pdfs.filter_frame(statements, cnpjs=['12.345.670/0008-90', '13385440000156'], statement_type='BP',
+                                 publish_date='latest', published_to='2022-12-31')
+
+    assert [0, 3] == filtered.index.tolist()
+    assert statements.equals(pdfs.filter_frame(statements))
 
 
 def test_filter_statements():
@@ -166,29 +211,74 @@ def mocked_requests_get(status_code):
 
 class TestPDFEndpoint(TestCase):
 
-    @patch('central_balancos_py.src.pdfs.requests.get')
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
     def test_fetch_pdf_success(self, mock_get):
         url = 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
+        path = os.path.join(PDFS_DIRECTORY, 'sample.pdf')
+        os.makedirs(PDFS_DIRECTORY, exist_ok=True)
         with open(SAMPLE_PDF_PATH, 'rb') as file:
             mock_pdf_data = file.read()
-        mock_response = unittest.mock.Mock()
-        mock_response.content = mock_pdf_data
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_get.return_value = factory.pdf_response(mock_pdf_data)
 
-        content = pdfs.fetch_pdf(url)
+        pdfs.fetch_pdf(url, path, http_client)
 
-        self.assertEqual(content, mock_pdf_data)
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), mock_pdf_data)
+        self.assertEqual(['sample.pdf'], list_pdfs())
+        mock_get.assert_called_once_with(url, params=None, stream=True, timeout=http_client.timeout)
+        clean_up_pdf_directory()
 
-    @patch('central_balancos_py.src.pdfs.requests.get')
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
     def test_fetch_pdf_error(self, mock_get):
         url = 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
         mock_get.return_value = mocked_requests_get(400)
 
         with self.assertRaises(requests.HTTPError):
-            pdfs.fetch_pdf(url)
+            pdfs.fetch_pdf(url, os.path.join(PDFS_DIRECTORY, 'sample.pdf'), http_client)
+
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
+    def test_fetch_pdf_interrupted_leaves_no_partial_file(self, mock_get):
+        url = 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
+        os.makedirs(PDFS_DIRECTORY, exist_ok=True)
+
+        def broken_stream(**_kwargs):
+            yield b'%PDF-'
+            raise requests.exceptions.ChunkedEncodingError('connection dropped')
+
+        mock_response = factory.pdf_response(b'')
+        mock_response.iter_content.side_effect = broken_stream
+        mock_get.return_value = mock_response
+
+        with self.assertRaises(requests.HTTPError):
+            pdfs.fetch_pdf(url, os.path.join(PDFS_DIRECTORY, 'sample.pdf'), http_client)
+        self.assertEqual([], os.listdir(PDFS_DIRECTORY))
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
+    def test_fetch_pdf_retries_interrupted_stream(self, mock_get):
+        url = 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
+        path = os.path.join(PDFS_DIRECTORY, 'sample.pdf')
+        os.makedirs(PDFS_DIRECTORY, exist_ok=True)
+        retrying_client = HttpClient(error_handler=ErrorHandler(logger=logger),
+                                     retry_scheduler=RetryScheduler(logger=logger, sleep=lambda _delay: None))
+
+        def broken_stream(**_kwargs):
+            yield b'%PDF-'
+            raise requests.exceptions.ChunkedEncodingError('connection dropped')
+
+        broken = factory.pdf_response(b'')
+        broken.iter_content.side_effect = broken_stream
+        mock_get.side_effect = [broken, factory.pdf_response(b'%PDF-1.4')]
+
+        self.assertEqual(8, pdfs.fetch_pdf(url, path, retrying_client)[0])
 
-    @patch('central_balancos_py.src.pdfs.requests.get')
+        with open(path, 'rb') as file:
+            self.assertEqual(b'%PDF-1.4', file.read())
+        self.assertEqual(2, mock_get.call_count)
+        self.assertEqual(['sample.pdf'], list_pdfs())
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
     def test_fetch_pdfs(self, mock_get):
         statements = pd.DataFrame({
             'nomeParticipante': ['ITATIAIA INVESTIMENTOS IMOBILIARIOS E PARTICIPACOES S.A.'],
@@ -204,27 +294,96 @@ class TestPDFEndpoint(TestCase):
 
         with open(SAMPLE_PDF_PATH, 'rb') as file:
             mock_pdf_data = file.read()
-        mock_response = unittest.mock.Mock()
-        mock_response.content = mock_pdf_data
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_get.return_value = factory.pdf_response(mock_pdf_data)
+
+        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client)
+        assert len(list_pdfs()) == 1
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
+    def test_fetch_pdfs_skips_files_in_manifest(self, mock_get):
+        statements = factory.statements_df()
+        with open(SAMPLE_PDF_PATH, 'rb') as file:
+            mock_pdf_data = file.read()
+        mock_get.return_value = factory.pdf_response(mock_pdf_data)
 
-        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY)
-        assert len(os.listdir(PDFS_DIRECTORY)) == 1
+        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client)
+        self.assertEqual(3, mock_get.call_count)
+
+        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client)
+        self.assertEqual(3, mock_get.call_count)
+
+        with open(os.path.join(PDFS_DIRECTORY, list_pdfs()[0]), 'wb') as file:
+            file.write(b'corrupted')
+        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client)
+        self.assertEqual(4, mock_get.call_count)
         clean_up_pdf_directory()
 
-    @patch('central_balancos_py.src.pdfs.requests.get')
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
+    def test_fetch_pdfs_keeps_statements_published_on_the_same_day(self, mock_get):
+        statements = pd.DataFrame([factory.row(),
+                                   {**factory.row(), 'dataFim': '2021-12-31T00:00:00',
+                                    'pdf': factory.row()['pdf'].replace('77820', '77821')}])
+        mock_get.return_value = factory.pdf_response(b'%PDF-')
+
+        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client)
+        pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client)
+
+        self.assertEqual(2, len(list_pdfs()))
+        self.assertEqual(2, mock_get.call_count)
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.pdfs.build_file_name', return_value='same.pdf')
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
+    def test_download_statement_rejects_urls_sharing_a_file(self, mock_get, _build_file_name):
+        os.makedirs(PDFS_DIRECTORY, exist_ok=True)
+        manifest = pdfs.Manifest(PDFS_DIRECTORY)
+        first = factory.row()
+        second = {**first, 'pdf': first['pdf'].replace('77820', '77821')}
+        mock_get.return_value = factory.pdf_response(b'%PDF-')
+
+        self.assertTrue(pdfs.download_statement(first, PDFS_DIRECTORY, manifest, http_client))
+        with self.assertLogs(pdfs.logger, logging.ERROR) as logs:
+            self.assertIsNone(pdfs.download_statement(second, PDFS_DIRECTORY, manifest, http_client))
+        self.assertIn('is claimed by both', logs.output[0])
+        self.assertEqual(1, mock_get.call_count)
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
+    def test_fetch_pdfs_continues_after_a_failed_download(self, mock_get):
+        statements = factory.statements_df()
+        missing = statements['pdf'].iloc[0]
+
+        def missing_pdf(url, **_kwargs):
+            return mocked_requests_get(404) if url == missing else factory.pdf_response(b'%PDF-')
+
+        mock_get.side_effect = missing_pdf
+
+        with self.assertRaises(RuntimeError):
+            pdfs.fetch_pdfs(statements, PDFS_DIRECTORY, http_client, max_workers=1)
+        self.assertEqual(len(statements) - 1, len(list_pdfs()))
+        self.assertEqual(len(statements), mock_get.call_count)
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.client.http.requests.Session.get')
     def test_download_pdfs(self, mock_get):
         statements_sheet_name = 'demonstracoes'
         statement_type = 'Balanço Patrimonial (BP)'
 
         with open(SAMPLE_PDF_PATH, 'rb') as file:
             mock_pdf_data = file.read()
-        mock_response = unittest.mock.Mock()
-        mock_response.content = mock_pdf_data
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_get.return_value = factory.pdf_response(mock_pdf_data)
 
         pdfs.download_pdfs(PDFS_DIRECTORY, READ_ONLY_FILTERED_WORKSHEET_PATH, statements_sheet_name, statement_type)
-        assert len(os.listdir(PDFS_DIRECTORY)) == 1
+        assert len(list_pdfs()) == 1
+        clean_up_pdf_directory()
+
+    @patch('central_balancos_py.src.pdfs.fetch_pdfs')
+    def test_download_pdfs_rate_limits_its_own_client(self, mock_fetch_pdfs):
+        pdfs.download_pdfs(PDFS_DIRECTORY, READ_ONLY_FILTERED_WORKSHEET_PATH, 'demonstracoes', max_workers=16)
+
+        own_client = mock_fetch_pdfs.call_args.args[2]
+        self.assertIsNotNone(own_client.rate_limiter)
+        self.assertIsNotNone(own_client.retry_scheduler)
+        self.assertEqual(16, own_client.session.get_adapter('https://').poolmanager.connection_pool_kw['maxsize'])
         clean_up_pdf_directory()
@@ -0,0 +1,104 @@
+import logging
+import os
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.http import HttpClient
+from central_balancos_py.src.output import read_statements
+from central_balancos_py.src.pdfs import filter_frame
+from central_balancos_py.src.pipeline import extract_and_download, select_downloads
+from central_balancos_py.src.records import StatementRow, pdf_id
+from tests.support import factory
+
+COMPANIES = [{'id': 1, 'cnpj': '11111111000111', 'nome': 'ALFA S.A.'},
+             {'id': 2, 'cnpj': '22222222000122', 'nome': 'BETA S.A.'}]
+TYPES = ['Balanço Patrimonial (BP)', 'Demonstração do Resultado do Exercício (DRE)']
+
+
+def statements(company):
+    return [{**factory.statement(), 'id': company['id'] * 100 + index, 'cnpj': company['cnpj'],
+             'nomeParticipante': company['nome'], 'tipoDemonstracao': TYPES[index % 2],
+             'dataPublicacao': f'202{index}-06-21T11:24:32.34'}
+            for index in range(4)]
+
+
+def response(content, status_code=200):
+    result = requests.Response()
+    result.status_code = status_code
+    result._content = content
+    result._content_consumed = True
+    return result
+
+
+def mocked_get(url, **_kwargs):
+    if 'Participante' in url:
+        return response(requests.compat.json.dumps({'items': COMPANIES, 'totalCount': 2}).encode())
+    if '/pdf/' in url:
+        return response(b'%PDF-' + url.encode())
+    company_id = int(url.split('/Demonstracao/')[1].split('/')[0])
+    company = next(company for company in COMPANIES if company['id'] == company_id)
+    return response(requests.compat.json.dumps({'items': statements(company), 'totalCount': 4}).encode())
+
+
+def pdfs_in(folder):
+    return sorted(file for file in os.listdir(folder) if file.endswith('.pdf'))
+
+
+@pytest.fixture
+def http_client():
+    return HttpClient(error_handler=ErrorHandler(logger=logging.getLogger(__name__)))
+
+
+@pytest.mark.parametrize(
+    'filters',
+    [
+        {},
+        {'statement_type': 'BP'},
+        {'publish_date': 'latest'},
+        {'cnpjs': ['13.385.440/0001-56']},
+        {'published_from': '2020-01-01', 'published_to': '2022-12-31'},
+    ]
+)
+def test_select_downloads_matches_filter_frame(filters):
+    statements = factory.statements_df()
+    expected = sorted(map(pdf_id, filter_frame(statements, **filters)['pdf']))
+
+    rows = [StatementRow.from_dict(row) for row in statements.to_dict('records')]
+    assert expected == sorted(row.statement_id for row in select_downloads(rows, **filters))
+
+
+def test_select_downloads_without_filters_keeps_rows():
+    rows = [factory.statement_row()]
+    assert rows is select_downloads(rows)
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_extract_and_download(mock_get, tmp_path, http_client):
+    mock_get.side_effect = mocked_get
+    worksheet_path = str(tmp_path / 'demonstracoes.xlsx')
+    pdfs_directory = str(tmp_path / 'pdfs')
+
+    extract_and_download(worksheet_path, 'demonstracoes', pdfs_directory, statement_type='BP',
+                         publish_date='latest', max_workers=2, download_workers=2, queue_size=1,
+                         http_client=http_client)
+
+    assert 8 == len(read_statements(worksheet_path, 'demonstracoes'))
+    assert ['ALFA_S_A__BP_2022_06_21_102.pdf', 'BETA_S_A__BP_2022_06_21_202.pdf'] == pdfs_in(pdfs_directory)
+    assert os.path.exists(f'{worksheet_path}.index.sqlite')
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_extract_and_download_writes_worksheet_before_raising(mock_get, tmp_path, http_client):
+    def failing_pdfs(url, **kwargs):
+        return response(b'', 404) if '/pdf/' in url else mocked_get(url, **kwargs)
+
+    mock_get.side_effect = failing_pdfs
+    worksheet_path = str(tmp_path / 'demonstracoes.xlsx')
+
+    with pytest.raises(RuntimeError):
+        extract_and_download(worksheet_path, 'demonstracoes', str(tmp_path / 'pdfs'), http_client=http_client)
+
+    assert 8 == len(read_statements(worksheet_path, 'demonstracoes'))
@@ -0,0 +1,49 @@
+import pytest
+
+from central_balancos_py.src.records import Company, StatementRow, pdf_id, url_pdf
+from tests.support import factory
+
+URL = 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
+
+
+def test_url_pdf():
+    assert URL == url_pdf(77820)
+
+
+def test_pdf_id():
+    assert 77820 == pdf_id(URL)
+    assert pdf_id('https://example.com') is None
+
+
+def test_company_from_json_keeps_only_digits():
+    company = Company.from_json({**factory.company(), 'id': '635', 'cnpj': '13.385.440/0001-56'})
+
+    assert Company(635, '13385440000156', factory.company()['nome']) == company
+
+
+def test_statement_row_from_statement():
+    row = StatementRow.from_statement(factory.statement(), '13385440000156')
+
+    assert 77820 == row.statement_id
+    assert URL == row.pdf
+    assert factory.row() == row.to_dict()
+
+
+def test_statement_row_round_trip():
+    assert factory.row() == StatementRow.from_dict(factory.row()).to_dict()
+
+
+def test_statement_row_shares_repeated_values():
+    first, second = [StatementRow.from_dict({**factory.row(), 'dataFim': ''.join(['2022-12-31', 'T00:00:00']),
+                                             'tipoDemonstracao': ''.join(['Balanço ', 'Patrimonial (BP)'])})
+                     for _ in range(2)]
+
+    assert first.dataFim is second.dataFim
+    assert first.tipoDemonstracao is second.tipoDemonstracao
+
+
+@pytest.mark.parametrize('record', [factory.company_record(), factory.statement_row()])
+def test_records_have_no_instance_dict(record):
+    assert not hasattr(record, '__dict__')
+    with pytest.raises(AttributeError):
+        record.unknown = 1
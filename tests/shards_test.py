@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+import requests
+
+from central_balancos_py.src.client.error_handler import ErrorHandler
+from central_balancos_py.src.client.http import HttpClient
+from central_balancos_py.src.extract import build_http_client, extract_company_info
+from central_balancos_py.src.output import read_statements
+from central_balancos_py.src.records import Company
+from central_balancos_py.src.shards import extract_shard, extract_sharded, merge_shards, select_shard, shard_path
+from tests.support import factory
+
+COMPANIES = [{'id': company_id, 'cnpj': f'{company_id:08d}000199', 'nome': f'EMPRESA {company_id} S.A.'}
+             for company_id in [7, 3, 12, 1, 9, 4]]
+RECORDS = [Company.from_json(company) for company in COMPANIES]
+
+
+def response(body):
+    result = requests.Response()
+    result.status_code = 200
+    result._content = json.dumps(body).encode()
+    return result
+
+
+def mocked_get(url, **_kwargs):
+    if 'Participante' in url:
+        return response({'items': COMPANIES, 'totalCount': len(COMPANIES)})
+    company_id = int(url.split('/Demonstracao/')[1].split('/')[0])
+    company = next(company for company in COMPANIES if company['id'] == company_id)
+    items = [{**factory.statement(), 'id': company_id * 10 + index, 'cnpj': company['cnpj'],
+              'nomeParticipante': company['nome'], 'dataPublicacao': f'202{index}-06-21T11:24:32.34'}
+             for index in range(3)]
+    return response({'items': items, 'totalCount': len(items)})
+
+
+@pytest.fixture
+def http_client():
+    return HttpClient(error_handler=ErrorHandler(logger=logging.getLogger(__name__)))
+
+
+@pytest.mark.parametrize('strategy', ['hash', 'id'])
+def test_select_shard_partitions_companies(strategy):
+    shards = [list(select_shard(iter(RECORDS), shard, 4, strategy)) for shard in range(1, 5)]
+
+    assert sorted(company.id for company in RECORDS) == sorted(company.id for shard in shards for company in shard)
+    assert shards == [list(select_shard(iter(RECORDS), shard, 4, strategy)) for shard in range(1, 5)]
+
+
+def test_select_shard_by_id_deals_fixed_id_blocks():
+    assert [[1, 9], [3, 12, 4], [7]] == [[company.id for company in select_shard(RECORDS, shard, 3, 'id', 3)]
+                                         for shard in range(1, 4)]
+
+
+def test_select_shard_by_id_ignores_other_companies():
+    added = RECORDS + [Company(5, '00000005000199', 'EMPRESA 5 S.A.'), Company(40, '00000040000199', 'EMPRESA 40')]
+    removed = RECORDS[1:]
+    for shard in range(1, 4):
+        before = {company.id for company in select_shard(RECORDS, shard, 3, 'id', 3)}
+        assert before <= {company.id for company in select_shard(added, shard, 3, 'id', 3)}
+        assert before - {RECORDS[0].id} == {company.id for company in select_shard(removed, shard, 3, 'id', 3)}
+
+
+@pytest.mark.parametrize('shard, shards, strategy', [(0, 2, 'hash'), (3, 2, 'hash'), (1, 2, 'name')])
+def test_select_shard_rejects_invalid_shards(shard, shards, strategy):
+    with pytest.raises(ValueError):
+        list(select_shard(RECORDS, shard, shards, strategy))
+
+
+@pytest.mark.parametrize('strategy', ['hash', 'id'])
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_merged_shards_match_single_process_extraction(mock_get, tmp_path, http_client, strategy):
+    mock_get.side_effect = mocked_get
+    serial_path = str(tmp_path / 'serial.xlsx')
+    sharded_path = str(tmp_path / 'sharded.xlsx')
+    extract_company_info(serial_path, 'demonstracoes', http_client=http_client)
+
+    for shard in [3, 1, 2]:
+        extract_shard(sharded_path, shard, 3, strategy, http_client=http_client)
+    merge_shards(sharded_path, 'demonstracoes', 3, strategy)
+
+    pd.testing.assert_frame_equal(read_statements(serial_path, 'demonstracoes'),
+                                  read_statements(sharded_path, 'demonstracoes'))
+    assert not any(os.path.exists(shard_path(sharded_path, shard, 3, strategy)) for shard in range(1, 4))
+    assert os.path.exists(f'{sharded_path}.index.sqlite')
+
+
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_merge_requires_every_shard(mock_get, tmp_path, http_client):
+    mock_get.side_effect = mocked_get
+    worksheet_path = str(tmp_path / 'sharded.xlsx')
+    extract_shard(worksheet_path, 1, 2, http_client=http_client)
+
+    with pytest.raises(FileNotFoundError):
+        merge_shards(worksheet_path, 'demonstracoes', 2)
+
+    assert os.path.exists(shard_path(worksheet_path, 1, 2))
+    assert not os.path.exists(worksheet_path)
+
+
+@patch('central_balancos_py.src.shards.ProcessPoolExecutor')
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_extract_sharded_runs_every_shard_and_merges(mock_get, mock_executor, tmp_path):
+    mock_get.side_effect = mocked_get
+    mock_executor.side_effect = lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)
+    worksheet_path = str(tmp_path / 'sharded.xlsx')
+
+    df = extract_sharded(worksheet_path, 'demonstracoes', 3, processes=2)
+
+    assert 2 == mock_executor.call_args.kwargs['max_workers']
+    assert 18 == len(df)
+    assert 18 == len(read_statements(worksheet_path, 'demonstracoes'))
+
+
+@patch('central_balancos_py.src.shards.build_http_client', wraps=build_http_client)
+@patch('central_balancos_py.src.shards.ProcessPoolExecutor')
+@patch('central_balancos_py.src.client.http.requests.Session.get')
+def test_extract_sharded_splits_the_rate_cap(mock_get, mock_executor, mock_build_http_client, tmp_path):
+    mock_get.side_effect = mocked_get
+    mock_executor.side_effect = lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)
+
+    extract_sharded(str(tmp_path / 'sharded.xlsx'), 'demonstracoes', 4, processes=2, requests_per_second=8,
+                    max_requests_per_second=40)
+
+    assert 4 == mock_build_http_client.call_count
+    for call in mock_build_http_client.call_args_list:
+        assert 4 == call.args[0]
+        assert 20 == call.kwargs['max_requests_per_second']
@@ -0,0 +1,41 @@
+import os
+
+import pytest
+
+from central_balancos_py.src.state import StateStore, state_path
+from tests.constants import TEMP_STATE_PATH
+from tests.support import factory
+
+
+@pytest.fixture(autouse=True)
+def clean_up_state():
+    yield
+    if os.path.exists(TEMP_STATE_PATH):
+        os.remove(TEMP_STATE_PATH)
+
+
+def test_state_path():
+    assert 'data/demonstracoes.xlsx.state.json' == state_path('data/demonstracoes.xlsx')
+
+
+def test_get_unknown_company():
+    assert StateStore(TEMP_STATE_PATH).get(factory.company_record()) is None
+
+
+def test_update_and_reload():
+    watermark = {'totalCount': 2, 'latest': '2023-06-21T11:24:32.34'}
+    state = StateStore(TEMP_STATE_PATH)
+    state.update(factory.company_record(), watermark)
+    state.save()
+
+    assert watermark == StateStore(TEMP_STATE_PATH).get(factory.company_record())
+    assert not any(name.endswith('.part') for name in os.listdir(os.path.dirname(TEMP_STATE_PATH)))
+
+
+def test_reset():
+    state = StateStore(TEMP_STATE_PATH)
+    state.update(factory.company_record(), {'totalCount': 1, 'digest': 'abc'})
+
+    state.reset()
+
+    assert state.get(factory.company_record()) is None
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from central_balancos_py.src.extract import to_df
+from central_balancos_py.src.output import to_excel
+from central_balancos_py.src.pdfs import filter_frame, load_statements, select_statements
+from central_balancos_py.src.statement_index import build_index, index_path, is_current, lookup_cnpj, \
+    query_statements
+from tests.constants import READ_ONLY_WORKSHEET_PATH, TEMP_WORKSHEET_PATH
+from tests.support import factory
+from tests.util import clean_up_worksheet_caches
+
+
+@pytest.fixture(autouse=True)
+def clean_up_index():
+    yield
+    for path in [TEMP_WORKSHEET_PATH, index_path(TEMP_WORKSHEET_PATH)]:
+        if os.path.exists(path):
+            os.remove(path)
+    clean_up_worksheet_caches()
+
+
+@pytest.fixture
+def statements():
+    statements, _ = load_statements(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+    return statements
+
+
+@pytest.fixture
+def statement_index(tmp_path, statements):
+    path = str(tmp_path / 'demonstracoes.index.sqlite')
+    build_index(statements.set_index(['nomeParticipante', 'tipoDemonstracao', 'dataPublicacao']), path)
+    return path
+
+
+def pdfs(statements):
+    return sorted(statements['pdf'])
+
+
+@pytest.mark.parametrize(
+    'filters',
+    [
+        {},
+        {'statement_type': 'DFP'},
+        {'statement_type': ['ITR', 'DFP']},
+        {'publish_date': 'latest'},
+        {'publish_date': 'oldest', 'statement_type': 'DFP'},
+        {'published_from': '2022-01-01', 'published_to': '2022-12-31'},
+        {'cnpjs': ['13.385.440/0001-56']},
+    ]
+)
+def test_query_statements_matches_filter_frame(statements, statement_index, filters):
+    assert pdfs(filter_frame(statements, **filters)) == pdfs(query_statements(statement_index, **filters))
+
+
+def test_query_statements_columns(statement_index, statements):
+    indexed = query_statements(statement_index)
+
+    assert list(statements.columns) == list(indexed.columns)
+    assert 'string' == indexed['cnpj'].dtype
+
+
+def test_lookup_cnpj(statements, statement_index):
+    cnpj = statements['cnpj'].iloc[0]
+
+    assert pdfs(statements[statements['cnpj'] == cnpj]) == pdfs(lookup_cnpj(statement_index, cnpj))
+
+
+def test_is_current():
+    df = to_df([factory.statement_row(), factory.statement_row(name='Outra', cnpj='12345678000199')])
+    to_excel(df, TEMP_WORKSHEET_PATH, 'demonstracoes')
+    path = index_path(TEMP_WORKSHEET_PATH)
+    assert not is_current(path, TEMP_WORKSHEET_PATH)
+
+    build_index(df, path, TEMP_WORKSHEET_PATH)
+    assert is_current(path, TEMP_WORKSHEET_PATH)
+
+    to_excel(df.iloc[:0], TEMP_WORKSHEET_PATH, 'demonstracoes')
+    assert not is_current(path, TEMP_WORKSHEET_PATH)
+
+
+def test_select_statements_uses_current_index():
+    df = to_df([factory.statement_row(), factory.statement_row(name='Outra', cnpj='12345678000199')])
+    to_excel(df, TEMP_WORKSHEET_PATH, 'demonstracoes')
+    build_index(df.iloc[:1], index_path(TEMP_WORKSHEET_PATH), TEMP_WORKSHEET_PATH)
+
+    assert 1 == len(select_statements(TEMP_WORKSHEET_PATH, 'demonstracoes'))
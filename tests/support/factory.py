@@ -1,5 +1,9 @@
+from unittest.mock import Mock
+
 import pandas as pd
 
+from central_balancos_py.src.records import Company, StatementRow
+
 
 def company():
     return {'id': 635, 'cnpj': '13385440000156', 'nome': 'ITATIAIA INVESTIMENTOS IMOBILIARIOS E PARTICIPACOES S.A.'}
@@ -30,6 +34,14 @@ def row(name=None, cnpj=None):
         'pdf': 'https://centraldebalancos.estaleiro.serpro.gov.br/centralbalancos/servicesapi/api/Demonstracao/pdf/77820'
     }
 
+def company_record():
+    return Company.from_json(company())
+
+
+def statement_row(name=None, cnpj=None):
+    return StatementRow.from_dict(row(name, cnpj))
+
+
 def statement_df():
     expected = pd.DataFrame({
         'nomeParticipante': ['ITATIAIA INVESTIMENTOS IMOBILIARIOS E PARTICIPACOES S.A.'],
@@ -67,4 +79,11 @@ def statements_df():
     return expected_df
 
 
-__ALL__ = ['company', 'statement', 'row']
+def pdf_response(content):
+    response = Mock(status_code=200)
+    response.content = content
+    response.iter_content.return_value = [content[:len(content) // 2], content[len(content) // 2:]]
+    return response
+
+
+__ALL__ = ['company', 'statement', 'row', 'company_record', 'statement_row', 'pdf_response']
@@ -1,6 +1,7 @@
 import os
+import shutil
 
-from tests.constants import PDFS_DIRECTORY
+from tests.constants import PDFS_DIRECTORY, DATA_DIRECTORY
 
 
 def clean_up_pdf_directory():
@@ -11,3 +12,15 @@ def clean_up_pdf_directory():
         for file in os.listdir(PDFS_DIRECTORY):
             os.remove(os.path.join(PDFS_DIRECTORY, file))
         os.removedirs(PDFS_DIRECTORY)
+
+
+def list_pdfs():
+    return sorted(file for file in os.listdir(PDFS_DIRECTORY) if file.endswith('.pdf'))
+
+
+def clean_up_worksheet_caches():
+    for file in os.listdir(DATA_DIRECTORY):
+        if file.endswith(('.cache.pkl', '.index.sqlite', '.metrics.json', '.state.json')):
+            os.remove(os.path.join(DATA_DIRECTORY, file))
+        elif file.endswith('.http_cache'):
+            shutil.rmtree(os.path.join(DATA_DIRECTORY, file))
@@ -0,0 +1,78 @@
+import os
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from central_balancos_py.src import worksheet
+from tests.constants import READ_ONLY_WORKSHEET_PATH, READ_ONLY_FILTERED_WORKSHEET_PATH, TEMP_WORKSHEET_PATH
+from tests.support import factory
+from tests.util import clean_up_worksheet_caches
+
+
+@pytest.fixture(autouse=True)
+def clean_up():
+    worksheet.load_workbook.cache_clear()
+    yield
+    worksheet.load_workbook.cache_clear()
+    clean_up_worksheet_caches()
+    if os.path.exists(TEMP_WORKSHEET_PATH):
+        os.remove(TEMP_WORKSHEET_PATH)
+
+
+def test_cache_path():
+    assert 'data/demonstracoes.xlsx.cache.pkl' == worksheet.cache_path('data/demonstracoes.xlsx')
+
+
+def test_normalize_cnpjs():
+    assert ['13385440000156', '12345670000890'] == worksheet.normalize_cnpjs(['13.385.440/0001-56', 12345670000890])
+
+
+def test_load_worksheet():
+    statements, cnpjs = worksheet.load_worksheet(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+
+    assert factory.statements_df().astype({'cnpj': 'str'}).equals(statements)
+    assert cnpjs is None
+
+
+def test_load_worksheet_with_cnpjs_sheet():
+    _statements, cnpjs = worksheet.load_worksheet(READ_ONLY_FILTERED_WORKSHEET_PATH, 'demonstracoes')
+
+    assert ['13385440000156'] == cnpjs
+
+
+def test_load_worksheet_opens_workbook_once():
+    with patch('central_balancos_py.src.worksheet.pd.ExcelFile', wraps=worksheet.pd.ExcelFile) as mock_excel_file:
+        worksheet.load_worksheet(READ_ONLY_FILTERED_WORKSHEET_PATH, 'demonstracoes')
+        assert 1 == mock_excel_file.call_count
+
+
+def test_load_worksheet_uses_disk_cache():
+    expected, _cnpjs = worksheet.load_worksheet(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+    assert os.path.exists(worksheet.cache_path(READ_ONLY_WORKSHEET_PATH))
+    worksheet.load_workbook.cache_clear()
+
+    with patch('central_balancos_py.src.worksheet.parse_workbook') as mock_parse:
+        statements, _cnpjs = worksheet.load_worksheet(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+        mock_parse.assert_not_called()
+    assert expected.equals(statements)
+
+
+def test_load_worksheet_invalidates_cache_on_change():
+    shutil.copyfile(READ_ONLY_WORKSHEET_PATH, TEMP_WORKSHEET_PATH)
+    worksheet.load_worksheet(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+    shutil.copyfile(READ_ONLY_FILTERED_WORKSHEET_PATH, TEMP_WORKSHEET_PATH)
+    stat = os.stat(TEMP_WORKSHEET_PATH)
+    os.utime(TEMP_WORKSHEET_PATH, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    _statements, cnpjs = worksheet.load_worksheet(TEMP_WORKSHEET_PATH, 'demonstracoes')
+
+    assert ['13385440000156'] == cnpjs
+
+
+def test_load_worksheet_returns_copies():
+    statements, _cnpjs = worksheet.load_worksheet(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+    statements['cnpj'] = 'changed'
+
+    statements, _cnpjs = worksheet.load_worksheet(READ_ONLY_WORKSHEET_PATH, 'demonstracoes')
+    assert 'changed' not in statements['cnpj'].tolist()